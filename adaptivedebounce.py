@@ -0,0 +1,139 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Adaptive debounce window for a PinButton, learned from the bounce
+#bursts of the switch itself.
+#
+#A burst starts with an edge on a quiet line (no edge for gapus) and
+#holds all edges that follow each other within gapus. The duration of the last bursts (first to last edge) is kept, the
+#window becomes a percentile of them times a margin, limited to
+#minms..maxms. A good switch gets a few ms of dead time instead of the
+#fixed 200 ms, a worn switch with longer bursts gets a longer window.
+#
+#Only a rising edge that starts a burst is a press, so the bounce of
+#the release (rising edges right after the falling edge) is not taken
+#for a new press. For that the monitor listens to both edges of a
+#button with an AdaptiveDebounce.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#pinbutton=PinButton(Pin(18, Pin.IN, Pin.PULL_DOWN), ...)
+#pinbutton.debounce=AdaptiveDebounce(5, 200)
+#monitor.registerpinbutton(pinbutton)     #after setting debounce
+#--------------------------------------------------------------------
+import utime
+from array import array
+
+class AdaptiveDebounce():
+    """
+    Description
+    --------------------------------------------------------------------
+    windowms: current debounce window in ms (for the debounce timer)
+    windowus: current debounce window in us
+    bursts: number of measured bursts
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, minms: int = 5, maxms: int = 200, percentile: int = 95, margin: int = 2, samples: int = 16, gapus: int = 2000):
+        """
+        @minms: smallest window
+        @maxms: largest window, also the window until bursts were measured
+        @percentile: percentile of the burst durations used, 50..100
+        @margin: window = margin * percentile
+        @samples: number of bursts kept
+        @gapus: an edge within gapus after the previous edge is bounce
+        """
+        self.minms=minms
+        self.maxms=maxms
+        self.percentile=percentile
+        self.margin=margin
+        self.gapus=gapus
+        self._samples=array('I', [0] * samples) #ring, oldest sample is replaced
+        self._sorted=array('I', [0] * samples) #the same samples in ascending order
+        self._next=0
+        self._count=0
+        self.bursts=0
+        self._first=True
+        self._burststart=0
+        self._burstlast=0
+        self._lastedge=0
+        self.windowus=maxms * 1000
+        self.windowms=maxms
+
+    def edge(self, level: int, ticks: int):
+        """
+        register an edge (ticks in ticks_us), returns True when it is a press:
+        a rising edge on a quiet line
+        """
+        if self._first:
+            self._first=False
+        elif utime.ticks_diff(ticks, self._lastedge)<self.gapus:
+            self._lastedge=ticks
+            self._burstlast=ticks #bounce
+            return False
+        else:
+            self._add(utime.ticks_diff(self._burstlast, self._burststart)) #the previous burst is complete
+        self._lastedge=ticks
+        self._burststart=ticks
+        self._burstlast=ticks
+        return level==1
+
+    def reset(self):
+        """forget the measured bursts, back to maxms"""
+        self._next=0
+        self._count=0
+        self._first=True
+        self.bursts=0
+        self.windowus=self.maxms * 1000
+        self.windowms=self.maxms
+
+    def _add(self, duration: int):
+        if self._count==len(self._samples):
+            self._remove(self._samples[self._next])
+        else:
+            self._count+=1
+        self._samples[self._next]=duration
+        self._next+=1
+        if self._next==len(self._samples):
+            self._next=0
+        self._insert(duration)
+        self.bursts+=1
+        self._update()
+
+    def _remove(self, duration: int):
+        #drop the oldest sample from the sorted samples (count-1 of them stay)
+        ordered=self._sorted
+        i=0
+        while ordered[i]!=duration:
+            i+=1
+        last=self._count - 1
+        while i<last:
+            ordered[i]=ordered[i + 1]
+            i+=1
+
+    def _insert(self, duration: int):
+        #insertion in the sorted samples, count includes the new sample
+        ordered=self._sorted
+        i=self._count - 1
+        while i>0 and ordered[i - 1]>duration:
+            ordered[i]=ordered[i - 1]
+            i-=1
+        ordered[i]=duration
+
+    def _update(self):
+        #smallest sample with at least percentile % of the samples at or below it:
+        #the samples are kept sorted, O(1) in the edge handler
+        needed=(self._count * self.percentile + 99) // 100
+        value=self._sorted[needed - 1]
+        window=value * self.margin
+        if window<self.minms * 1000:
+            window=self.minms * 1000
+        elif window>self.maxms * 1000:
+            window=self.maxms * 1000
+        self.windowus=window
+        self.windowms=(window + 999) // 1000
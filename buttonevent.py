@@ -0,0 +1,58 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Event record of a button callback. The PinMonitor allocates one and
+#fills it before every callback, so no memory is allocated per event.
+#The callback finds it in pinbutton.event
+#--------------------------------------------------------------------
+
+#kind of event
+BUTTON_EVENT_CLICKED=const(0)
+BUTTON_EVENT_REPEAT=const(1)
+BUTTON_EVENT_DOUBLECLICKED=const(2)
+BUTTON_EVENT_COUNTDOWN=const(3)
+BUTTON_EVENT_LONGPRESS=const(4)
+BUTTON_EVENT_NCLICKED=const(5)
+BUTTON_EVENT_HELDRELEASED=const(6)
+BUTTON_EVENT_CHORD=const(7)
+BUTTON_EVENT_SEQUENCE=const(8)
+
+class ButtonEvent():
+    """
+    Description
+    --------------------------------------------------------------------
+    kind: BUTTON_EVENT_*
+    button: the PinButton
+    index: index of the button in its monitor
+    ticks: ticks_ms of the event
+    countdownvalue: countdownvalue of the button at the event
+    clicks: number of clicks of the gesture, 0 when not counted
+    durationms: press duration of the gesture, 0 when not measured
+    combo: number of the chord or sequence (ComboMonitor), otherwise -1
+    count: number of events combined in this one (coalesced repeats), normally 1
+    --------------------------------------------------------------------
+    The record is reused: copy the fields when they are needed after
+    the callback returned.
+    """
+    __slots__=("kind", "button", "index", "ticks", "countdownvalue", "clicks", "durationms", "combo", "count")
+
+    #event kinds as text array because of lack of enums for informational purposes
+    kinds=("clicked", "repeat", "doubleclicked", "countdown", "longpress", "nclicked", "heldreleased", "chord", "sequence")
+
+    def __init__(self):
+        self.kind=BUTTON_EVENT_CLICKED
+        self.button=None
+        self.index=-1
+        self.ticks=0
+        self.countdownvalue=0
+        self.clicks=0
+        self.durationms=0
+        self.combo=-1
+        self.count=1
+
+    def __repr__(self):
+        return "ButtonEvent({}, {}, {}, {}, {}, {})".format(self.kinds[self.kind], self.index, self.ticks, self.countdownvalue, self.clicks, self.durationms)
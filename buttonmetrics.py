@@ -0,0 +1,101 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Runtime metrics of a button: fixed size counters and histograms with
+#log2 buckets, allocated once. Updating them does not allocate and
+#does not print, so it can be done in the interrupt handler.
+#snapshot() (not in an interrupt) returns the values as dictionary.
+#
+#Histogram buckets: bucket 0 holds value 0, bucket n holds values
+#2^(n-1) .. 2^n-1, the last bucket holds everything above.
+#--------------------------------------------------------------------
+#seealso: PinMonitor.enablemetrics()
+#--------------------------------------------------------------------
+from array import array
+
+#counters
+METRIC_EDGES=const(0)
+METRIC_ACCEPTED=const(1)
+METRIC_REJECTED=const(2)
+METRIC_CALLBACKS=const(3)
+METRIC_TIMERS=const(4)
+_COUNTERS=const(5)
+
+#histograms
+HISTOGRAM_LATENCY=const(0)
+HISTOGRAM_CALLBACK=const(1)
+HISTOGRAM_JITTER=const(2)
+_HISTOGRAMS=const(3)
+HISTOGRAM_BUCKETS=const(16)
+
+class ButtonMetrics():
+    """
+    Description
+    --------------------------------------------------------------------
+    counters:
+        edges: edges seen by the state machine
+        accepted: edges that were processed
+        rejected: edges thrown away while debouncing
+        callbacks: user callbacks executed
+        timers: timer deadlines handled
+    histograms:
+        latency_us: edge (ticks_us in the interrupt) to dispatch - deferred mode
+        callback_us: execution time of the user callbacks
+        jitter_ms: how late a timer deadline was handled
+    --------------------------------------------------------------------
+    """
+    counternames=("edges", "accepted", "rejected", "callbacks", "timers")
+    histogramnames=("latency_us", "callback_us", "jitter_ms")
+
+    def __init__(self):
+        self._counters=array('I', [0] * _COUNTERS)
+        self._histograms=array('I', [0] * (_HISTOGRAMS * HISTOGRAM_BUCKETS))
+        self._maxima=array('I', [0] * _HISTOGRAMS)
+
+    def count(self, counter: int):
+        """increase counter METRIC_* by one"""
+        self._counters[counter]+=1
+
+    def record(self, histogram: int, value: int):
+        """add value to histogram HISTOGRAM_*, negative values count as 0"""
+        if value<0:
+            value=0
+        if value>self._maxima[histogram]:
+            self._maxima[histogram]=value
+        bucket=0
+        while value>0 and bucket<HISTOGRAM_BUCKETS - 1:
+            value>>=1
+            bucket+=1
+        self._histograms[histogram * HISTOGRAM_BUCKETS + bucket]+=1
+
+    def counter(self, counter: int):
+        """value of counter METRIC_*"""
+        return self._counters[counter]
+
+    def reset(self):
+        """all counters and histograms to 0"""
+        for i in range(len(self._counters)):
+            self._counters[i]=0
+        for i in range(len(self._histograms)):
+            self._histograms[i]=0
+        for i in range(len(self._maxima)):
+            self._maxima[i]=0
+
+    def snapshot(self, reset: bool = False):
+        """counters and histograms as dictionary, optionally reset them"""
+        result={}
+        for i in range(_COUNTERS):
+            result[self.counternames[i]]=self._counters[i]
+        for h in range(_HISTOGRAMS):
+            start=h * HISTOGRAM_BUCKETS
+            result[self.histogramnames[h]]={
+                "buckets": list(self._histograms[start:start + HISTOGRAM_BUCKETS]),
+                "max": self._maxima[h],
+                }
+        if reset:
+            self.reset()
+        return result
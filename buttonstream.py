@@ -0,0 +1,222 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#asyncio front end of a PinMonitor, for MicroPython (u)asyncio and for
+#CPython asyncio with the simulation (sim/).
+#The monitor calls the listener of the stream for every event. The
+#listener copies the event into a bounded queue of preallocated arrays
+#and sets a ThreadSafeFlag, nothing is allocated and no application
+#code runs in the interrupt or timer context. The coroutines that wait
+#for the flag build the ButtonEvent objects and do the heavy work
+#(display, network) cooperatively.
+#
+#When the queue is full the newest event is dropped and counted in
+#overflows.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#async def main():
+#    async for event in monitor.events():
+#        print(event)
+#
+#async def selfdestruct(pinbutton):
+#    while True:
+#        event=await pinbutton.clicked()
+#        await send(event.ticks)
+#--------------------------------------------------------------------
+from array import array
+from buttonevent import ButtonEvent
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+if hasattr(asyncio, "ThreadSafeFlag"):
+    ThreadSafeFlag=asyncio.ThreadSafeFlag
+else:
+    class ThreadSafeFlag():
+        """
+        Description
+        --------------------------------------------------------------------
+        CPython stand-in for asyncio.ThreadSafeFlag of MicroPython: set()
+        may be called outside the event loop, one coroutine waits.
+        --------------------------------------------------------------------
+        """
+
+        def __init__(self):
+            self._event=None
+            self._loop=None
+            self._set=False
+
+        def set(self):
+            if self._loop!=None:
+                self._loop.call_soon_threadsafe(self._wake)
+            else:
+                self._set=True
+
+        def _wake(self):
+            if self._event!=None:
+                self._event.set()
+            else:
+                self._set=True
+
+        async def wait(self):
+            if self._set:
+                self._set=False
+                return
+            if self._event==None:
+                self._loop=asyncio.get_running_loop()
+                self._event=asyncio.Event()
+            await self._event.wait()
+            self._event.clear()
+
+class _Waiter():
+    #a coroutine waiting for an event of one button
+    __slots__=("kinds", "hit", "flag", "event")
+
+    def __init__(self):
+        self.kinds=0
+        self.hit=False
+        self.flag=ThreadSafeFlag()
+        self.event=ButtonEvent()
+
+def _copy(source: ButtonEvent, target: ButtonEvent):
+    target.kind=source.kind
+    target.button=source.button
+    target.index=source.index
+    target.ticks=source.ticks
+    target.countdownvalue=source.countdownvalue
+    target.clicks=source.clicks
+    target.durationms=source.durationms
+    target.combo=source.combo
+
+class ButtonStream():
+    """
+    Description
+    --------------------------------------------------------------------
+    Bounded event queue of a PinMonitor with an asynchronous iterator
+    and awaitable waits per button. Created by PinMonitor.events().
+    One coroutine iterates the stream, one coroutine at a time waits for
+    a button. Events are only queued after the iteration started.
+    --------------------------------------------------------------------
+    overflows: events dropped because the queue was full
+    highwater: highest number of events in the queue
+    """
+
+    def __init__(self, monitor, size: int = 32):
+        """
+        @monitor: PinMonitor (or subclass) to listen to
+        @size: number of events that can wait for the consumer
+        """
+        self.size=size
+        self._monitor=monitor
+        #one slot stays empty to tell a full queue from an empty one
+        self._kinds=bytearray(size + 1)
+        self._indexes=array('H', [0] * (size + 1))
+        self._ticks=array('i', [0] * (size + 1))
+        self._countdownvalues=array('i', [0] * (size + 1))
+        self._clicks=array('i', [0] * (size + 1))
+        self._durations=array('i', [0] * (size + 1))
+        self._combos=array('i', [0] * (size + 1))
+        self._head=0
+        self._tail=0
+        self.overflows=0
+        self.highwater=0
+        self._flag=ThreadSafeFlag()
+        self._iterating=False
+        self._waiters=[]
+        monitor.listener=self._put
+
+    def count(self):
+        """number of events in the queue"""
+        count=self._head - self._tail
+        if count<0:
+            count+=self.size + 1
+        return count
+
+    def get(self):
+        """oldest event as a new ButtonEvent, None when the queue is empty"""
+        if self._head==self._tail:
+            return None
+        tail=self._tail
+        event=ButtonEvent()
+        event.kind=self._kinds[tail]
+        event.index=self._indexes[tail]
+        event.button=self._monitor._pinbuttons[event.index]
+        event.ticks=self._ticks[tail]
+        event.countdownvalue=self._countdownvalues[tail]
+        event.clicks=self._clicks[tail]
+        event.durationms=self._durations[tail]
+        event.combo=self._combos[tail]
+        tail+=1
+        if tail>self.size:
+            tail=0
+        self._tail=tail
+        return event
+
+    async def wait(self, pinbutton, *kinds):
+        """the next event of pinbutton of one of the kinds BUTTON_EVENT_*"""
+        index=pinbutton.index
+        while len(self._waiters)<=index:
+            self._waiters.append(None)
+        waiter=self._waiters[index]
+        if waiter==None:
+            waiter=_Waiter()
+            self._waiters[index]=waiter
+        mask=0
+        for kind in kinds:
+            mask|=1<<kind
+        waiter.hit=False
+        waiter.kinds=mask
+        while not waiter.hit:
+            await waiter.flag.wait()
+        waiter.kinds=0
+        event=ButtonEvent()
+        _copy(waiter.event, event)
+        return event
+
+    def __aiter__(self):
+        self._iterating=True
+        return self
+
+    async def __anext__(self):
+        while self._head==self._tail:
+            await self._flag.wait()
+        return self.get()
+
+    def _put(self, event: ButtonEvent):
+        #listener of the monitor: interrupt or timer context, no allocation
+        index=event.index
+        if index<len(self._waiters):
+            waiter=self._waiters[index]
+            if waiter!=None and waiter.kinds & (1<<event.kind):
+                _copy(event, waiter.event)
+                waiter.kinds=0
+                waiter.hit=True
+                waiter.flag.set()
+        if not self._iterating:
+            return
+        head=self._head + 1
+        if head>self.size:
+            head=0
+        if head==self._tail:
+            self.overflows+=1
+            return
+        at=self._head
+        self._kinds[at]=event.kind
+        self._indexes[at]=index
+        self._ticks[at]=event.ticks
+        self._countdownvalues[at]=event.countdownvalue
+        self._clicks[at]=event.clicks
+        self._durations[at]=event.durationms
+        self._combos[at]=event.combo
+        self._head=head
+        count=self.count()
+        if count>self.highwater:
+            self.highwater=count
+        self._flag.set()
@@ -0,0 +1,290 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Combinations of buttons on a GestureMonitor: the pressed buttons are
+#kept as a bitmask (bit = button index) and matched against combos
+#that are compiled when they are added, so an edge costs a dictionary
+#lookup, whatever the number of combos.
+#
+#-chord
+#	buttons pressed together, all within combowindowms after the
+#	first. A chord that is part of a larger chord (A+B and A+B+C)
+#	waits until the window ends or one of its buttons is released.
+#-sequence
+#	buttons pressed one after the other, every next press within
+#	combowindowms. The sequences form a tree, key (node<<8)|index.
+#	A sequence that is the start of a longer one waits for the window.
+#
+#The buttons of a combo give no click, long press or repeat: their
+#gestures are cancelled when the combo fires. A click of a button in
+#a sequence that has started waits for the sequence, it is given when
+#the sequence fails.
+#
+#Note: on MicroPython integers above 30 bits are allocated on the
+#heap, keep a ComboMonitor at 30 buttons or less.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#monitor=ComboMonitor(400)
+#monitor.registerpinbutton(service)
+#monitor.registerpinbutton(reset)
+#monitor.registerpinbutton(alarm)
+#monitor.addchord((service, reset), servicemode)
+#monitor.addchord((service, reset, alarm), acknowledge)
+#monitor.addsequence((service, service, alarm), testalarm)
+#--------------------------------------------------------------------
+import utime
+from machine import Timer
+from gesturemonitor import GestureMonitor, GESTURE_STATE_IDLE
+from pinbutton import PinButton
+from tracebuffer import TRACE_LEAVE
+from buttonevent import BUTTON_EVENT_CHORD, BUTTON_EVENT_SEQUENCE
+
+_TRACE=const(1)
+
+#trace sites, following the sites of GestureMonitor
+SITE_COMBO=const(26)
+
+class ComboMonitor(GestureMonitor):
+    """
+    Description
+    --------------------------------------------------------------------
+    GestureMonitor with chords and sequences of its buttons. The
+    callback of a combo is called as callback(pinbutton) with the button
+    that completed the combo, event.combo is the number returned by
+    addchord/addsequence and event.clicks the number of presses.
+    --------------------------------------------------------------------
+    combowindowms: time window of a chord, and between the presses of a sequence
+    """
+    combowindowms: int = 400
+
+    _sites=GestureMonitor._sites + [ \
+        "_combo" \
+        ]
+
+    def __init__(self, combowindowms: int = 400, timer: Timer = None):
+        """
+        @combowindowms: time window of a chord, and between the presses of a sequence
+        @timer: Timer for the deadlines of the buttons of this monitor, default a virtual Timer(-1)
+        """
+        super().__init__(timer)
+        self.combowindowms=combowindowms
+        self._combocallbacks=[]
+        self._combopresses=[]
+        self._chords={} #mask -> combo
+        self._extensible=set() #chords that are part of a larger chord
+        self._sequences={} #(node<<8)|index -> node
+        self._sequenceends={} #node -> combo
+        self._branches=set() #nodes with a longer sequence after them
+        self._nodes=1 #node 0 is the root
+        self._comboslot=0 #wheel slot of the combo deadline, after the buttons
+        self._pressed=0
+        self._chordticks=0
+        self._node=0
+        self._sequencemask=0
+        self._sequenceticks=0
+        self._parked=0
+        self._pendingcombo=-1
+        self._pendingmask=0
+        self._pendingbutton=None
+        self._pendingchord=False
+
+    def addchord(self, pinbuttons, callback):
+        """
+        @pinbuttons: registered buttons to press together
+        @callback: function(pinbutton) executed when the chord is pressed
+        returns the number of the combo
+        """
+        mask=self._mask(pinbuttons)
+        combo=self._addcombo(callback, len(pinbuttons))
+        for other in self._chords:
+            if other!=mask and other & mask==other:
+                self._extensible.add(other)
+            if other!=mask and other & mask==mask:
+                self._extensible.add(mask)
+        self._chords[mask]=combo
+        return combo
+
+    def addsequence(self, pinbuttons, callback):
+        """
+        @pinbuttons: registered buttons in the order they are pressed, 2 or more
+        @callback: function(pinbutton) executed when the sequence is pressed
+        returns the number of the combo
+        """
+        if len(pinbuttons)<2:
+            raise ValueError("a sequence needs 2 or more presses")
+        self._mask(pinbuttons)
+        combo=self._addcombo(callback, len(pinbuttons))
+        node=0
+        for pinbutton in pinbuttons:
+            key=(node<<8)|pinbutton.index
+            if key not in self._sequences:
+                self._sequences[key]=self._nodes
+                self._branches.add(node)
+                self._nodes+=1
+            node=self._sequences[key]
+        self._sequenceends[node]=combo
+        return combo
+
+    def registerpinbutton(self, pinbutton: PinButton):
+        #the combo slot moves behind the new button, a pending combo deadline moves along
+        deadline=None
+        if self._wheel.pending(self._comboslot):
+            deadline=self._wheel.deadline(self._comboslot)
+            self._wheel.cancel(self._comboslot)
+        super().registerpinbutton(pinbutton)
+        self._comboslot=len(self._pinbuttons)
+        self._wheel.resize(self._comboslot + 1)
+        if deadline!=None:
+            self._wheel.schedule(self._comboslot, 0, deadline)
+
+    def _mask(self, pinbuttons):
+        mask=0
+        for pinbutton in pinbuttons:
+            if pinbutton.index<0 or self._pinbuttons[pinbutton.index]!=pinbutton:
+                raise ValueError("button is not registered at this monitor")
+            mask|=1<<pinbutton.index
+        return mask
+
+    def _addcombo(self, callback, presses: int):
+        self._combocallbacks.append(callback)
+        self._combopresses.append(presses)
+        return len(self._combocallbacks) - 1
+
+    def _reset(self, pinbutton: PinButton):
+        super()._reset(pinbutton)
+        bit=1<<pinbutton.index
+        self._pressed&=~bit
+        self._parked&=~bit
+        self._sequencemask&=~bit
+        self._pendingmask&=~bit
+
+    def _timer_expired(self, index):
+        if index==self._comboslot:
+            self._combo_deadline()
+        else:
+            super()._timer_expired(index)
+
+    def _press(self, pinbutton: PinButton, ticks: int):
+        bit=1<<pinbutton.index
+        now=utime.ticks_ms()
+        if self._pressed==0:
+            self._chordticks=now
+        self._pressed|=bit
+        self._parked&=~bit #a new gesture of the button replaces its waiting click
+        super()._press(pinbutton, ticks)
+        if not self._chord(pinbutton, now):
+            self._sequence(pinbutton, now)
+
+    def _release(self, pinbutton: PinButton, ticks: int):
+        bit=1<<pinbutton.index
+        self._pressed&=~bit
+        if self._pendingchord and self._pendingmask & bit:
+            self._firepending() #the chord was complete, a larger one is not coming
+        super()._release(pinbutton, ticks)
+
+    def _finish(self, pinbutton: PinButton):
+        #the click of a button in a started sequence waits until the sequence completes or fails
+        bit=1<<pinbutton.index
+        if self._node!=0 and self._sequencemask & bit:
+            self._parked|=bit
+            pinbutton.state=GESTURE_STATE_IDLE
+            return
+        super()._finish(pinbutton)
+
+    def _chord(self, pinbutton: PinButton, now: int):
+        mask=self._pressed
+        combo=self._chords.get(mask)
+        if combo==None or utime.ticks_diff(now, self._chordticks)>self.combowindowms:
+            return False
+        if mask in self._extensible:
+            self._setpending(combo, mask, pinbutton, True)
+            self._wheel.schedule(self._comboslot, self.combowindowms, self._chordticks)
+        else:
+            self._firecombo(combo, mask, pinbutton, BUTTON_EVENT_CHORD)
+        return True
+
+    def _sequence(self, pinbutton: PinButton, now: int):
+        if self._node!=0 and utime.ticks_diff(now, self._sequenceticks)>self.combowindowms:
+            self._sequencefailed()
+        node=self._sequences.get((self._node<<8)|pinbutton.index)
+        if node==None and self._node!=0:
+            self._sequencefailed()
+            node=self._sequences.get(pinbutton.index)
+        if node==None:
+            return
+        self._node=node
+        self._sequencemask|=1<<pinbutton.index
+        self._sequenceticks=now
+        combo=self._sequenceends.get(node)
+        if combo!=None and node not in self._branches:
+            self._firecombo(combo, self._sequencemask, pinbutton, BUTTON_EVENT_SEQUENCE)
+            return
+        if combo!=None:
+            self._setpending(combo, self._sequencemask, pinbutton, False)
+        self._wheel.schedule(self._comboslot, self.combowindowms)
+
+    def _combo_deadline(self):
+        if self._pendingcombo>=0:
+            self._firepending()
+        elif self._node!=0:
+            self._sequencefailed()
+
+    def _sequencefailed(self):
+        #a completed sequence that waited for a longer one is given, otherwise the waiting clicks
+        if self._pendingcombo>=0 and not self._pendingchord:
+            self._firepending()
+        else:
+            self._flush()
+
+    def _setpending(self, combo: int, mask: int, pinbutton: PinButton, chord: bool):
+        self._pendingcombo=combo
+        self._pendingmask=mask
+        self._pendingbutton=pinbutton
+        self._pendingchord=chord
+
+    def _firepending(self):
+        self._firecombo(self._pendingcombo, self._pendingmask, self._pendingbutton, BUTTON_EVENT_CHORD if self._pendingchord else BUTTON_EVENT_SEQUENCE)
+
+    def _firecombo(self, combo: int, mask: int, pinbutton: PinButton, kind: int):
+        if _TRACE and self.tracing:
+            self._trace(SITE_COMBO, pinbutton)
+        self._pendingcombo=-1
+        self._pendingmask=0
+        self._pendingbutton=None
+        self._wheel.cancel(self._comboslot)
+        #the buttons of the combo give no gesture of their own
+        self._parked&=~mask
+        index=0
+        while mask:
+            if mask & 1:
+                self._cancel(index) #the settle check of the button stays
+                self._clicks[index]=0
+                if self._pinbuttons[index]!=None:
+                    self._pinbuttons[index].state=GESTURE_STATE_IDLE
+            mask>>=1
+            index+=1
+        self._flush()
+        self._notify(pinbutton, kind, self._combocallbacks[combo], self._combopresses[combo], 0, combo)
+        if _TRACE and self.tracing:
+            self._trace(SITE_COMBO|TRACE_LEAVE, pinbutton)
+
+    def _flush(self):
+        #the sequence is over: give the clicks that waited for it
+        parked=self._parked
+        self._parked=0
+        self._node=0
+        self._sequencemask=0
+        index=0
+        while parked:
+            if parked & 1:
+                pinbutton=self._pinbuttons[index]
+                if pinbutton!=None and pinbutton.state==GESTURE_STATE_IDLE and self._clicks[index]>0:
+                    super()._finish(pinbutton)
+            parked>>=1
+            index+=1
@@ -48,6 +48,7 @@ class DebugableItem():
     myclassinstance.debugger=SimpleDebugger()
     myclassinstance.debug=True
     """
+    __slots__=() #subclasses with __slots__ stay compact
     debug=False
     debugger=None
     
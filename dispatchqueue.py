@@ -0,0 +1,274 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Dispatch stage between the state machine and the user callbacks.
+#The monitor puts every callback with its event in a fixed capacity
+#priority queue, the callbacks run later from micropython.schedule (or
+#from the main loop with run()). A slow callback no longer delays the
+#timer deadlines of the buttons.
+#
+#-priorities
+#	PRIORITY_HIGH: double click, end of a countdown, chords, sequences
+#	PRIORITY_NORMAL: click, countdown, long press, ...
+#	PRIORITY_LOW: repeat
+#	The priority of a kind of event is in priorities (index BUTTON_EVENT_*)
+#
+#-coalescing
+#	A repeat of a button that still has a repeat waiting in the queue
+#	is added to it: event.count is the number of repeats.
+#
+#-limits and drop policy
+#	Every priority has a limit (high-water mark) on the number of
+#	waiting events, the queue as a whole holds size events. When an
+#	event does not fit:
+#	DROP_NEWEST: the new event is dropped
+#	DROP_LOWEST: the oldest event of the lowest priority (not higher than
+#	the new event) is dropped to make room, otherwise the new event
+#	Dropped events are counted in drops, per priority.
+#
+#The queue is allocated once, put() does not allocate memory.
+#A callback finds its event in pinbutton.event: the record of the
+#queue, filled with the values of the moment the event was queued.
+#The record of the monitor belongs to the interrupt and timer handlers,
+#they may fill it again while a slow callback is still running.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#monitor.enabledispatch(16)                      #run from micropython.schedule
+#monitor.enabledispatch(16, scheduled=False)     #main loop: monitor.dispatchqueue.run()
+#--------------------------------------------------------------------
+import micropython
+from array import array
+from buttonevent import ButtonEvent, BUTTON_EVENT_REPEAT, BUTTON_EVENT_COUNTDOWN
+
+PRIORITY_HIGH=const(0)
+PRIORITY_NORMAL=const(1)
+PRIORITY_LOW=const(2)
+_PRIORITIES=const(3)
+
+DROP_NEWEST=const(0)
+DROP_LOWEST=const(1)
+
+_NONE=const(255)
+
+class DispatchQueue():
+    """
+    Description
+    --------------------------------------------------------------------
+    Fixed capacity priority queue of callbacks, one FIFO per priority
+    on a shared pool of slots. Created by PinMonitor.enabledispatch().
+    --------------------------------------------------------------------
+    priorities: priority per kind of event, index BUTTON_EVENT_*
+    limits: maximum number of waiting events per priority
+    drops: dropped events per priority
+    highwater: highest number of waiting events
+    coalesced: repeats added to a waiting repeat
+    schedulefailures: micropython.schedule queue was full
+    """
+
+    def __init__(self, monitor, size: int = 16, policy: int = DROP_LOWEST, limits = None, scheduled: bool = True, batchsize: int = 4):
+        """
+        @monitor: PinMonitor whose callbacks are queued
+        @size: number of waiting events, at most 255
+        @policy: DROP_NEWEST or DROP_LOWEST
+        @limits: maximum number of waiting events per priority, default (size, size, size/4)
+        @scheduled: run the callbacks from micropython.schedule, otherwise call run()
+        @batchsize: callbacks per scheduled run, the rest is scheduled again
+        """
+        self.size=size
+        self.policy=policy
+        self.scheduled=scheduled
+        self.batchsize=batchsize
+        self.limits=bytearray(limits if limits!=None else (size, size, max(1, size // 4)))
+        #BUTTON_EVENT_* clicked, repeat, doubleclicked, countdown, longpress, nclicked, heldreleased, chord, sequence
+        self.priorities=bytearray((PRIORITY_NORMAL, PRIORITY_LOW, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_NORMAL, PRIORITY_NORMAL, PRIORITY_NORMAL, PRIORITY_HIGH, PRIORITY_HIGH))
+        self.drops=array('I', [0] * _PRIORITIES)
+        self.highwater=0
+        self.coalesced=0
+        self.schedulefailures=0
+        self._monitor=monitor
+        self._event=ButtonEvent() #event record of the callbacks run by the queue
+        #slots
+        self._kinds=bytearray(size)
+        self._indexes=array('H', [0] * size) #button index, a scanner can have more than 256 keys
+        self._ticks=array('i', [0] * size)
+        self._countdownvalues=array('i', [0] * size)
+        self._clicks=array('i', [0] * size)
+        self._durations=array('i', [0] * size)
+        self._combos=array('i', [0] * size)
+        self._counts=array('i', [0] * size)
+        self._callbacks=[None] * size
+        self._next=bytearray(size)
+        #FIFO per priority and the free list
+        self._heads=bytearray(b"\xff" * _PRIORITIES)
+        self._tails=bytearray(b"\xff" * _PRIORITIES)
+        self._lengths=bytearray(_PRIORITIES)
+        self._free=0
+        for slot in range(size):
+            self._next[slot]=slot + 1 if slot + 1<size else _NONE
+        self._count=0
+        self._repeatslots=bytearray(0) #waiting repeat per button index
+        self.resize(len(monitor._pinbuttons))
+        self._pending=False
+        self._run_ref=self._run
+
+    def count(self):
+        """number of waiting events"""
+        return self._count
+
+    def resize(self, buttons: int):
+        """room for the repeats of buttons button indexes - done by PinMonitor.registerpinbutton, not from an interrupt"""
+        extra=buttons - len(self._repeatslots)
+        if extra>0:
+            self._repeatslots.extend(bytearray(b"\xff" * extra))
+
+    def put(self, event: ButtonEvent, callback):
+        """queue callback with a copy of event, returns False when it was dropped"""
+        index=event.index
+        kind=event.kind
+        if kind==BUTTON_EVENT_REPEAT and self._repeatslots[index]!=_NONE:
+            slot=self._repeatslots[index]
+            self._counts[slot]+=1
+            self._ticks[slot]=event.ticks
+            self._durations[slot]=event.durationms
+            self.coalesced+=1
+            return True
+        priority=self.priorities[kind]
+        if kind==BUTTON_EVENT_COUNTDOWN and event.countdownvalue<=0:
+            priority=PRIORITY_HIGH #end of the countdown
+        if not self._room(priority):
+            self.drops[priority]+=1
+            return False
+        slot=self._free
+        self._free=self._next[slot]
+        self._kinds[slot]=kind
+        self._indexes[slot]=index
+        self._ticks[slot]=event.ticks
+        self._countdownvalues[slot]=event.countdownvalue
+        self._clicks[slot]=event.clicks
+        self._durations[slot]=event.durationms
+        self._combos[slot]=event.combo
+        self._counts[slot]=1
+        self._callbacks[slot]=callback
+        self._next[slot]=_NONE
+        if self._tails[priority]==_NONE:
+            self._heads[priority]=slot
+        else:
+            self._next[self._tails[priority]]=slot
+        self._tails[priority]=slot
+        self._lengths[priority]+=1
+        if kind==BUTTON_EVENT_REPEAT:
+            self._repeatslots[index]=slot
+        self._count+=1
+        if self._count>self.highwater:
+            self.highwater=self._count
+        if self.scheduled and not self._pending:
+            self._schedule()
+        return True
+
+    def run(self, maximum: int = 0):
+        """execute waiting callbacks, highest priority first, at most maximum (0 = all), returns the number executed"""
+        done=0
+        while self._count>0 and (maximum==0 or done<maximum):
+            priority=0
+            while self._heads[priority]==_NONE:
+                priority+=1
+            slot=self._pop(priority)
+            pinbutton=self._monitor._pinbuttons[self._indexes[slot]]
+            callback=self._callbacks[slot]
+            self._callbacks[slot]=None
+            if pinbutton!=None:
+                event=self._event
+                event.kind=self._kinds[slot]
+                event.button=pinbutton
+                event.index=self._indexes[slot]
+                event.ticks=self._ticks[slot]
+                event.countdownvalue=self._countdownvalues[slot]
+                event.clicks=self._clicks[slot]
+                event.durationms=self._durations[slot]
+                event.combo=self._combos[slot]
+                event.count=self._counts[slot]
+                self._release(slot)
+                pinbutton.event=event
+                try:
+                    self._monitor._call(pinbutton, callback)
+                finally:
+                    pinbutton.event=self._monitor._event
+            else:
+                self._release(slot)
+            done+=1
+        return done
+
+    def clear(self):
+        """drop all waiting events and reset the counters"""
+        while self._count>0:
+            priority=0
+            while self._heads[priority]==_NONE:
+                priority+=1
+            slot=self._pop(priority)
+            self._callbacks[slot]=None
+            self._release(slot)
+        for priority in range(_PRIORITIES):
+            self.drops[priority]=0
+        self.highwater=0
+        self.coalesced=0
+
+    def _room(self, priority: int):
+        #make room for an event of priority, False when it has to be dropped
+        if self._lengths[priority]>=self.limits[priority]:
+            if self.policy!=DROP_LOWEST or self._lengths[priority]==0:
+                return False
+            self._drop(priority) #over its own limit: the oldest of the same priority makes room
+            return True
+        if self._count<self.size:
+            return True
+        if self.policy!=DROP_LOWEST:
+            return False
+        lowest=_PRIORITIES - 1
+        while lowest>priority and self._heads[lowest]==_NONE:
+            lowest-=1
+        if self._heads[lowest]==_NONE:
+            return False
+        self._drop(lowest)
+        return True
+
+    def _drop(self, priority: int):
+        slot=self._pop(priority)
+        self._callbacks[slot]=None
+        self._release(slot)
+        self.drops[priority]+=1
+
+    def _pop(self, priority: int):
+        slot=self._heads[priority]
+        self._heads[priority]=self._next[slot]
+        if self._heads[priority]==_NONE:
+            self._tails[priority]=_NONE
+        self._lengths[priority]-=1
+        self._count-=1
+        if self._kinds[slot]==BUTTON_EVENT_REPEAT and self._repeatslots[self._indexes[slot]]==slot:
+            self._repeatslots[self._indexes[slot]]=_NONE
+        return slot
+
+    def _release(self, slot: int):
+        self._next[slot]=self._free
+        self._free=slot
+
+    def _schedule(self):
+        self._pending=True
+        try:
+            micropython.schedule(self._run_ref, 0)
+        except RuntimeError: #schedule queue full - the next event tries again
+            self._pending=False
+            self.schedulefailures+=1
+
+    def _run(self, arg):
+        #at most batchsize callbacks, schedule again for the rest so other scheduled work can run in between
+        self._pending=False
+        self.run(self.batchsize)
+        if self._count>0 and not self._pending:
+            self._schedule()
@@ -0,0 +1,96 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Fixed size ring buffer for pin edges: (button index, ticks_us, level)
+#The buffer is allocated once, put() does not allocate memory so it
+#can be used from a hard interrupt.
+#--------------------------------------------------------------------
+from array import array
+
+class EdgeBuffer():
+    """
+    Description
+    --------------------------------------------------------------------
+    Ring buffer with edges written by an interrupt handler and read
+    by a (scheduled) consumer. One writer and one reader, no locking.
+    When the buffer is full the edge is dropped and counted in overflows
+    --------------------------------------------------------------------
+
+    Usage
+    --------------------------------------------------------------------
+    #interrupt handler
+    edges.put(index, utime.ticks_us(), pin.value())
+
+    #consumer
+    while edges.count()>0:
+        print(edges.index(), edges.ticks(), edges.level())
+        edges.pop()
+    """
+
+    def __init__(self, size: int = 32):
+        """
+        @size: maximum number of edges waiting for the consumer
+        """
+        self.size=size
+        #one slot stays empty to tell a full buffer from an empty one
+        self._indexes=array('H', [0] * (size + 1))
+        self._levels=bytearray(size + 1)
+        self._ticks=array('I', [0] * (size + 1))
+        self._head=0
+        self._tail=0
+        self.overflows=0
+        self.highwater=0
+
+    def put(self, index: int, ticks: int, level: int):
+        """add an edge, returns False when the buffer is full"""
+        head=self._head + 1
+        if head>self.size:
+            head=0
+        if head==self._tail:
+            self.overflows+=1
+            return False
+        self._indexes[self._head]=index
+        self._ticks[self._head]=ticks
+        self._levels[self._head]=level
+        self._head=head
+        count=self.count()
+        if count>self.highwater:
+            self.highwater=count
+        return True
+
+    def count(self):
+        """number of edges in the buffer"""
+        count=self._head - self._tail
+        if count<0:
+            count+=self.size + 1
+        return count
+
+    def index(self):
+        """button index of the oldest edge"""
+        return self._indexes[self._tail]
+
+    def ticks(self):
+        """ticks_us of the oldest edge"""
+        return self._ticks[self._tail]
+
+    def level(self):
+        """pin level of the oldest edge"""
+        return self._levels[self._tail]
+
+    def pop(self):
+        """remove the oldest edge"""
+        if self._head!=self._tail:
+            tail=self._tail + 1
+            if tail>self.size:
+                tail=0
+            self._tail=tail
+
+    def clear(self):
+        """remove all edges and reset the counters"""
+        self._tail=self._head
+        self.overflows=0
+        self.highwater=0
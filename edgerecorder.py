@@ -0,0 +1,165 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Recorder of the raw pin edges of a PinMonitor, to reproduce on the
+#host (sim/replay.py) what a unit in the field saw.
+#Every edge is one 32 bit record in a preallocated array('I'):
+#
+#	bits 29..8  time since the previous edge in us (up to 4.19 s)
+#	bits 7..1   button index (0..126)
+#	bit 0       level after the edge
+#
+#The top 2 bits stay 0: on MicroPython a value up to 2^30 is a small
+#integer, so packing a record does not allocate.
+#
+#A longer gap is written as an extra pause record (index 127) with
+#the gap in units of 4096 us before the edge (ticks_us can measure
+#gaps up to about 9 minutes). record() does not
+#allocate, it can be called from a hard interrupt.
+#The records are kept in a ring: flush() writes the new records to an
+#open file from the main loop, save() and load() write and read a
+#whole trace (raw little endian records, the format of the rp2 and
+#the host).
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#recorder=EdgeRecorder(2048)
+#monitor.enablerecording(recorder)
+#...
+#recorder.save("field.edges")       #or: recorder.flush(file) in the main loop
+#--------------------------------------------------------------------
+import os
+import utime
+from array import array
+
+#record layout
+EDGE_LEVEL=const(1)
+EDGE_INDEX_SHIFT=const(1)
+EDGE_INDEX_MASK=const(0x7f)
+EDGE_DELTA_SHIFT=const(8)
+EDGE_DELTA_MAX=const(0x3fffff)
+EDGE_PAUSE=const(0x7f) #index of a pause record
+EDGE_PAUSE_SHIFT=const(12) #pause unit 4096 us
+
+class EdgeRecorder():
+    """
+    Description
+    --------------------------------------------------------------------
+    Ring of packed edge records, one writer (the interrupt handler) and
+    one reader (flush / records). When the ring is full new edges are
+    dropped and counted in overflows.
+    --------------------------------------------------------------------
+    overflows: edges dropped because the ring was full
+    """
+
+    def __init__(self, size: int = 1024):
+        """
+        @size: number of records kept, pause records included
+        """
+        self.size=size
+        #one slot stays empty to tell a full ring from an empty one
+        self._records=array('I', [0] * (size + 1))
+        self._head=0
+        self._tail=0
+        self._first=True
+        self._last=0
+        self.overflows=0
+
+    def record(self, index: int, ticks: int, level: int):
+        """add an edge of button index at ticks (ticks_us), returns False when it was dropped"""
+        if self._first:
+            delta=0
+        else:
+            delta=utime.ticks_diff(ticks, self._last)
+            if delta<0:
+                delta=0
+        #an edge with a pause takes two records: both fit or the edge is dropped, a pause alone would be counted again
+        if self.size - self.count()<(2 if delta>EDGE_DELTA_MAX else 1):
+            self.overflows+=1
+            return False
+        if delta>EDGE_DELTA_MAX:
+            pause=delta>>EDGE_PAUSE_SHIFT
+            if pause>EDGE_DELTA_MAX:
+                pause=EDGE_DELTA_MAX
+            self._put((pause<<EDGE_DELTA_SHIFT) | (EDGE_PAUSE<<EDGE_INDEX_SHIFT) | EDGE_LEVEL)
+            delta&=(1<<EDGE_PAUSE_SHIFT) - 1
+        self._put((delta<<EDGE_DELTA_SHIFT) | ((index & EDGE_INDEX_MASK)<<EDGE_INDEX_SHIFT) | (level & EDGE_LEVEL))
+        self._first=False
+        self._last=ticks
+        return True
+
+    def count(self):
+        """number of records in the ring"""
+        count=self._head - self._tail
+        if count<0:
+            count+=self.size + 1
+        return count
+
+    def records(self):
+        """the records in the ring as a new array('I'), oldest first - not in an interrupt"""
+        result=array('I')
+        tail=self._tail
+        while tail!=self._head:
+            result.append(self._records[tail])
+            tail+=1
+            if tail>self.size:
+                tail=0
+        return result
+
+    def flush(self, file):
+        """write the new records to an open binary file and remove them from the ring, returns the number written"""
+        head=self._head
+        tail=self._tail
+        view=memoryview(self._records)
+        written=0
+        if tail>head:
+            file.write(view[tail:self.size + 1])
+            written+=self.size + 1 - tail
+            tail=0
+        if tail<head:
+            file.write(view[tail:head])
+            written+=head - tail
+        self._tail=head
+        return written
+
+    def save(self, filename: str):
+        """write all records in the ring to filename"""
+        with open(filename, "wb") as file:
+            file.write(self.records())
+
+    def clear(self):
+        """remove all records, the next edge starts a new trace"""
+        self._tail=self._head
+        self._first=True
+        self.overflows=0
+
+    def _put(self, value: int):
+        #record() checked the room
+        self._records[self._head]=value
+        head=self._head + 1
+        if head>self.size:
+            head=0
+        self._head=head
+
+def load(filename: str):
+    """records of a trace file as array('I')"""
+    records=array('I', [0] * (os.stat(filename)[6] // 4))
+    with open(filename, "rb") as file:
+        file.readinto(records)
+    return records
+
+def edges(records):
+    """generator of (time_us since the first edge, index, level) of the records"""
+    at=0
+    for value in records:
+        index=(value>>EDGE_INDEX_SHIFT) & EDGE_INDEX_MASK
+        if index==EDGE_PAUSE:
+            at+=(value>>EDGE_DELTA_SHIFT)<<EDGE_PAUSE_SHIFT
+            continue
+        at+=value>>EDGE_DELTA_SHIFT
+        yield at, index, value & EDGE_LEVEL
@@ -0,0 +1,304 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Gesture engine for PinMonitor: the pins get interrupts on the rising
+#and the falling edge, every press and release is timestamped, so the
+#press duration is exact and a release is seen when it happens instead
+#of by polling the pin every repeatdelay.
+#
+#Gestures of a button:
+#-click, doubleclick, N-click
+#	The clicks are counted until no new press follows within
+#	countdownperiodms*dblclickcountdownfrom after a release. During that
+#	window ondoubleclickcountdown is called every countdownperiodms.
+#	Then 1 click calls onclicked, 2 ondoubleclicked and 3 or more
+#	onnclicked, with the number of clicks in event.clicks.
+#-long press
+#	Held for longpressms: onlongpress. While it is held onclicked is
+#	repeated every repeatdelay (repeatdelay>0).
+#-held and released
+#	Released after a long press: onheldreleased, with the press
+#	duration in event.durationms.
+#
+#With tickless=True a window without ondoubleclickcountdown wakes up
+#once at its end. A release is an edge, the pin is never polled.
+#
+#Debounce: an edge is accepted when the level differs from the last
+#accepted level and the line was quiet for settlems (or the window of
+#the AdaptiveDebounce of the button): no edge in that time before it.
+#A rejected edge is not lost: settlems after the last edge of a burst
+#the pin is read again, a level that differs from the accepted level
+#is the missed press or release. The check shares the slot of the
+#button in the timer wheel with the gesture deadline.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#monitor=GestureMonitor()
+#pinbutton=PinButton(Pin(18, Pin.IN, Pin.PULL_DOWN), clicked, doubleclicked, None, 300, 1)
+#pinbutton.onnclicked=nclicked
+#pinbutton.onlongpress=longpress
+#pinbutton.onheldreleased=heldreleased
+#monitor.registerpinbutton(pinbutton)
+#--------------------------------------------------------------------
+import utime
+from array import array
+from machine import Timer
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from tracebuffer import TRACE_LEAVE
+from buttonmetrics import METRIC_EDGES, METRIC_ACCEPTED, METRIC_REJECTED, METRIC_TIMERS, HISTOGRAM_JITTER
+from buttonevent import BUTTON_EVENT_CLICKED, BUTTON_EVENT_REPEAT, BUTTON_EVENT_DOUBLECLICKED, BUTTON_EVENT_COUNTDOWN, BUTTON_EVENT_LONGPRESS, BUTTON_EVENT_NCLICKED, BUTTON_EVENT_HELDRELEASED
+
+_TRACE=const(1)
+
+GESTURE_STATE_IDLE=const(0)
+GESTURE_STATE_PRESSED=const(1)
+GESTURE_STATE_HELD=const(2)
+GESTURE_STATE_RELEASED=const(3)
+
+#trace sites, following the sites of PinMonitor
+SITE_PRESS=const(20)
+SITE_RELEASE=const(22)
+SITE_DEADLINE=const(24)
+
+class GestureMonitor(PinMonitor):
+    """
+    Description
+    --------------------------------------------------------------------
+    PinMonitor that recognizes gestures from both edges of the pins.
+    The buttons use the callbacks of PinButton, see the header.
+    --------------------------------------------------------------------
+    settlems: debounce window of buttons without an AdaptiveDebounce
+    """
+    dualedge=True
+    settlems: int = 20
+
+    _states=[ \
+        "GESTURE_STATE_IDLE" \
+        , "GESTURE_STATE_PRESSED" \
+        , "GESTURE_STATE_HELD" \
+        , "GESTURE_STATE_RELEASED" \
+        ]
+
+    _sites=PinMonitor._sites + [ \
+        "_press" \
+        , "_release" \
+        , "_deadline" \
+        ]
+
+    def __init__(self, timer: Timer = None):
+        """
+        @timer: Timer for the deadlines of the buttons of this monitor, default a virtual Timer(-1)
+        """
+        super().__init__(timer)
+        #per button index: accepted level, clicks, ticks_us of the last edge and of the press
+        self._level=bytearray(0)
+        self._clicks=bytearray(0)
+        self._edgeus=array('i')
+        self._pressus=array('i')
+        #per button index: gesture deadline and end of the settle window (ticks_ms), both share the wheel slot
+        self._due=array('i')
+        self._duepending=bytearray(0)
+        self._settleat=array('i')
+        self._settling=bytearray(0)
+
+    def registerpinbutton(self, pinbutton: PinButton):
+        #the arrays have room for the index before the interrupt is installed
+        while len(self._level)<=len(self._pinbuttons):
+            self._level.append(0)
+            self._clicks.append(0)
+            self._edgeus.append(0)
+            self._pressus.append(0)
+            self._due.append(0)
+            self._duepending.append(0)
+            self._settleat.append(0)
+            self._settling.append(0)
+        super().registerpinbutton(pinbutton)
+        index=pinbutton.index
+        self._level[index]=1 if pinbutton.pin.value() else 0
+        self._clicks[index]=0
+        self._edgeus[index]=utime.ticks_add(utime.ticks_us(), -1000000) #the first edge is not in a settle window
+
+    def _reset(self, pinbutton: PinButton):
+        self._duepending[pinbutton.index]=0
+        self._settling[pinbutton.index]=0
+        super()._reset(pinbutton)
+        self._clicks[pinbutton.index]=0
+
+    def _edge(self, pinbutton: PinButton, level: int = -1, ticks: int = 0):
+        #level and ticks (ticks_us) are known in deferred mode, otherwise they are read now
+        if level<0:
+            level=1 if pinbutton.pin.value() else 0
+            ticks=utime.ticks_us()
+        index=pinbutton.index
+        window=self.settlems
+        if pinbutton.debounce!=None:
+            pinbutton.debounce.edge(level, ticks) #learn the bursts
+            window=pinbutton.debounce.windowms
+        accepted=level!=self._level[index] and utime.ticks_diff(ticks, self._edgeus[index])>=window * 1000
+        self._edgeus[index]=ticks
+        if self._metrics!=None:
+            metrics=self._metrics[index]
+            metrics.count(METRIC_EDGES)
+            metrics.count(METRIC_ACCEPTED if accepted else METRIC_REJECTED)
+        if not accepted:
+            #bounce: read the pin again when the line is quiet for the window, every edge moves the check
+            remainingus=window * 1000 - utime.ticks_diff(utime.ticks_us(), ticks)
+            self._settleat[index]=utime.ticks_add(utime.ticks_ms(), (remainingus + 999) // 1000 if remainingus>0 else 0)
+            self._settling[index]=1
+            self._arm(index)
+            return
+        self._accept(pinbutton, level, ticks)
+
+    def _accept(self, pinbutton: PinButton, level: int, ticks: int):
+        index=pinbutton.index
+        self._level[index]=level
+        self._edgeus[index]=ticks
+        if self._settling[index]:
+            self._settling[index]=0 #the window starts again at this edge
+            self._arm(index)
+        if level:
+            self._press(pinbutton, ticks)
+        else:
+            self._release(pinbutton, ticks)
+
+    def _settled(self, pinbutton: PinButton):
+        #end of the settle window: the last edge in the window may have changed the level
+        level=1 if pinbutton.pin.value() else 0
+        if level!=self._level[pinbutton.index]:
+            self._accept(pinbutton, level, utime.ticks_us())
+
+    def _timer_expired(self, index):
+        pinbutton=self._pinbuttons[index]
+        if pinbutton==None:
+            return
+        now=utime.ticks_ms()
+        if self._settling[index] and utime.ticks_diff(self._settleat[index], now)<=0:
+            self._settling[index]=0
+            self._settled(pinbutton)
+        if self._duepending[index] and utime.ticks_diff(self._due[index], now)<=0:
+            self._duepending[index]=0
+            if self._metrics!=None:
+                metrics=self._metrics[index]
+                metrics.count(METRIC_TIMERS)
+                metrics.record(HISTOGRAM_JITTER, utime.ticks_diff(now, self._due[index]))
+            self._deadline(pinbutton)
+        self._arm(index)
+
+    def _arm(self, index: int):
+        #the wheel slot of the button follows the earliest of the gesture deadline and the settle check
+        if self._settling[index]:
+            deadline=self._settleat[index]
+            if self._duepending[index] and utime.ticks_diff(self._due[index], deadline)<0:
+                deadline=self._due[index]
+        elif self._duepending[index]:
+            deadline=self._due[index]
+        else:
+            self._wheel.cancel(index)
+            return
+        self._wheel.schedule(index, 0, deadline)
+
+    def _at(self, index: int, deadline: int):
+        #gesture deadline of the button in ticks_ms
+        self._due[index]=deadline
+        self._duepending[index]=1
+        self._arm(index)
+
+    def _cancel(self, index: int):
+        self._duepending[index]=0
+        self._arm(index)
+
+    def _schedule(self, pinbutton: PinButton, periodms: int, ticks: int):
+        #deadline periodms after the edge at ticks (ticks_us), the time the edge waited is subtracted
+        waitedms=utime.ticks_diff(utime.ticks_us(), ticks) // 1000
+        self._at(pinbutton.index, utime.ticks_add(utime.ticks_ms(), periodms - waitedms if waitedms<periodms else 0))
+
+    def _press(self, pinbutton: PinButton, ticks: int):
+        if _TRACE and self.tracing:
+            self._trace(SITE_PRESS, pinbutton)
+        index=pinbutton.index
+        if pinbutton.state==GESTURE_STATE_RELEASED:
+            if self._countdown_silent(pinbutton) and self._duepending[index]:
+                #next click within the window: the periods that passed would each have been a wakeup
+                start=utime.ticks_add(self._due[index], -pinbutton.countdownperiodms * pinbutton.countdownvalue)
+                self.avoidedwakeups+=utime.ticks_diff(utime.ticks_ms(), start) // pinbutton.countdownperiodms
+            if self._clicks[index]<255:
+                self._clicks[index]+=1
+        else:
+            self._clicks[index]=1
+        self._pressus[index]=ticks
+        pinbutton.lastclick_ticks=utime.ticks_ms()
+        pinbutton.state=GESTURE_STATE_PRESSED
+        self._schedule(pinbutton, pinbutton.longpressms, ticks)
+        if _TRACE and self.tracing:
+            self._trace(SITE_PRESS|TRACE_LEAVE, pinbutton)
+
+    def _release(self, pinbutton: PinButton, ticks: int):
+        if _TRACE and self.tracing:
+            self._trace(SITE_RELEASE, pinbutton)
+        index=pinbutton.index
+        if pinbutton.state==GESTURE_STATE_PRESSED:
+            #short press: wait for the next click, counting down the window
+            pinbutton.state=GESTURE_STATE_RELEASED
+            pinbutton.countdownvalue=pinbutton.dblclickcountdownfrom
+            if self._countdown_silent(pinbutton):
+                #nobody counts along: one wakeup at the end of the window instead of one per period
+                self._schedule(pinbutton, pinbutton.countdownperiodms * pinbutton.countdownvalue, ticks)
+            else:
+                self._schedule(pinbutton, pinbutton.countdownperiodms, ticks)
+        elif pinbutton.state==GESTURE_STATE_HELD:
+            self._cancel(index)
+            pinbutton.state=GESTURE_STATE_IDLE
+            self._clicks[index]=0
+            if pinbutton.onheldreleased!=None or self.listener!=None:
+                self._notify(pinbutton, BUTTON_EVENT_HELDRELEASED, pinbutton.onheldreleased, 1, utime.ticks_diff(ticks, self._pressus[index]) // 1000)
+        if _TRACE and self.tracing:
+            self._trace(SITE_RELEASE|TRACE_LEAVE, pinbutton)
+
+    def _deadline(self, pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEADLINE, pinbutton)
+        index=pinbutton.index
+        state=pinbutton.state
+        if state==GESTURE_STATE_PRESSED:
+            pinbutton.state=GESTURE_STATE_HELD
+            if pinbutton.repeatdelay>0 and (pinbutton.onclicked!=None or self.listener!=None):
+                self._at(index, utime.ticks_add(self._due[index], pinbutton.repeatdelay))
+            if pinbutton.onlongpress!=None or self.listener!=None:
+                self._notify(pinbutton, BUTTON_EVENT_LONGPRESS, pinbutton.onlongpress, self._clicks[index], pinbutton.longpressms)
+        elif state==GESTURE_STATE_HELD:
+            #repeat while held, scheduled from the previous deadline so it does not drift
+            self._at(index, utime.ticks_add(self._due[index], pinbutton.repeatdelay))
+            self._notify(pinbutton, BUTTON_EVENT_REPEAT, pinbutton.onclicked, self._clicks[index], utime.ticks_diff(utime.ticks_us(), self._pressus[index]) // 1000)
+        elif state==GESTURE_STATE_RELEASED:
+            if self._countdown_silent(pinbutton):
+                self.avoidedwakeups+=pinbutton.countdownvalue - 1 #one wakeup per period would have counted down
+                pinbutton.countdownvalue=1 #the periods in between were skipped
+            pinbutton.countdownvalue-=1
+            if pinbutton.countdownvalue>0:
+                self._at(index, utime.ticks_add(self._due[index], pinbutton.countdownperiodms))
+            if pinbutton.ondoubleclickcountdown!=None or self.listener!=None:
+                self._notify(pinbutton, BUTTON_EVENT_COUNTDOWN, pinbutton.ondoubleclickcountdown, self._clicks[index])
+            if pinbutton.countdownvalue<=0:
+                self._finish(pinbutton)
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEADLINE|TRACE_LEAVE, pinbutton)
+
+    def _finish(self, pinbutton: PinButton):
+        #no next click within the window: the number of clicks decides the callback
+        clicks=self._clicks[pinbutton.index]
+        self._clicks[pinbutton.index]=0
+        pinbutton.state=GESTURE_STATE_IDLE
+        if clicks==1:
+            if pinbutton.onclicked!=None or self.listener!=None:
+                self._notify(pinbutton, BUTTON_EVENT_CLICKED, pinbutton.onclicked, clicks)
+        elif clicks==2:
+            if pinbutton.ondoubleclicked!=None or self.listener!=None:
+                self._notify(pinbutton, BUTTON_EVENT_DOUBLECLICKED, pinbutton.ondoubleclicked, clicks)
+        elif pinbutton.onnclicked!=None or self.listener!=None:
+            self._notify(pinbutton, BUTTON_EVENT_NCLICKED, pinbutton.onnclicked, clicks)
@@ -0,0 +1,323 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Scanning engines for many keys on a few gpio's, built on
+#PollingMonitor: every period one timer scans all keys into one
+#integer (a bit per key), the vertical counters debounce them and the
+#keys behave like a PinButton (click, doubleclick, countdown, repeat).
+#
+#-MatrixScanner
+#	key matrix: the rows are driven one by one, the columns are read.
+#	Without diodes 3 pressed keys on the corners of a rectangle make a
+#	4th (ghost) key appear: such scans are rejected and counted.
+#	An optional rollover limit rejects scans with too many keys.
+#
+#-ShiftRegisterScanner
+#	chain of 74HC165 parallel in / serial out shift registers: load,
+#	clock and data pin, or a machine.SPI bus for the clock and data.
+#
+#A key is used with a KeyPin in place of the Pin of a PinButton:
+#scanner.registerpinbutton(PinButton(scanner.keypin(row, column), ...))
+#
+#The bank is kept in fixed arrays of words of at most 30 bits (a word
+#per matrix row, a word per 74HC165) with the vertical counters per
+#word: on MicroPython an integer above 30 bits is allocated on the
+#heap, words keep a scan of any number of keys allocation free.
+#--------------------------------------------------------------------
+import utime
+from array import array
+from machine import Pin, Timer
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from pollingmonitor import PollingMonitor, gpio_number
+
+#bits per word of the bank: MicroPython small integers have 31 bits
+WORD_BITS=const(30)
+
+class KeyPin():
+    """
+    Description
+    --------------------------------------------------------------------
+    Pin-like key of a scanner: value() is the debounced level of the key.
+    id() is the bit of the key in the scanner, used by registerpinbutton
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, scanner, bit: int, name: str):
+        self._scanner=scanner
+        self._bit=bit
+        self._word=bit // scanner._wordbits
+        self._shift=bit % scanner._wordbits
+        self._name=name
+
+    def __repr__(self):
+        return self._name
+
+    def id(self):
+        return self._bit
+
+    def value(self):
+        return (self._scanner.debounced[self._word]>>self._shift) & 1
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        pass #scanned, no interrupt
+
+class WordScanner(PollingMonitor):
+    """
+    Description
+    --------------------------------------------------------------------
+    Base of the scanners: PollingMonitor with the bank in words. Key bit
+    n is bit n % wordbits of word n // wordbits, every word is debounced
+    with its own vertical counters. A subclass fills _bank in _scan().
+    --------------------------------------------------------------------
+    debounced: array with the debounced level per word
+    """
+
+    def __init__(self, words: int, wordbits: int, periodms: int = 5, timer: Timer = None):
+        """
+        @words: number of words in the bank
+        @wordbits: keys per word, at most WORD_BITS
+        @periodms: scan period, a level has to be stable for 4 periods
+        @timer: Timer for scanning, default a virtual Timer(-1)
+        """
+        if wordbits>WORD_BITS:
+            raise ValueError("{} keys per word, at most {}".format(wordbits, WORD_BITS))
+        super().__init__(periodms, self._scan, timer)
+        self._words=words
+        self._wordbits=wordbits
+        self._bank=array('i', [0] * words)
+        #the PollingMonitor state, one entry per word
+        self.debounced=array('i', [0] * words)
+        self._mask=array('i', [0] * words)
+        self._invert=array('i', [0] * words)
+        self._ct0=array('i', [0] * words)
+        self._ct1=array('i', [0] * words)
+
+    def registerpinbutton(self, pinbutton: PinButton, bit: int = -1, activelow: bool = False):
+        """
+        @pinbutton: button with a KeyPin of this scanner
+        @bit: bit of the key, default the id() of the KeyPin
+        @activelow: the key reads 0 when pressed
+        """
+        PinMonitor.registerpinbutton(self, pinbutton)
+        if bit<0:
+            bit=gpio_number(pinbutton.pin)
+        while len(self._bitbuttons)<=bit:
+            self._bitbuttons.append(None)
+        self._bitbuttons[bit]=pinbutton
+        while len(self._buttonbits)<=pinbutton.index:
+            self._buttonbits.append(0)
+        self._buttonbits[pinbutton.index]=bit
+        word=bit // self._wordbits
+        mask=1<<(bit % self._wordbits)
+        if activelow:
+            self._invert[word]|=mask
+        else:
+            self._invert[word]&=~mask
+        #start stable: counters at rest and the debounced level is the current level
+        self._ct0[word]|=mask
+        self._ct1[word]|=mask
+        self._scan()
+        self.debounced[word]=(self.debounced[word] & ~mask) | ((self._bank[word] ^ self._invert[word]) & mask)
+        self._mask[word]|=mask
+        self.start()
+
+    def unregisterpin(self, pinbutton: PinButton):
+        bit=self._bitbuttons.index(pinbutton)
+        word=bit // self._wordbits
+        mask=1<<(bit % self._wordbits)
+        self._mask[word]&=~mask
+        self.debounced[word]&=~mask
+        self._bitbuttons[bit]=None
+        PinMonitor.unregisterpin(self, pinbutton)
+        if not any(self._mask):
+            self.stop()
+
+    def _scan(self):
+        pass #filled in by the scanner
+
+    def _pressed(self, pinbutton: PinButton):
+        bit=self._buttonbits[pinbutton.index]
+        return (self.debounced[bit // self._wordbits]>>(bit % self._wordbits)) & 1==1
+
+    def _poll(self,timerobject):
+        self._scan()
+        bank=self._bank
+        debounced=self.debounced
+        ct0=self._ct0
+        ct1=self._ct1
+        for word in range(self._words):
+            mask=self._mask[word]
+            changed=(debounced[word] ^ bank[word] ^ self._invert[word]) & mask
+            #vertical counter: reset where nothing changed, count where it did
+            ct0[word]=~(ct0[word] & changed) & mask
+            ct1[word]=(ct0[word] ^ (ct1[word] & changed)) & mask
+            toggle=changed & ct0[word] & ct1[word]
+            if toggle:
+                debounced[word]^=toggle
+                self._edges(toggle & debounced[word], word * self._wordbits)
+
+class MatrixScanner(WordScanner):
+    """
+    Description
+    --------------------------------------------------------------------
+    Key matrix scanner. The rows are made output (high) one at a time,
+    the columns are inputs with pull down. A row is a word of the bank:
+    key (row, column) is bit row*len(columns)+column, at most WORD_BITS
+    columns.
+    --------------------------------------------------------------------
+    ghosts: number of scans rejected because of possible ghost keys
+    rollovers: number of scans rejected because of too many keys
+    maxpressed: highest number of keys pressed at the same time
+    """
+
+    def __init__(self, rows, columns, periodms: int = 5, diodes: bool = False, rollover: int = 0, settleus: int = 0, timer: Timer = None):
+        """
+        @rows: list of Pin, driven by the scanner
+        @columns: list of Pin, inputs with pull down, at most WORD_BITS
+        @periodms: scan period
+        @diodes: the matrix has a diode per key, no ghost keys possible
+        @rollover: maximum number of keys pressed together, 0 is no limit
+        @settleus: wait after driving a row before reading the columns
+        @timer: Timer for scanning, default a virtual Timer(-1)
+        """
+        super().__init__(len(rows), len(columns), periodms, timer)
+        self._rows=rows
+        self._columns=columns
+        self._diodes=diodes
+        self._rollover=rollover
+        self._settleus=settleus
+        self._rowbits=array('i', [0] * len(rows)) #this scan, copied to the bank when accepted
+        self.ghosts=0
+        self.rollovers=0
+        self.maxpressed=0
+        for row in rows:
+            row.init(Pin.IN)
+        for column in columns:
+            column.init(Pin.IN, Pin.PULL_DOWN)
+
+    def keypin(self, row: int, column: int):
+        """KeyPin of key (row, column) to use in a PinButton"""
+        return KeyPin(self, row * len(self._columns) + column, "Key({},{})".format(row, column))
+
+    def _scan(self):
+        columns=self._columns
+        width=len(columns)
+        rowbits=self._rowbits
+        for r in range(len(self._rows)):
+            row=self._rows[r]
+            row.init(Pin.OUT, value=1)
+            if self._settleus>0:
+                utime.sleep_us(self._settleus)
+            bits=0
+            for c in range(width):
+                if columns[c].value():
+                    bits|=1<<c
+            row.init(Pin.IN) #high impedance, a pressed key can not short two driven rows
+            rowbits[r]=bits
+        #a rejected scan leaves the bank at the last accepted scan
+        if not self._diodes and self._ghosting():
+            self.ghosts+=1
+            return
+        pressed=0
+        for r in range(len(rowbits)):
+            pressed+=self._count(rowbits[r])
+        if pressed>self.maxpressed:
+            self.maxpressed=pressed
+        if self._rollover>0 and pressed>self._rollover:
+            self.rollovers+=1
+            return
+        bank=self._bank
+        for r in range(len(rowbits)):
+            bank[r]=rowbits[r]
+
+    def _ghosting(self):
+        #two rows with 2 or more columns in common: one of the 4 keys may be a ghost
+        rowbits=self._rowbits
+        for a in range(len(rowbits) - 1):
+            if rowbits[a]==0:
+                continue
+            for b in range(a + 1, len(rowbits)):
+                common=rowbits[a] & rowbits[b]
+                if common & (common - 1):
+                    return True
+        return False
+
+    def _count(self, bits):
+        count=0
+        while bits:
+            bits&=bits - 1
+            count+=1
+        return count
+
+class ShiftRegisterScanner(WordScanner):
+    """
+    Description
+    --------------------------------------------------------------------
+    Scanner for a chain of 74HC165 shift registers. The first bit
+    shifted out is bit 0, a 74HC165 is a word of the bank. Use a machine.SPI (mode 0, MISO on QH) for a
+    fast read, or the clock and data pins for a bit banged read.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, load: Pin, bits: int, clock: Pin = None, data: Pin = None, spi = None, periodms: int = 5, timer: Timer = None):
+        """
+        @load: Pin on SH/LD (active low)
+        @bits: number of inputs, 8 per 74HC165
+        @clock: Pin on CLK (bit banged)
+        @data: Pin on QH (bit banged)
+        @spi: machine.SPI with QH on MISO, in place of clock and data
+        @periodms: scan period
+        @timer: Timer for scanning, default a virtual Timer(-1)
+        """
+        super().__init__((bits + 7) // 8, 8, periodms, timer)
+        self._load=load
+        self._bits=bits
+        self._clock=clock
+        self._data=data
+        self._spi=spi
+        self._buffer=bytearray((bits + 7) // 8)
+        load.init(Pin.OUT, value=1)
+        if clock!=None:
+            clock.init(Pin.OUT, value=0)
+        if data!=None:
+            data.init(Pin.IN)
+
+    def keypin(self, bit: int):
+        """KeyPin of input bit to use in a PinButton"""
+        return KeyPin(self, bit, "Key({})".format(bit))
+
+    def _scan(self):
+        #parallel load: SH/LD low latches the inputs
+        self._load.value(0)
+        self._load.value(1)
+        bank=self._bank
+        if self._spi!=None:
+            self._spi.readinto(self._buffer)
+            for i in range(len(self._buffer)):
+                byte=self._buffer[i]
+                word=0
+                for b in range(8):
+                    if byte & (0x80>>b):
+                        word|=1<<b
+                bank[i]=word
+            if self._bits & 7:
+                bank[-1]&=(1<<(self._bits & 7)) - 1
+            return
+        clock=self._clock
+        data=self._data
+        word=0
+        for bit in range(self._bits):
+            if data.value():
+                word|=1<<(bit & 7)
+            clock.value(1)
+            clock.value(0)
+            if bit & 7==7:
+                bank[bit>>3]=word
+                word=0
+        if self._bits & 7:
+            bank[-1]=word
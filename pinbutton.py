@@ -9,18 +9,25 @@
 #--------------------------------------------------------------------
 from machine import Pin
 from debugableitem import DebugableItem
+from buttonevent import BUTTON_EVENT_CLICKED, BUTTON_EVENT_DOUBLECLICKED, BUTTON_EVENT_LONGPRESS
+
+#defaults
+COUNTDOWNPERIODMS=const(500)
+DBLCLICKCOUNTDOWNFROM=const(1)
+STARTDELAY=const(200)
+REPEATDELAY=const(100)
+LONGPRESSMS=const(1000)
 
 class PinButton(DebugableItem):
-    onclicked=None
-    ondoubleclicked=None
-    ondoubleclickcountdown=None
-    countdownperiodms:int = 500
-    dblclickcountdownfrom: int = 1
-    startdelay: int=200
-    repeatdelay:int =100
-    countdownvalue: int = 0
-    
-    pin: Pin=None
+    #fixed set of attributes: compact instances, no attribute can be added in an interrupt
+    __slots__=( \
+        "pin", "onclicked", "ondoubleclicked", "ondoubleclickcountdown" \
+        , "countdownperiodms", "dblclickcountdownfrom", "startdelay", "repeatdelay", "countdownvalue" \
+        , "debounce", "onlongpress", "onnclicked", "onheldreleased", "longpressms" \
+        , "state", "timerkind", "lastclick_ticks", "index", "event", "monitor" \
+        , "debug", "debugger" \
+        )
+
     def __init__(self, pin: Pin, onclicked, ondoubleclicked, ondoubleclickcountdown, countdownperiodms: int, dblclickcountdownfrom: int):
         """
         @pin: Pin instance - irq based
@@ -34,7 +41,48 @@ class PinButton(DebugableItem):
         self.onclicked=onclicked
         self.ondoubleclicked=ondoubleclicked
         self.ondoubleclickcountdown=ondoubleclickcountdown
+        self.countdownperiodms=COUNTDOWNPERIODMS
+        self.dblclickcountdownfrom=DBLCLICKCOUNTDOWNFROM
+        self.startdelay=STARTDELAY
+        self.repeatdelay=REPEATDELAY
+        self.countdownvalue=0
         if (countdownperiodms > 0):
             self.countdownperiodms = countdownperiodms
         if (dblclickcountdownfrom > 0):
-            self.dblclickcountdownfrom = dblclickcountdownfrom
\ No newline at end of file
+            self.dblclickcountdownfrom = dblclickcountdownfrom
+        self.debounce=None #AdaptiveDebounce in place of the fixed startdelay, set before registering
+
+        #gestures - only used by a GestureMonitor (gesturemonitor.py)
+        self.onlongpress=None #held for longpressms
+        self.onnclicked=None #3 or more clicks, the number is in event.clicks
+        self.onheldreleased=None #released after a long press, the duration is in event.durationms
+        self.longpressms=LONGPRESSMS
+
+        #state of the button - maintained by the PinMonitor the button is registered at
+        self.state=0
+        self.timerkind=0
+        self.lastclick_ticks=-1
+        self.index=-1
+        self.event=None #ButtonEvent of the current callback
+        self.monitor=None #PinMonitor the button is registered at
+
+        #DebugableItem - slots shadow its class defaults
+        self.debug=False
+        self.debugger=None
+
+    #asyncio - the button has to be registered, see PinMonitor.events()
+    def wait(self, *kinds):
+        """awaitable: the next event of this button of one of the kinds BUTTON_EVENT_*"""
+        return self.monitor.events().wait(self, *kinds)
+
+    def clicked(self):
+        """awaitable: the next click of this button"""
+        return self.wait(BUTTON_EVENT_CLICKED)
+
+    def doubleclicked(self):
+        """awaitable: the next double click of this button"""
+        return self.wait(BUTTON_EVENT_DOUBLECLICKED)
+
+    def longpressed(self):
+        """awaitable: the next long press of this button (GestureMonitor)"""
+        return self.wait(BUTTON_EVENT_LONGPRESS)
@@ -9,7 +9,77 @@
 #with interrupt.
 #The main goal is to monitor multiple buttons. Because the number
 #of timers is limited a single timer is used for monitoring
-#several buttons.
+#several buttons. Every button has its own state and deadline, the
+#deadlines of all buttons are serviced by a timer wheel (timerwheel.py)
+#so buttons that are pressed at the same time do not disturb each other.
+#Every PinMonitor instance has its own buttons and timer, the load can
+#be spread over several monitors.
+#
+#Interrupt and timer context: the edge handlers and timer callbacks of
+#the monitor and of its helpers (buffers, timer wheel, queues, trace,
+#recorder, scanners) do not allocate memory, so they can run in a hard
+#interrupt. What they write exists before the first edge: counters are
+#instance attributes set in __init__ (a new attribute allocates), a
+#bound method given to an irq, Timer or micropython.schedule is made
+#once and kept in an attribute (self._drain_ref), buffers are arrays.
+#
+#-deferred processing
+#	After enabledeferred() the interrupt handler only stores the edge
+#	in a ring buffer (edgebuffer.py). The state machine and the
+#	callbacks run later from micropython.schedule, so the handler can
+#	be a hard interrupt.
+#
+#-adaptive debounce
+#	A button with an AdaptiveDebounce (pinbutton.debounce) gets interrupts
+#	on both edges. Bounce is filtered by the bursts of the switch itself
+#	and the debounce window follows the measured settle time
+#	(adaptivedebounce.py) instead of the fixed startdelay.
+#
+#-metrics
+#	After enablemetrics() every button counts edges seen, accepted and
+#	rejected while debouncing, and keeps histograms of edge to dispatch
+#	latency, callback execution time and timer lateness (buttonmetrics.py)
+#
+#-tickless
+#	The timer wheel arms one one-shot timer for the earliest deadline of
+#	all buttons. With tickless=True the deadlines nobody listens to are
+#	skipped: a countdown without ondoubleclickcountdown wakes up once at
+#	its end, pinbutton.countdownvalue is then only updated at the end.
+#	A held button without onclicked is not polled every repeatdelay for
+#	its release: the next edge is a new press. Without tickless a press
+#	shortly after the release can still be taken for the held button.
+#	Otherwise the callbacks are the same as without tickless.
+#	The skipped countdown periods are counted when the countdown ends or
+#	a double click cancels it. The count is an upper bound: the periods
+#	of different buttons are added up, without tickless some of them
+#	would have shared a wakeup of the wheel. Skipped repeat polls are
+#	not counted.
+#	idle() sleeps (machine.lightsleep) until the next deadline,
+#	wakeupstats() reports the timer wakeups and the avoided wakeups.
+#
+#-dispatch queue
+#	After enabledispatch() the callbacks are queued with a priority
+#	(dispatchqueue.py): double clicks and the end of a countdown before
+#	clicks, repeats last and coalesced, so a slow callback does not make
+#	the timer deadlines slip.
+#
+#-asyncio
+#	events() returns a stream (buttonstream.py) for 'async for event in
+#	monitor.events()' and 'await pinbutton.clicked()'. The callbacks
+#	only copy the event into a bounded queue, the application code runs
+#	as a coroutine.
+#
+#-recording
+#	After enablerecording() every raw edge of the pins is written to
+#	an EdgeRecorder (edgerecorder.py) as a packed 32 bit record, before
+#	debouncing. A trace of a unit in the field can be replayed on the
+#	host with sim/replay.py.
+#
+#-tracing
+#	Every trace site is guarded by 'if _TRACE and self.tracing', the
+#	arguments are only evaluated when debug output or the binary trace
+#	(enabletrace()) is on. For a stripped build set _TRACE to const(0),
+#	the compiler then removes all trace sites.
 #
 #-debounce
 #	debounce the interrupts: Ignore interrupt calls during a delay
@@ -30,10 +100,22 @@ import micropython
 from machine import Timer
 from machine import Pin
 import utime
+try:
+    from machine import lightsleep
+except ImportError: #port without lightsleep: idle() uses utime.sleep_ms
+    lightsleep=None
 from debugableitem import DebugableItem
 from pinbutton import PinButton
+from timerwheel import TimerWheel
+from edgebuffer import EdgeBuffer
+from tracebuffer import TraceBuffer, TRACE_LEAVE
+from buttonmetrics import ButtonMetrics, METRIC_EDGES, METRIC_ACCEPTED, METRIC_REJECTED, METRIC_CALLBACKS, METRIC_TIMERS, HISTOGRAM_LATENCY, HISTOGRAM_CALLBACK, HISTOGRAM_JITTER
+from dispatchqueue import DispatchQueue, DROP_LOWEST
+from buttonevent import ButtonEvent, BUTTON_EVENT_CLICKED, BUTTON_EVENT_REPEAT, BUTTON_EVENT_DOUBLECLICKED, BUTTON_EVENT_COUNTDOWN
 
 #constants
+_TRACE=const(1)
+
 BUTTON_STATE_SINGLECLICK_WAIT=const(0)
 BUTTON_STATE_SINGLECLICK_DEBOUNCING=const(1)
 BUTTON_STATE_SINGLECLICK_DEBOUNCED=const(2)
@@ -45,18 +127,85 @@ BUTTON_STATE_REPEAT_WAIT=const(7)
 BUTTON_STATE_REPEAT_DEBOUNCING=const(8)
 BUTTON_STATE_REPEAT_DEBOUNCED=const(9)
 
+#kind of deadline a button is waiting for
+TIMER_DEBOUNCE=const(0)
+TIMER_COUNTDOWN=const(1)
+TIMER_REPEAT=const(2)
+TIMER_NONE=const(3) #REPEAT_WAIT without a timer, see tickless
+
+#state machine engines - see PinMonitor.engine
+ENGINE_LADDER=const(0)
+ENGINE_TABLE=const(1)
+
+#events of the table engine
+EVENT_EDGE=const(0)
+EVENT_TIMER=const(1)
+
+#actions of the table engine, index in PinMonitor._actions
+ACTION_IGNORE=const(0)
+ACTION_CLICK=const(1)
+ACTION_REST=const(2)
+ACTION_DEBOUNCED=const(3)
+ACTION_COUNTDOWN_START=const(4)
+ACTION_DOUBLECLICK=const(5)
+ACTION_COUNTDOWN_TICK=const(6)
+ACTION_COUNTDOWN_ENDED=const(7)
+ACTION_REPEAT=const(8)
+
+#trace sites, the lowest bit is reserved for TRACE_LEAVE
+SITE_PROCESS_STATE=const(0)
+SITE_DISPATCH=const(2)
+SITE_DEBOUNCE_TIMER_START=const(4)
+SITE_DEBOUNCE_TIMER_KILL=const(6)
+SITE_COUNTDOWN_TIMER_START=const(8)
+SITE_COUNTDOWN_TIMER_KILL=const(10)
+SITE_COUNTDOWN_TIMER_CALLBACK=const(12)
+SITE_REPEAT_TIMER_START=const(14)
+SITE_REPEAT_TIMER_CALLBACK=const(16)
+SITE_RESET=const(18)
+
+
 class PinMonitor(DebugableItem):
    
+    #ENGINE_TABLE: dispatch through the transition table
+    #ENGINE_LADDER: the if/elif chain in _process_state - kept for comparing both engines
+    engine=ENGINE_TABLE
+
+    #interrupts on both edges for every button (GestureMonitor), otherwise only for adaptive debounce
+    dualedge=False
+
+    #deferred processing - see enabledeferred()
+    edgebuffer=None
+    batchsize: int = 16
+    schedulefailures: int = 0
+
+    #tracing - True when debug output or the binary trace is on
+    tracing=False
+    tracebuffer=None
+    _debug=False
+
+    #metrics - see enablemetrics()
+    _metrics=None
+
+    #function(event) called with every event before the callback of the button, see events()
+    listener=None
+    _stream=None
+
+    #dispatch stage between the state machine and the callbacks - see enabledispatch()
+    dispatchqueue=None
+
+    #tickless: no timer wakeups that nobody listens to - see idle() and wakeupstats()
+    tickless=False
+    avoidedwakeups: int = 0
+
+    #raw edges of the pins - see enablerecording()
+    recorder=None
+
     #private    
-    _timer=Timer(-1)
-    _pinbuttons=[]
     _instance = None
-    _activepin= None
-    _previouspin = None
-    _lastclick_ticks = -1
-    _timercallcount=0
-    _countdown_maxtimercount=1
-    _state=BUTTON_STATE_SINGLECLICK_WAIT
+    _hardirq=False
+    _drainpending=False
+    _drain_ref=None
     
     #states as text array because of lack of enums for informational purposes
     _states=[ \
@@ -71,6 +220,20 @@ class PinMonitor(DebugableItem):
         , "BUTTON_STATE_REPEAT_DEBOUNCING" \
         , "BUTTON_STATE_REPEAT_DEBOUNCED" \
         ]
+
+    #trace sites as text array, index site>>1
+    _sites=[ \
+        "process_state" \
+        , "dispatch" \
+        , "_debounce_timer_start" \
+        , "_debounce_timer_kill" \
+        , "_countdown_timer_start" \
+        , "_countdown_timer_kill" \
+        , "_countdown_timer_callback" \
+        , "_repeat_timer_start" \
+        , "_repeat_timer_callback" \
+        , "_reset" \
+        ]
     
     #delay=200
     #repeatdelay=100
@@ -81,151 +244,567 @@ class PinMonitor(DebugableItem):
 #            self._instance = super(PinMonitor, self).__new__(self)
 #            # Put any initialization here.
 #        return self._instance
+
+    def __init__(self, timer: Timer = None):
+        """
+        @timer: Timer for the deadlines of the buttons of this monitor, default a virtual Timer(-1)
+                Every monitor has its own buttons and timer, so the buttons can be spread
+                over several monitors and timers
+        """
+        self._timer=timer if timer!=None else Timer(-1)
+        self._pinbuttons=[]
+        self._wheel=TimerWheel(self._timer)
+        self._wheel.callback=self._timer_expired
+        self._event=ButtonEvent() #reused for every callback
+        self.schedulefailures=0
+        self._drainpending=False
+        self.avoidedwakeups=0
     
+    @property
+    def debug(self):
+        return self._debug
+
+    @debug.setter
+    def debug(self, value):
+        self._debug=value
+        self.tracing=value==True or self.tracebuffer!=None
+
+    def enabletrace(self, size: int = 256):
+        """
+        record the trace sites in a binary trace buffer instead of printing them
+        @size: number of records, 0 disables the trace
+        """
+        self.tracebuffer=TraceBuffer(size) if size>0 else None
+        self.tracing=self._debug==True or self.tracebuffer!=None
+
+    def dumptrace(self):
+        """print the decoded trace buffer"""
+        if self.tracebuffer!=None:
+            self.tracebuffer.dump(self._sites, self._states)
+
+    def enablemetrics(self, enable: bool = True):
+        """keep ButtonMetrics for every button, see metrics() and snapshotmetrics()"""
+        if not enable:
+            self._metrics=None
+            return
+        self._metrics=[]
+        for pinbutton in self._pinbuttons:
+            self._metrics.append(ButtonMetrics() if pinbutton!=None else None)
+
+    def metrics(self, pinbutton: PinButton):
+        """ButtonMetrics of pinbutton, None when metrics are off"""
+        if self._metrics==None:
+            return None
+        return self._metrics[pinbutton.index]
+
+    def snapshotmetrics(self, reset: bool = False):
+        """metrics of all buttons as list of dictionaries (index = button index), optionally reset them"""
+        if self._metrics==None:
+            return None
+        return [metrics.snapshot(reset) if metrics!=None else None for metrics in self._metrics]
+
+    def events(self, size: int = 32):
+        """
+        asyncio stream of the events of this monitor: async for event in monitor.events()
+        @size: number of events that can wait for the consumer, used by the first call
+        """
+        if self._stream==None:
+            from buttonstream import ButtonStream
+            self._stream=ButtonStream(self, size)
+        return self._stream
+
+    def enabledispatch(self, size: int = 16, policy: int = DROP_LOWEST, limits = None, scheduled: bool = True):
+        """
+        queue the callbacks with priorities instead of calling them from the state machine
+        @size: number of waiting callbacks, 0 calls them directly again
+        @policy: DROP_NEWEST or DROP_LOWEST when the queue or a priority is full
+        @limits: maximum number of waiting callbacks per priority (high, normal, low)
+        @scheduled: run them from micropython.schedule, otherwise call dispatchqueue.run() from the main loop
+        """
+        self.dispatchqueue=DispatchQueue(self, size, policy, limits, scheduled) if size>0 else None
+
+    def idle(self, maxms: int = 0):
+        """
+        sleep until the next deadline of the buttons, machine.lightsleep where the port has it,
+        an edge wakes up earlier. Call it from the main loop when there is nothing else to do.
+        @maxms: longest sleep, 0 is no limit
+        returns the planned sleep in ms, 0 when there is work waiting
+        """
+        if self.edgebuffer!=None and self.edgebuffer.count()>0:
+            return 0
+        if self.dispatchqueue!=None and self.dispatchqueue.count()>0:
+            return 0
+        deadline=self._wheel.next_deadline()
+        if deadline==None:
+            delay=maxms
+        else:
+            delay=utime.ticks_diff(deadline, utime.ticks_ms())
+            if delay<=0:
+                return 0
+            if maxms>0 and delay>maxms:
+                delay=maxms
+        if lightsleep!=None:
+            if delay>0:
+                lightsleep(delay)
+            else:
+                lightsleep() #nothing pending: until an edge
+        elif delay>0:
+            utime.sleep_ms(delay)
+        return delay
+
+    def wakeupstats(self, reset: bool = False):
+        """timer wakeups of this monitor and the wakeups avoided by tickless scheduling, optionally reset them
+
+        avoided is an upper bound: the countdown periods of all buttons are added up, also when
+        the wheel would have woken once for several buttons
+        """
+        result={"wakeups": self._wheel.wakeups, "avoided": self.avoidedwakeups}
+        if reset:
+            self._wheel.wakeups=0
+            self.avoidedwakeups=0
+        return result
+
     def registerpinbutton(self, pinbutton: PinButton):
         self.dbg_enter("{:<25}".format("registerpin"))
-        self._pinbuttons.append(pinbutton)
-        pinbutton.pin.irq(handler=self._process_state, trigger=Pin.IRQ_RISING)
-        self._active_pinbutton=pinbutton
-        self._previous_pinbutton=pinbutton
+        #reuse the slot of an unregistered button, the slot is the index in the timer wheel
+        if None in self._pinbuttons:
+            pinbutton.index=self._pinbuttons.index(None)
+            self._pinbuttons[pinbutton.index]=pinbutton
+        else:
+            pinbutton.index=len(self._pinbuttons)
+            self._pinbuttons.append(pinbutton)
+        pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+        pinbutton.event=self._event
+        pinbutton.monitor=self
+        self._wheel.resize(len(self._pinbuttons))
+        if self.dispatchqueue!=None:
+            self.dispatchqueue.resize(len(self._pinbuttons))
+        if self._metrics!=None:
+            while len(self._metrics)<len(self._pinbuttons):
+                self._metrics.append(None)
+            self._metrics[pinbutton.index]=ButtonMetrics()
+        self._install_irq(pinbutton)
         self.dbg_leave("{:<25}".format("registerpin"))
+
+    def enabledeferred(self, buffersize: int = 32, hard: bool = False):
+        """
+        only capture edges in the interrupt handler, process them later
+        @buffersize: number of edges that can wait for processing
+        @hard: install the handlers as hard interrupts
+        """
+        self.dbg_enter("{:<25}".format("enabledeferred"),buffersize,hard)
+        self.edgebuffer=EdgeBuffer(buffersize)
+        self._hardirq=hard
+        self._drain_ref=self._drain
+        for pinbutton in self._pinbuttons:
+            if pinbutton!=None:
+                self._install_irq(pinbutton)
+        self.dbg_leave("{:<25}".format("enabledeferred"))
+
+    def enablerecording(self, recorder = None):
+        """
+        write every edge of the pins to recorder, the pins get interrupts on both edges
+        @recorder: EdgeRecorder, None stops recording
+        """
+        self.recorder=recorder
+        for pinbutton in self._pinbuttons:
+            if pinbutton!=None:
+                self._install_irq(pinbutton)
             
     def unregisterpin(self, pinbutton: PinButton):
-        self._reset()
-        self._pinbuttons.remove(pinbutton)
-        founditem.pin.irq(handler=None, trigger=Pin.IRQ_RISING)
-        if self._active_pinbutton==pinbutton:
-            self._active_pinbutton=None
-        if self._previous_pinbutton==pinbutton:
-            self._previous_pinbutton=None
-
-    def _process_state(self,irqflags):
-        self.dbg_enter("{:<25}".format("process_state"),self._states[self._state],irqflags,self._active_pinbutton,self._active_pinbutton.pin.value())
-        if irqflags!=None:
-            self._previous_pinbutton=self._active_pinbutton
-            self._active_pinbutton=next((x for x in self._pinbuttons if x.pin==irqflags ))
-            if self._previous_pinbutton!=self._active_pinbutton:
-                self._timer.deinit()
-                self._state=BUTTON_STATE_SINGLECLICK_WAIT
-        
-        if self._state==BUTTON_STATE_SINGLECLICK_WAIT:
-            self._active_pinbutton.countdownvalue=0
-            if self._active_pinbutton.dblclickcountdownfrom>0:
-                self._active_pinbutton.countdownvalue=self._active_pinbutton.dblclickcountdownfrom
-            
-            if self._active_pinbutton.onclicked!=None:
-                self._active_pinbutton.onclicked(self._active_pinbutton)
-            self._state=BUTTON_STATE_SINGLECLICK_DEBOUNCING 
-            self._debounce_timer_start()
-            self._lastclick_ticks=utime.ticks_ms()
-        elif self._state==BUTTON_STATE_SINGLECLICK_DEBOUNCING:
+        pinbutton.pin.irq(handler=None, trigger=Pin.IRQ_RISING)
+        self._reset(pinbutton)
+        self._pinbuttons[pinbutton.index]=None
+        pinbutton.index=-1
+        pinbutton.monitor=None
+
+    def _trace(self,site,pinbutton: PinButton):
+        if self.tracebuffer!=None:
+            self.tracebuffer.record(site,pinbutton.state,pinbutton.index)
+        if self._debug==True and self.debugger!=None:
+            if site & TRACE_LEAVE:
+                self.dbg_leave("{:<25}".format(self._sites[site>>1]),self._states[pinbutton.state],pinbutton,pinbutton.pin.value(),pinbutton.countdownvalue)
+            else:
+                self.dbg_enter("{:<25}".format(self._sites[site>>1]),self._states[pinbutton.state],pinbutton,pinbutton.pin.value(),pinbutton.countdownvalue)
+
+    def _install_irq(self,pinbutton: PinButton):
+        #a handler per pin that knows its button: no search and no allocation in the interrupt
+        trigger=Pin.IRQ_RISING
+        if self._bothedges(pinbutton) or self.recorder!=None:
+            trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING #adaptive debounce and gestures measure both edges, a recording has all edges
+        if self.edgebuffer==None and self.recorder!=None:
+            pinbutton.pin.irq(handler=lambda pin: self._record(pinbutton,pin), trigger=trigger)
+        elif self.edgebuffer==None:
+            pinbutton.pin.irq(handler=lambda pin: self._edge(pinbutton), trigger=trigger)
+        else:
+            index=pinbutton.index
+            pinbutton.pin.irq(handler=lambda pin: self._capture(index,pin), trigger=trigger, hard=self._hardirq)
+
+    def _bothedges(self,pinbutton: PinButton):
+        return pinbutton.debounce!=None or self.dualedge
+
+    def _recordedge(self,index,pin,ticks):
+        #record the edge, True when the button listens to it: the trigger of the interrupt decides, not a level read later
+        flags=pin.irq().flags()
+        rising=flags & Pin.IRQ_RISING!=0
+        level=1 if rising else 0
+        if flags==Pin.IRQ_RISING | Pin.IRQ_FALLING:
+            level=pin.value() #both edges before the handler ran: the pin tells where it ended
+        self.recorder.record(index,ticks,level)
+        return rising or self._bothedges(self._pinbuttons[index])
+
+    def _record(self,pinbutton: PinButton,pin):
+        #interrupt handler while recording: the state machine gets the same edges as without recording
+        if self._recordedge(pinbutton.index,pin,utime.ticks_us()):
+            self._edge(pinbutton)
+
+    def _capture(self,index,pin):
+        #interrupt handler in deferred mode: no allocation, no callbacks
+        ticks=utime.ticks_us()
+        if self.recorder!=None and not self._recordedge(index,pin,ticks):
+            return
+        self.edgebuffer.put(index,ticks,pin.value())
+        if not self._drainpending:
+            self._schedule_drain()
+
+    def _schedule_drain(self):
+        self._drainpending=True
+        try:
+            micropython.schedule(self._drain_ref,0)
+        except RuntimeError: #schedule queue full - the next edge tries again
+            self._drainpending=False
+            self.schedulefailures+=1
+
+    def _drain(self,arg):
+        #process at most batchsize edges, schedule again for the rest so other scheduled work can run in between
+        self._drainpending=False
+        edges=self.edgebuffer
+        count=edges.count()
+        if count>self.batchsize:
+            count=self.batchsize
+        while count>0:
+            pinbutton=self._pinbuttons[edges.index()]
+            if pinbutton!=None:
+                if self._metrics!=None:
+                    self._metrics[pinbutton.index].record(HISTOGRAM_LATENCY,utime.ticks_diff(utime.ticks_us(),edges.ticks()))
+                level=edges.level()
+                ticks=edges.ticks()
+                edges.pop()
+                self._edge(pinbutton,level,ticks)
+            else:
+                edges.pop()
+            count-=1
+        if edges.count()>0 and not self._drainpending:
+            self._schedule_drain()
+
+    def _edge(self,pinbutton: PinButton,level: int = -1,ticks: int = 0):
+        #level and ticks (ticks_us) are known in deferred mode, otherwise they are read when needed
+        if pinbutton.debounce!=None:
+            if level<0:
+                level=pinbutton.pin.value()
+                ticks=utime.ticks_us()
+            if not pinbutton.debounce.edge(level,ticks):
+                if self._metrics!=None:
+                    metrics=self._metrics[pinbutton.index]
+                    metrics.count(METRIC_EDGES)
+                    if level==1:
+                        metrics.count(METRIC_REJECTED) #a rising edge in a burst: bounce
+                return
+        if self._metrics!=None:
+            metrics=self._metrics[pinbutton.index]
+            metrics.count(METRIC_EDGES)
+            #the edge is thrown away when the action for an edge in this state is ACTION_IGNORE (debouncing)
+            if self._transitions[(pinbutton.state<<1)|EVENT_EDGE]==ACTION_IGNORE:
+                metrics.count(METRIC_REJECTED)
+            else:
+                metrics.count(METRIC_ACCEPTED)
+        if self.engine==ENGINE_TABLE:
+            self._dispatch(pinbutton,EVENT_EDGE)
+        else:
+            self._process_state(pinbutton)
+
+    def _timer_expired(self,index):
+        pinbutton=self._pinbuttons[index]
+        if pinbutton==None:
+            return
+        if self._metrics!=None:
+            metrics=self._metrics[index]
+            metrics.count(METRIC_TIMERS)
+            metrics.record(HISTOGRAM_JITTER,utime.ticks_diff(utime.ticks_ms(),self._wheel.deadline(index)))
+        if self.engine==ENGINE_TABLE:
+            self._dispatch(pinbutton,EVENT_TIMER)
+        elif pinbutton.timerkind==TIMER_DEBOUNCE:
+            self._debounce_timer_kill(pinbutton)
+        elif pinbutton.timerkind==TIMER_COUNTDOWN:
+            self._countdown_timer_callback(pinbutton)
+        else:
+            self._repeat_timer_callback(pinbutton)
+
+    def _process_state(self,pinbutton: PinButton):
+        """ENGINE_LADDER: process an edge (or the continuation after a timer) of pinbutton"""
+        if _TRACE and self.tracing:
+            self._trace(SITE_PROCESS_STATE,pinbutton)
+        state=pinbutton.state
+        if state==BUTTON_STATE_SINGLECLICK_WAIT:
+            self._action_click(pinbutton)
+        elif state==BUTTON_STATE_SINGLECLICK_DEBOUNCING:
             pass #debouncing - do nothing - just wait until the timer ends
-        elif self._state==BUTTON_STATE_DOUBLECLICK_DEBOUNCING:
+        elif state==BUTTON_STATE_DOUBLECLICK_DEBOUNCING:
             pass #debouncing - do nothing - just wait until the timer ends
-        elif self._state==BUTTON_STATE_REPEAT_DEBOUNCING:
+        elif state==BUTTON_STATE_REPEAT_DEBOUNCING:
             pass #debouncing - do nothing - just wait until the timer ends
-        elif self._state==BUTTON_STATE_DOUBLECLICK_DEBOUNCED:
-            self._state=BUTTON_STATE_SINGLECLICK_WAIT
-        elif self._state==BUTTON_STATE_REPEAT_DEBOUNCED:
-            self._state=BUTTON_STATE_SINGLECLICK_WAIT
-        elif self._state==BUTTON_STATE_SINGLECLICK_DEBOUNCED:
-            self._countdown_timer_start() #new state is determined in method
-        elif self._state==BUTTON_STATE_DOUBLECLICK_WAIT: 
-            if utime.ticks_diff(utime.ticks_ms(),self._lastclick_ticks)<self._active_pinbutton.countdownperiodms * self._active_pinbutton.dblclickcountdownfrom :
-                self._countdown_timer_kill(True) #call with parameter = True to prevent calling the process method again
-                self._lastclick_ticks=-1
-                self._state=BUTTON_STATE_SINGLECLICK_WAIT
-                if self._active_pinbutton.ondoubleclicked!=None:
-                    self._active_pinbutton.ondoubleclicked(self._active_pinbutton)
-                    self._state=BUTTON_STATE_DOUBLECLICK_DEBOUNCING 
-                    self._debounce_timer_start()
-        elif self._state==BUTTON_STATE_DOUBLECLICK_WAIT_ENDED: 
-#            if self._active_pinbutton.onclicked!=None:
-#                self._active_pinbutton.onclicked(self._active_pinbutton)
-            if self._active_pinbutton.repeatdelay>0:
-                self._state=BUTTON_STATE_REPEAT_WAIT
-                self._repeat_timer_start()
+        elif state==BUTTON_STATE_DOUBLECLICK_DEBOUNCED:
+            self._action_rest(pinbutton)
+        elif state==BUTTON_STATE_REPEAT_DEBOUNCED:
+            self._action_rest(pinbutton)
+        elif state==BUTTON_STATE_SINGLECLICK_DEBOUNCED:
+            self._countdown_timer_start(pinbutton) #new state is determined in method
+        elif state==BUTTON_STATE_DOUBLECLICK_WAIT: 
+            self._action_doubleclick(pinbutton)
+        elif state==BUTTON_STATE_DOUBLECLICK_WAIT_ENDED: 
+            self._action_countdown_ended(pinbutton)
+        elif state==BUTTON_STATE_REPEAT_WAIT: #wait hold
+            self._action_repeat(pinbutton)
+        else:
+            raise ValueError("Unhandled process state" + str(state))
+
+        if _TRACE and self.tracing:
+            self._trace(SITE_PROCESS_STATE|TRACE_LEAVE,pinbutton)
+
+    def _dispatch(self,pinbutton: PinButton,event: int):
+        """ENGINE_TABLE: look up the action for (state, event) and execute it - same cost for every state"""
+        if _TRACE and self.tracing:
+            self._trace(SITE_DISPATCH,pinbutton)
+        self._actions[self._transitions[(pinbutton.state<<1)|event]](self,pinbutton)
+        if _TRACE and self.tracing:
+            self._trace(SITE_DISPATCH|TRACE_LEAVE,pinbutton)
+
+    def _continue(self,pinbutton: PinButton):
+        """continue processing after a state change caused by a timer"""
+        if self.engine==ENGINE_TABLE:
+            self._dispatch(pinbutton,EVENT_TIMER)
+        else:
+            self._process_state(pinbutton)
+
+    def _notify(self,pinbutton: PinButton,kind: int,callback,clicks: int = 0,durationms: int = 0,combo: int = -1):
+        #fill the reused event record, then call the user callback
+        event=self._event
+        event.kind=kind
+        event.button=pinbutton
+        event.index=pinbutton.index
+        event.ticks=utime.ticks_ms()
+        event.countdownvalue=pinbutton.countdownvalue
+        event.clicks=clicks
+        event.durationms=durationms
+        event.combo=combo
+        event.count=1
+        if self.listener!=None:
+            self.listener(event)
+        if callback==None:
+            return
+        if self.dispatchqueue!=None:
+            self.dispatchqueue.put(event,callback)
+            return
+        self._call(pinbutton,callback)
+
+    def _call(self,pinbutton: PinButton,callback):
+        if self._metrics==None:
+            callback(pinbutton)
+            return
+        start=utime.ticks_us()
+        callback(pinbutton)
+        metrics=self._metrics[pinbutton.index]
+        metrics.record(HISTOGRAM_CALLBACK,utime.ticks_diff(utime.ticks_us(),start))
+        metrics.count(METRIC_CALLBACKS)
+
+    #actions - shared by both engines
+    def _action_ignore(self,pinbutton: PinButton):
+        pass #debouncing - do nothing - just wait until the timer ends
+
+    def _action_click(self,pinbutton: PinButton):
+        pinbutton.countdownvalue=0
+        if pinbutton.dblclickcountdownfrom>0:
+            pinbutton.countdownvalue=pinbutton.dblclickcountdownfrom
+        
+        if pinbutton.onclicked!=None or self.listener!=None:
+            self._notify(pinbutton,BUTTON_EVENT_CLICKED,pinbutton.onclicked)
+        pinbutton.state=BUTTON_STATE_SINGLECLICK_DEBOUNCING 
+        self._debounce_timer_start(pinbutton)
+        pinbutton.lastclick_ticks=utime.ticks_ms()
+
+    def _action_rest(self,pinbutton: PinButton):
+        pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+
+    def _action_debounced(self,pinbutton: PinButton):
+        #every *_DEBOUNCED state directly follows its *_DEBOUNCING state
+        pinbutton.state+=1
+        self._dispatch(pinbutton,EVENT_TIMER)
+
+    def _action_doubleclick(self,pinbutton: PinButton):
+        if utime.ticks_diff(utime.ticks_ms(),pinbutton.lastclick_ticks)<pinbutton.countdownperiodms * pinbutton.dblclickcountdownfrom :
+            self._countdown_timer_kill(pinbutton,True) #call with parameter = True to prevent calling the process method again
+            pinbutton.lastclick_ticks=-1
+            pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+            if pinbutton.ondoubleclicked!=None or self.listener!=None:
+                self._notify(pinbutton,BUTTON_EVENT_DOUBLECLICKED,pinbutton.ondoubleclicked)
+                pinbutton.state=BUTTON_STATE_DOUBLECLICK_DEBOUNCING 
+                self._debounce_timer_start(pinbutton)
+
+    def _action_countdown_ended(self,pinbutton: PinButton):
+        if pinbutton.repeatdelay>0:
+            pinbutton.state=BUTTON_STATE_REPEAT_WAIT
+            if self._repeat_silent(pinbutton):
+                pinbutton.timerkind=TIMER_NONE #nobody listens to repeats: no polling for the release
             else:
-                self._state=BUTTON_STATE_SINGLECLICK_WAIT
-        elif self._state==BUTTON_STATE_REPEAT_WAIT: #wait hold
-            if self._active_pinbutton==None or self._active_pinbutton.pin==None:
-                self._state=BUTTON_STATE_SINGLECLICK_WAIT
-            elif self._active_pinbutton.pin.value()==False:
-                if self._active_pinbutton.onclicked!=None:
-                    self._state=BUTTON_STATE_REPEAT_DEBOUNCING #state debouncing
-                    self._debounce_timer_start()
-            elif self._active_pinbutton.pin.value()==True:
-                if self._active_pinbutton.onclicked!=None:
-                    self._active_pinbutton.onclicked(self._active_pinbutton)
-                self._repeat_timer_start()
+                self._repeat_timer_start(pinbutton)
         else:
-            raise ValueError("Unhandled process state" + str(self._state))
+            pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
 
-        self.dbg_leave("{:<25}".format("process_state"),self._states[self._state],irqflags,self._active_pinbutton,self._active_pinbutton.pin.value())
+    def _action_repeat(self,pinbutton: PinButton):
+        if pinbutton.pin==None:
+            pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+        elif pinbutton.timerkind==TIMER_NONE:
+            #not polled, so only an edge gets here: pressed again after a release that was not looked for
+            pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+            self._action_click(pinbutton)
+        elif not self._pressed(pinbutton):
+            #released: debounce the release also without onclicked, otherwise the button stays in REPEAT_WAIT without a timer
+            pinbutton.state=BUTTON_STATE_REPEAT_DEBOUNCING #state debouncing
+            self._debounce_timer_start(pinbutton)
+        else:
+            if pinbutton.onclicked!=None or self.listener!=None:
+                self._notify(pinbutton,BUTTON_EVENT_REPEAT,pinbutton.onclicked)
+            self._repeat_timer_start(pinbutton)
         
-    def _debounce_timer_start(self):
-        self.dbg_enter("{:<25}".format("_debounce_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        if self._timer!=None:
-            self._timer.init(mode=Timer.ONE_SHOT, period=self._active_pinbutton.startdelay, callback=self._debounce_timer_kill)
-        self.dbg_leave("{:<25}".format("_debounce_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-
-    def _debounce_timer_kill(self,timerobject):
-        self.dbg_enter("{:<25}".format("_debounce_timer_kill"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        timerobject.deinit()
-        if self._state==BUTTON_STATE_SINGLECLICK_DEBOUNCING:
-            self._state=BUTTON_STATE_SINGLECLICK_DEBOUNCED
-        elif self._state==BUTTON_STATE_DOUBLECLICK_DEBOUNCING:
-            self._state=BUTTON_STATE_DOUBLECLICK_DEBOUNCED
-        elif self._state==BUTTON_STATE_REPEAT_DEBOUNCING:
-            self._state=BUTTON_STATE_REPEAT_DEBOUNCED
-        self._process_state(None)
-        self.dbg_leave("{:<25}".format("_debounce_timer_kill"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
+    def _pressed(self,pinbutton: PinButton):
+        #level of a held button, PollingMonitor takes the debounced bit (active low keys)
+        return pinbutton.pin.value()==True
+
+    def _debounce_timer_start(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEBOUNCE_TIMER_START,pinbutton)
+        pinbutton.timerkind=TIMER_DEBOUNCE
+        if pinbutton.debounce==None:
+            self._wheel.schedule(pinbutton.index, pinbutton.startdelay)
+        else:
+            self._wheel.schedule(pinbutton.index, pinbutton.debounce.windowms)
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEBOUNCE_TIMER_START|TRACE_LEAVE,pinbutton)
+
+    def _debounce_timer_kill(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEBOUNCE_TIMER_KILL,pinbutton)
+        if pinbutton.state==BUTTON_STATE_SINGLECLICK_DEBOUNCING:
+            pinbutton.state=BUTTON_STATE_SINGLECLICK_DEBOUNCED
+        elif pinbutton.state==BUTTON_STATE_DOUBLECLICK_DEBOUNCING:
+            pinbutton.state=BUTTON_STATE_DOUBLECLICK_DEBOUNCED
+        elif pinbutton.state==BUTTON_STATE_REPEAT_DEBOUNCING:
+            pinbutton.state=BUTTON_STATE_REPEAT_DEBOUNCED
+        self._process_state(pinbutton)
+        if _TRACE and self.tracing:
+            self._trace(SITE_DEBOUNCE_TIMER_KILL|TRACE_LEAVE,pinbutton)
         
-    def _countdown_timer_start(self):
-        self.dbg_enter("{:<25}".format("_countdown_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        if self._active_pinbutton.countdownperiodms>0 and self._active_pinbutton.dblclickcountdownfrom>0 and self._timer!=None:
-            self._state=BUTTON_STATE_DOUBLECLICK_WAIT
-            #self._active_pinbutton.countdownvalue=self._active_pinbutton.dblclickcountdownfrom
-            self._timer.init(mode=Timer.PERIODIC, period=self._active_pinbutton.countdownperiodms, callback=self._countdown_timer_callback)
+    def _countdown_timer_start(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_START,pinbutton)
+        if pinbutton.countdownperiodms>0 and pinbutton.dblclickcountdownfrom>0:
+            pinbutton.state=BUTTON_STATE_DOUBLECLICK_WAIT
+            pinbutton.timerkind=TIMER_COUNTDOWN
+            if self._countdown_silent(pinbutton):
+                #nobody counts along: one wakeup at the end of the countdown instead of one per period
+                self._wheel.schedule(pinbutton.index, pinbutton.countdownperiodms * (pinbutton.countdownvalue + 1))
+            else:
+                self._wheel.schedule(pinbutton.index, pinbutton.countdownperiodms)
         else:
-            self._state=BUTTON_STATE_REPEAT_WAIT
-        self.dbg_leave("{:<25}".format("_countdown_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value(),self._active_pinbutton.countdownvalue)
+            pinbutton.state=BUTTON_STATE_REPEAT_WAIT
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_START|TRACE_LEAVE,pinbutton)
             
-    def _countdown_timer_kill(self,alreadyprocessing):
-        self.dbg_enter("{:<25}".format("_countdown_timer_kill()"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        self._active_pinbutton.countdownvalue=-1
-        if self._timer!=None:
-            self._timer.deinit()
-            if alreadyprocessing==False:
-                self._state=BUTTON_STATE_DOUBLECLICK_WAIT_ENDED
-                self._process_state(None)
-        self.dbg_leave("{:<25}".format("_countdown_timer_kill()"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
+    def _countdown_timer_kill(self,pinbutton: PinButton,alreadyprocessing):
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_KILL,pinbutton)
+        if alreadyprocessing and self._countdown_silent(pinbutton) and self._wheel.pending(pinbutton.index):
+            #double click: the periods that passed would each have been a wakeup
+            start=utime.ticks_add(self._wheel.deadline(pinbutton.index),-pinbutton.countdownperiodms * (pinbutton.countdownvalue + 1))
+            self.avoidedwakeups+=utime.ticks_diff(utime.ticks_ms(),start) // pinbutton.countdownperiodms
+        pinbutton.countdownvalue=-1
+        self._wheel.cancel(pinbutton.index)
+        if alreadyprocessing==False:
+            pinbutton.state=BUTTON_STATE_DOUBLECLICK_WAIT_ENDED
+            self._continue(pinbutton)
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_KILL|TRACE_LEAVE,pinbutton)
     
-    def _countdown_timer_callback(self,objtimer):
-        self.dbg_enter("{:<25}".format("_countdown_timer_callback"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value(),self._active_pinbutton.countdownvalue)
-        self._active_pinbutton.countdownvalue-=1
-        if self._active_pinbutton.countdownvalue<0:
-            self._countdown_timer_kill(False)
-        elif self._active_pinbutton.ondoubleclickcountdown!=None:
-            self._active_pinbutton.ondoubleclickcountdown(self._active_pinbutton)
-        self.dbg_leave("{:<25}".format("_countdown_timer_callback"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
+    def _countdown_timer_callback(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_CALLBACK,pinbutton)
+        #periodic: the next count is scheduled from the previous deadline so the countdown does not drift
+        self._wheel.schedule(pinbutton.index, pinbutton.countdownperiodms, self._wheel.deadline(pinbutton.index))
+        if self._countdown_silent(pinbutton):
+            self.avoidedwakeups+=pinbutton.countdownvalue #one wakeup per period would have counted down
+            pinbutton.countdownvalue=0 #the periods in between were skipped
+        pinbutton.countdownvalue-=1
+        if pinbutton.countdownvalue<0:
+            self._countdown_timer_kill(pinbutton,False)
+        elif pinbutton.ondoubleclickcountdown!=None or self.listener!=None:
+            self._notify(pinbutton,BUTTON_EVENT_COUNTDOWN,pinbutton.ondoubleclickcountdown)
+        if _TRACE and self.tracing:
+            self._trace(SITE_COUNTDOWN_TIMER_CALLBACK|TRACE_LEAVE,pinbutton)
             
-    def _repeat_timer_start(self):
-        self.dbg_enter("{:<25}".format("_repeat_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        if self._timer!=None:
-            self._timer.init(mode=Timer.ONE_SHOT, period=self._active_pinbutton.repeatdelay, callback=self._repeat_timer_callback)
-        self.dbg_leave("{:<25}".format("_repeat_timer_start"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-
-    def _repeat_timer_callback(self,timerobject):
-        self.dbg_enter("{:<25}".format("_repeat_timer_callback"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        timerobject.deinit()
-        self._process_state(None)
-        self.dbg_leave("{:<25}".format("_repeat_timer_callback"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
+    def _countdown_silent(self,pinbutton: PinButton):
+        return self.tickless and pinbutton.ondoubleclickcountdown==None and self.listener==None
+
+    def _repeat_silent(self,pinbutton: PinButton):
+        return self.tickless and pinbutton.onclicked==None and self.listener==None
+
+    def _repeat_timer_start(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_REPEAT_TIMER_START,pinbutton)
+        pinbutton.timerkind=TIMER_REPEAT
+        self._wheel.schedule(pinbutton.index, pinbutton.repeatdelay)
+        if _TRACE and self.tracing:
+            self._trace(SITE_REPEAT_TIMER_START|TRACE_LEAVE,pinbutton)
+
+    def _repeat_timer_callback(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_REPEAT_TIMER_CALLBACK,pinbutton)
+        self._process_state(pinbutton)
+        if _TRACE and self.tracing:
+            self._trace(SITE_REPEAT_TIMER_CALLBACK|TRACE_LEAVE,pinbutton)
         
-    def _reset(self):
-        self.dbg_enter("{:<25}".format("_reset"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-        if self._timer!=None:
-            self._timer.deinit()
-        self._active_pinbutton.countdownvalue-=1
-        self.dbg_leave("{:<25}".format("_reset"),self._states[self._state],self._active_pinbutton,self._active_pinbutton.pin.value())
-    
\ No newline at end of file
+    def _reset(self,pinbutton: PinButton):
+        if _TRACE and self.tracing:
+            self._trace(SITE_RESET,pinbutton)
+        self._wheel.cancel(pinbutton.index)
+        pinbutton.state=BUTTON_STATE_SINGLECLICK_WAIT
+        pinbutton.countdownvalue-=1
+        if _TRACE and self.tracing:
+            self._trace(SITE_RESET|TRACE_LEAVE,pinbutton)
+
+    #action per (state, event): index (state<<1)|event
+    _transitions=bytearray(( \
+        #EVENT_EDGE              EVENT_TIMER
+        ACTION_CLICK,            ACTION_IGNORE,           #BUTTON_STATE_SINGLECLICK_WAIT
+        ACTION_IGNORE,           ACTION_DEBOUNCED,        #BUTTON_STATE_SINGLECLICK_DEBOUNCING
+        ACTION_COUNTDOWN_START,  ACTION_COUNTDOWN_START,  #BUTTON_STATE_SINGLECLICK_DEBOUNCED
+        ACTION_DOUBLECLICK,      ACTION_COUNTDOWN_TICK,   #BUTTON_STATE_DOUBLECLICK_WAIT
+        ACTION_COUNTDOWN_ENDED,  ACTION_COUNTDOWN_ENDED,  #BUTTON_STATE_DOUBLECLICK_WAIT_ENDED
+        ACTION_IGNORE,           ACTION_DEBOUNCED,        #BUTTON_STATE_DOUBLECLICK_DEBOUNCING
+        ACTION_REST,             ACTION_REST,             #BUTTON_STATE_DOUBLECLICK_DEBOUNCED
+        ACTION_REPEAT,           ACTION_REPEAT,           #BUTTON_STATE_REPEAT_WAIT
+        ACTION_IGNORE,           ACTION_DEBOUNCED,        #BUTTON_STATE_REPEAT_DEBOUNCING
+        ACTION_REST,             ACTION_REST,             #BUTTON_STATE_REPEAT_DEBOUNCED
+        ))
+
+    #plain functions, called as self._actions[action](self,pinbutton) - no bound method is allocated
+    _actions=( \
+        _action_ignore \
+        , _action_click \
+        , _action_rest \
+        , _action_debounced \
+        , _countdown_timer_start \
+        , _action_doubleclick \
+        , _countdown_timer_callback \
+        , _action_countdown_ended \
+        , _action_repeat \
+        )
@@ -0,0 +1,414 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Benchmark for PinMonitor: drives the monitor with synthetic edge
+#streams and reports per scenario
+#	-edges per second of busy time (time spent handling the edges)
+#	-latency from edge to onclicked/ondoubleclicked in us
+#	-heap bytes allocated per edge (MicroPython: gc.mem_alloc with the
+#	 gc disabled, every allocation counts). CPython only reports the
+#	 bytes the monitor modules still hold afterwards per edge
+#	 (retained_bytes_per_edge): short-lived allocations are not seen.
+#as JSON, to compare releases.
+#
+#The edges are made by driving the pins as outputs: on the rp2 the
+#gpio interrupt follows the level of an output (loopback), under
+#CPython the simulation backend (sim/) is used and time is virtual.
+#
+#CPython:     python pinmonitorbench.py [--json results.json] [--scale 1]
+#             python pinmonitorbench.py --heapcheck 100000 [--dispatch]
+#             python pinmonitorbench.py --corpus field.edges [--speed 4]
+#MicroPython: import pinmonitorbench; pinmonitorbench.run(pins=[2,3,4,5], scale=0.1)
+#             pinmonitorbench.heapcheck(1000, pins=[2,3,4,5])
+#	only use pins that are not connected to anything!
+#
+#A corpus is an edge trace recorded in the field (edgerecorder.py), it
+#is played as scenario "corpus" instead of the synthetic scenarios.
+#--------------------------------------------------------------------
+import sys
+import gc
+
+if sys.implementation.name!="micropython":
+    import sim
+    sim.install()
+
+import utime
+from machine import Pin
+import pinmonitor
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+
+try:
+    from time import perf_counter_ns
+    def _stamp():
+        return perf_counter_ns() // 1000
+    def _elapsed(start):
+        return perf_counter_ns() // 1000 - start
+except ImportError:
+    def _stamp():
+        return utime.ticks_us()
+    def _elapsed(start):
+        return utime.ticks_diff(utime.ticks_us(), start)
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc=None
+
+#pins used on the host, 16 buttons
+HOST_PINS=list(range(2, 18))
+
+#maximum number of latency samples per scenario
+MAX_SAMPLES=4096
+
+class _Random():
+    #small LCG, the same bounce bursts on the host and on the device
+    def __init__(self, seed):
+        self._state=seed & 0x7fffffff
+
+    def next(self, limit):
+        self._state=(self._state * 1103515245 + 12345) & 0x7fffffff
+        return self._state % limit
+
+def _transition(events, at_us, slot, level, bounceedges, bounceus, random):
+    events.append((at_us, slot, level))
+    for n in range(bounceedges):
+        level=1 - level
+        events.append((at_us + 1 + random.next(bounceus), slot, level))
+    if bounceedges & 1:
+        events.append((at_us + bounceus, slot, 1 - level))
+
+def _press(events, at_ms, hold_ms, slot, bounceedges=0, bounceus=3000, random=None):
+    _transition(events, at_ms * 1000, slot, 1, bounceedges, bounceus, random)
+    _transition(events, (at_ms + hold_ms) * 1000, slot, 0, bounceedges, bounceus, random)
+
+#scenarios: function(count, buttons) -> list of (at_us, slot, level)
+def scenario_singleclick(count, buttons):
+    events=[]
+    for n in range(count):
+        _press(events, n * 1000, 50, 0)
+    return events
+
+def scenario_doubleclick(count, buttons):
+    events=[]
+    for n in range(count):
+        _press(events, n * 2000, 40, 0)
+        _press(events, n * 2000 + 300, 40, 0)
+    return events
+
+def scenario_heldrepeat(count, buttons):
+    events=[]
+    for n in range(count):
+        _press(events, n * 4000, 3000, 0)
+    return events
+
+def scenario_bouncestorm(count, buttons):
+    events=[]
+    random=_Random(count)
+    for n in range(count):
+        _press(events, n * 1000, 50, 0, 20, 3000, random)
+    return events
+
+def scenario_manybuttons(count, buttons):
+    events=[]
+    random=_Random(count + buttons)
+    for n in range(count):
+        for slot in range(buttons):
+            _press(events, n * 1500 + slot * 7, 60, slot, 4, 1500, random)
+    return events
+
+def scenario_flood(count, buttons):
+    #edges back to back: raw edge throughput
+    events=[]
+    for n in range(count * 20):
+        events.append((n * 10, 0, (n + 1) & 1))
+    return events
+
+def scenario_corpus(records, speed=1.0):
+    """scenario builder of a recorded edge trace: the trace is played count times, speed divides the gaps"""
+    from edgerecorder import edges
+    trace=[(int(at / speed), index, level) for at, index, level in edges(records)]
+    def builder(count, buttons):
+        events=[]
+        offset=0
+        for n in range(count):
+            for at, index, level in trace:
+                if index<buttons:
+                    events.append((offset + at, index, level))
+            if trace:
+                offset+=trace[-1][0] + 5000000 #let the countdowns end before the next round
+        return events
+    return builder
+
+SCENARIOS=( \
+    ("singleclick", scenario_singleclick, 200) \
+    , ("doubleclick", scenario_doubleclick, 100) \
+    , ("heldrepeat", scenario_heldrepeat, 20) \
+    , ("bouncestorm", scenario_bouncestorm, 200) \
+    , ("manybuttons", scenario_manybuttons, 50) \
+    , ("flood", scenario_flood, 100) \
+    )
+
+class Bench():
+    """
+    Description
+    --------------------------------------------------------------------
+    Plays the edges of a scenario on the pins of registered buttons and
+    measures the time to handle them and the edge to callback latency.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, pins):
+        self.pins=[Pin(number, Pin.OUT, value=0) for number in pins]
+        self._edgestamp=[0] * len(pins)
+        self._edgepending=bytearray(len(pins))
+        self._latencies=[0] * MAX_SAMPLES
+        self._samples=0
+        self._slots={}
+        self.callbacks=0
+
+    def _callback(self, pinbutton):
+        self.callbacks+=1
+        slot=self._slots[pinbutton]
+        if self._edgepending[slot]:
+            #first callback after an edge: edge to callback latency
+            self._edgepending[slot]=0
+            if self._samples<MAX_SAMPLES:
+                self._latencies[self._samples]=_elapsed(self._edgestamp[slot])
+                self._samples+=1
+
+    def _countdown(self, pinbutton):
+        self.callbacks+=1
+
+    def run(self, name, builder, count, buttons, engine, deferred):
+        """run one scenario, returns the result as dictionary"""
+        for pin in self.pins:
+            pin.value(0)
+        monitor=PinMonitor()
+        monitor.engine=engine
+        if deferred:
+            monitor.enabledeferred(64)
+        pinbuttons=[]
+        for slot in range(buttons):
+            pinbutton=PinButton(self.pins[slot], self._callback, self._callback, self._countdown, 500, 1)
+            self._slots[pinbutton]=slot
+            monitor.registerpinbutton(pinbutton)
+            pinbuttons.append(pinbutton)
+        events=builder(count, buttons)
+        events.sort()
+        self._samples=0
+        self.callbacks=0
+
+        gc.collect()
+        allocmethod, allocstart=self._alloc_start()
+        busy=0
+        wall=_stamp()
+        start=utime.ticks_us()
+        for at_us, slot, level in events:
+            wait=utime.ticks_diff(utime.ticks_add(start, at_us), utime.ticks_us())
+            if wait>0:
+                utime.sleep_us(wait)
+            stamp=_stamp()
+            self._edgestamp[slot]=stamp
+            self._edgepending[slot]=level
+            self.pins[slot].value(level)
+            busy+=_elapsed(stamp)
+        utime.sleep_ms(5000) #let countdowns and repeats end
+        wall=_elapsed(wall)
+        allocated=self._alloc_end(allocmethod, allocstart)
+
+        for pinbutton in pinbuttons:
+            monitor.unregisterpin(pinbutton)
+
+        latencies=sorted(self._latencies[:self._samples])
+        result={
+            "scenario": name,
+            "engine": "table" if engine==pinmonitor.ENGINE_TABLE else "ladder",
+            "deferred": deferred,
+            "buttons": buttons,
+            "edges": len(events),
+            "callbacks": self.callbacks,
+            "busy_us": busy,
+            "wall_us": wall,
+            "edges_per_s": int(len(events) * 1000000 / busy) if busy>0 else None,
+            "latency_us": _distribution(latencies),
+            "alloc_method": allocmethod,
+            "alloc_bytes_per_edge" if allocmethod=="gc_mem_alloc" else "retained_bytes_per_edge": allocated / len(events) if len(events)>0 and allocated!=None else None,
+            "timer_wakeups": monitor.wakeupstats()["wakeups"],
+            }
+        if deferred:
+            result["overflows"]=monitor.edgebuffer.overflows
+            result["highwater"]=monitor.edgebuffer.highwater
+        return result
+
+    def _alloc_start(self):
+        if hasattr(gc, "mem_alloc"):
+            #MicroPython: with gc disabled mem_alloc only grows
+            gc.disable()
+            return "gc_mem_alloc", gc.mem_alloc()
+        if tracemalloc!=None:
+            #CPython: bytes still allocated by the monitor modules afterwards (not the simulation)
+            tracemalloc.start()
+            return "tracemalloc_net", tracemalloc.take_snapshot()
+        return None, None
+
+    def _alloc_end(self, method, start):
+        if method=="gc_mem_alloc":
+            allocated=gc.mem_alloc() - start
+            gc.enable()
+            return allocated
+        if method=="tracemalloc_net":
+            snapshot=tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            return _growth(start, snapshot)
+        return None
+
+#CPython boxes an int above 256 that is kept in an attribute, MicroPython does not allocate below 2^30
+_BOXED_INT=32
+
+def _growth(start, end):
+    #bytes allocated by the monitor modules between two tracemalloc snapshots, without boxed ints:
+    #a line that holds one more block of the size of an int is a counter or ticks value, not an allocation on the device
+    root=__file__.rsplit("/", 1)[0] if "/" in __file__ else "."
+    filters=[tracemalloc.Filter(True, root + "/*.py"), tracemalloc.Filter(False, root + "/sim/*"), tracemalloc.Filter(False, __file__)]
+    stats=end.filter_traces(filters).compare_to(start.filter_traces(filters), "lineno")
+    return sum(stat.size_diff for stat in stats if stat.size_diff>0 and (stat.count_diff>1 or stat.size_diff>_BOXED_INT))
+
+def heapcheck(events=100000, pins=None, buttons=4, engine=None, deferred=False, dispatch=False):
+    """
+    drive events edges through a monitor (clicks, doubleclicks, countdowns and
+    repeats) and return the growth of the heap in bytes: 0 is allocation free
+    The growth is measured from the first edge: what the first use of a path
+    allocates counts, that is what fails in a hard interrupt.
+    On the device use free pins and fewer events, every event takes real time.
+    """
+    if pins==None:
+        pins=HOST_PINS
+    pins=[Pin(number, Pin.OUT, value=0) for number in pins[:buttons]]
+    monitor=PinMonitor()
+    if engine!=None:
+        monitor.engine=engine
+    if deferred:
+        monitor.enabledeferred(64)
+    if dispatch:
+        monitor.enabledispatch(16)
+    counter=[0]
+    def callback(pinbutton):
+        counter[0]+=1
+    pinbuttons=[PinButton(pin, callback, callback, callback, 100, 3) for pin in pins]
+    for pinbutton in pinbuttons:
+        monitor.registerpinbutton(pinbutton)
+
+    def play(first, count):
+        for n in range(first, first + count):
+            slot=n % buttons
+            pins[slot].value((n // buttons + 1) & 1)
+            #gaps from 1 ms to 400 ms: bounces, doubleclicks, countdowns and repeats
+            utime.sleep_us(1000 + (n * 7919) % 400000 // buttons)
+
+    gc.collect()
+    if hasattr(gc, "mem_alloc"):
+        gc.disable()
+        start=gc.mem_alloc()
+        play(0, events)
+        growth=gc.mem_alloc() - start
+        gc.enable()
+        method="gc_mem_alloc"
+    else:
+        tracemalloc.start()
+        start=tracemalloc.take_snapshot()
+        play(0, events)
+        growth=_growth(start, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+        method="tracemalloc_net"
+    utime.sleep_ms(5000)
+    for pinbutton in pinbuttons:
+        monitor.unregisterpin(pinbutton)
+    return {"events": events, "callbacks": counter[0], "heap_growth_bytes": growth, "alloc_method": method}
+
+def _distribution(values):
+    if len(values)==0:
+        return None
+    def percentile(p):
+        return values[min(len(values) - 1, int(len(values) * p / 100))]
+    return {
+        "count": len(values),
+        "min": values[0],
+        "p50": percentile(50),
+        "p90": percentile(90),
+        "p99": percentile(99),
+        "max": values[-1],
+        "mean": sum(values) / len(values),
+        }
+
+def run(pins=None, scale=1.0, scenarios=None, engines=None, deferred=(False, True), out=None, corpus=None, speed=1.0):
+    """
+    run the benchmark and return the results as dictionary
+    @pins: gpio numbers of free pins, default 2..17 (host)
+    @scale: multiply the number of presses per scenario
+    @scenarios: names of the scenarios to run, None runs all of them
+    @engines: engines to compare, default table and ladder
+    @deferred: run with and/or without deferred processing
+    @out: write the JSON to this file name
+    @corpus: file name of a recorded edge trace, runs it instead of the synthetic scenarios (unless named in scenarios)
+    @speed: replay speed of the corpus
+    """
+    if pins==None:
+        pins=HOST_PINS
+    if engines==None:
+        engines=(pinmonitor.ENGINE_TABLE, pinmonitor.ENGINE_LADDER)
+    bench=Bench(pins)
+    results=[]
+    for name, builder, count in SCENARIOS:
+        if (scenarios!=None or corpus!=None) and (scenarios==None or name not in scenarios):
+            continue
+        count=max(1, int(count * scale))
+        buttons=len(pins) if name=="manybuttons" else 1
+        for engine in engines:
+            for mode in deferred:
+                results.append(bench.run(name, builder, count, buttons, engine, mode))
+    if corpus!=None:
+        from edgerecorder import load, edges
+        records=load(corpus)
+        buttons=min(len(pins), 1 + max([index for at, index, level in edges(records)] or [0]))
+        builder=scenario_corpus(records, speed)
+        for engine in engines:
+            for mode in deferred:
+                results.append(bench.run("corpus", builder, max(1, int(scale)), buttons, engine, mode))
+    report={
+        "implementation": sys.implementation.name,
+        "platform": sys.platform,
+        "results": results,
+        }
+    if out!=None:
+        import json
+        with open(out, "w") as file:
+            json.dump(report, file)
+    return report
+
+def main(argv):
+    import argparse
+    import json
+    parser=argparse.ArgumentParser(description="PinMonitor benchmark")
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE instead of stdout")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the number of presses")
+    parser.add_argument("--scenario", action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--corpus", metavar="TRACE", help="play an edge trace recorded with EdgeRecorder instead of the synthetic scenarios")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed of the corpus")
+    parser.add_argument("--heapcheck", type=int, metavar="EVENTS", help="only check that EVENTS edges do not grow the heap, exit code 1 when it grows")
+    parser.add_argument("--dispatch", action="store_true", help="heapcheck with the callbacks through the dispatch queue")
+    args=parser.parse_args(argv)
+    if args.heapcheck!=None:
+        result=heapcheck(args.heapcheck, dispatch=args.dispatch)
+        print(json.dumps(result))
+        return 1 if result["heap_growth_bytes"]>0 else 0
+    report=run(scale=args.scale, scenarios=args.scenario, out=args.json, corpus=args.corpus, speed=args.speed)
+    if args.json==None:
+        print(json.dumps(report, indent=1))
+
+if __name__=="__main__" and sys.implementation.name!="micropython":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Polling alternative for PinMonitor: no interrupt per pin. A timer
+#reads the whole gpio bank as one integer every periodms and debounces
+#all bits at once with 2 bit vertical counters: a bit only changes
+#after 4 equal samples. The cost per tick is a few bitwise operations,
+#independent of the number of pins, and a noisy line can not flood the
+#cpu with interrupts.
+#The debounced rising edges go into the PinMonitor state machine, so
+#click, doubleclick, countdown and repeat work like before.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#monitor=PollingMonitor(5)
+#monitor.registerpinbutton(PinButton(Pin(18, Pin.IN, Pin.PULL_DOWN), ...))
+#monitor.registerpinbutton(PinButton(Pin(19, Pin.IN, Pin.PULL_UP), ...), activelow=True)
+#--------------------------------------------------------------------
+import sys
+from array import array
+from machine import Timer
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+if sys.platform=="rp2":
+    from machine import mem32
+
+#rp2040: SIO GPIO_IN register
+GPIO_IN=const(0xd0000004)
+
+def gpio_number(pin):
+    """gpio number of a Pin - the rp2 port has no Pin.id(), its repr is Pin(GPIO18, ...)"""
+    if hasattr(pin, "id"):
+        return pin.id()
+    text=repr(pin)
+    start=text.index("GPIO") + 4 if "GPIO" in text else text.index("(") + 1
+    end=start
+    while end<len(text) and text[end].isdigit():
+        end+=1
+    return int(text[start:end])
+
+class PollingMonitor(PinMonitor):
+    """
+    Description
+    --------------------------------------------------------------------
+    PinMonitor that polls the gpio bank instead of using pin interrupts.
+    Every registered button is a bit in the bank (default its gpio number).
+    --------------------------------------------------------------------
+    debounced: debounced level of all bits (after activelow inversion)
+    """
+
+    def __init__(self, periodms: int = 5, readbank=None, timer: Timer = None):
+        """
+        @periodms: poll period, a level has to be stable for 4 periods
+        @readbank: function() returning the bank as integer, default
+                   the rp2 GPIO_IN register or the registered pins one by one
+        @timer: Timer for polling, default a virtual Timer(-1)
+        """
+        super().__init__()
+        self.periodms=periodms
+        if readbank==None:
+            if sys.platform=="rp2":
+                readbank=self._read_gpio_in
+            else:
+                readbank=self._read_pins
+        self._readbank=readbank
+        self._polltimer=timer if timer!=None else Timer(-1)
+        self._polling=False
+        self.debounced=0
+        self._mask=0
+        self._invert=0
+        self._ct0=0
+        self._ct1=0
+        self._bitbuttons=[]
+        self._buttonbits=array('H') #bit per button index
+        self._poll_ref=self._poll
+
+    def registerpinbutton(self, pinbutton: PinButton, bit: int = -1, activelow: bool = False):
+        """
+        @pinbutton: button to monitor
+        @bit: bit of the button in the bank, default the gpio number of the pin
+        @activelow: the button pulls the pin low (Pin.PULL_UP)
+        """
+        super().registerpinbutton(pinbutton)
+        if bit<0:
+            bit=gpio_number(pinbutton.pin)
+        while len(self._bitbuttons)<=bit:
+            self._bitbuttons.append(None)
+        self._bitbuttons[bit]=pinbutton
+        while len(self._buttonbits)<=pinbutton.index:
+            self._buttonbits.append(0)
+        self._buttonbits[pinbutton.index]=bit
+        mask=1<<bit
+        if activelow:
+            self._invert|=mask
+        else:
+            self._invert&=~mask
+        #start stable: counters at rest and the debounced level is the current level
+        self._ct0|=mask
+        self._ct1|=mask
+        self.debounced=(self.debounced & ~mask) | ((self._readbank() ^ self._invert) & mask)
+        self._mask|=mask
+        self.start()
+
+    def unregisterpin(self, pinbutton: PinButton):
+        bit=self._bitbuttons.index(pinbutton)
+        mask=1<<bit
+        self._mask&=~mask
+        self.debounced&=~mask
+        self._bitbuttons[bit]=None
+        super().unregisterpin(pinbutton)
+        if self._mask==0:
+            self.stop()
+
+    def start(self):
+        """start polling - done by registerpinbutton"""
+        if not self._polling:
+            self._polling=True
+            self._polltimer.init(mode=Timer.PERIODIC, period=self.periodms, callback=self._poll_ref)
+
+    def stop(self):
+        """stop polling"""
+        self._polling=False
+        self._polltimer.deinit()
+
+    def _install_irq(self,pinbutton: PinButton):
+        pass #polled, no interrupt
+
+    def _pressed(self,pinbutton: PinButton):
+        #the debounced level after the activelow inversion, the raw pin of an active low key is 0 while held
+        return (self.debounced>>self._buttonbits[pinbutton.index]) & 1==1
+
+    def _read_gpio_in(self):
+        return mem32[GPIO_IN]
+
+    def _read_pins(self):
+        #ports without a bank register: compose the bank from the registered pins
+        bank=0
+        for bit in range(len(self._bitbuttons)):
+            pinbutton=self._bitbuttons[bit]
+            if pinbutton!=None and pinbutton.pin.value():
+                bank|=1<<bit
+        return bank
+
+    def _poll(self,timerobject):
+        mask=self._mask
+        changed=(self.debounced ^ self._readbank() ^ self._invert) & mask
+        #vertical counter: reset where nothing changed, count where it did
+        self._ct0=~(self._ct0 & changed) & mask
+        self._ct1=(self._ct0 ^ (self._ct1 & changed)) & mask
+        toggle=changed & self._ct0 & self._ct1
+        if toggle==0:
+            return
+        self.debounced^=toggle
+        self._edges(toggle & self.debounced, 0)
+
+    def _edges(self,pressed,first):
+        #debounced rising edges go into the state machine, cost per changed bit only
+        #@pressed: the bits that became pressed, bit 0 is button bit first
+        bit=first
+        while pressed:
+            if pressed & 1:
+                pinbutton=self._bitbuttons[bit]
+                if pinbutton!=None:
+                    self._edge(pinbutton)
+            pressed>>=1
+            bit+=1
@@ -0,0 +1,44 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Simulation backend: run pinmonitor.py, pinbutton.py and
+#pinmonitortest.py unmodified under CPython.
+#install() puts the simulated machine, utime and micropython modules
+#in place of the MicroPython ones. Time is virtual: it only moves on
+#clock.advance_ms() or utime.sleep_ms(), so a minute of presses takes
+#a few milliseconds.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#import sim
+#sim.install()
+#from machine import Pin
+#import pinmonitortest
+#sim.press(Pin(19), 100, 50, sim.Bounce(6, 2000))
+#sim.clock.advance_ms(15000)
+#
+#or from the command line:
+#python -m sim --press 19:100:50 --press 19:1500:50 --run 15000 pinmonitortest.py
+#--------------------------------------------------------------------
+import builtins
+import sys
+from sim.clock import clock, VirtualClock
+from sim.edges import Bounce, transition, press, click
+from sim import machine, micropython, utime
+
+def install():
+    """make 'import machine', 'import utime', 'import micropython' and const() use the simulation"""
+    sys.modules["machine"]=machine
+    sys.modules["utime"]=utime
+    sys.modules["micropython"]=micropython
+    builtins.const=micropython.const
+
+def reset():
+    """back to time 0 without pins and pending events"""
+    clock.reset()
+    machine.Pin.reset()
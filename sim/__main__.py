@@ -0,0 +1,58 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Run a MicroPython program on the simulation backend:
+#python -m sim [--press PIN:AT_MS:HOLD_MS] [--bounce EDGES] [--run MS] program.py
+#python -m sim --replay TRACE [--pins PIN,PIN] [--speed FACTOR] program.py
+#--------------------------------------------------------------------
+import argparse
+import os
+import runpy
+import sys
+import sim
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(prog="python -m sim", description="run a MicroPython program on the virtual clock")
+    parser.add_argument("program", help="program to run, for example pinmonitortest.py")
+    parser.add_argument("--press", action="append", default=[], metavar="PIN:AT_MS:HOLD_MS", help="press a pin (repeatable)")
+    parser.add_argument("--bounce", type=int, default=0, metavar="EDGES", help="bounce edges per press and release")
+    parser.add_argument("--bounce-us", type=int, default=3000, help="duration of a bounce burst")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the bounce bursts")
+    parser.add_argument("--replay", metavar="TRACE", help="replay an edge trace of EdgeRecorder, started after the presses")
+    parser.add_argument("--pins", metavar="PIN,PIN", help="pin per button index of the trace, default the pins of the buttons of the program's monitor")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor")
+    parser.add_argument("--run", type=float, default=10000, metavar="MS", help="virtual time to run after the program started")
+    args=parser.parse_args(argv)
+
+    sim.install()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.program)))
+    namespace=runpy.run_path(args.program, run_name="__main__")
+
+    for number, press in enumerate(args.press):
+        pin, at_ms, hold_ms=press.split(":")
+        bounce=sim.Bounce(args.bounce, args.bounce_us, args.seed + number) if args.bounce>0 else None
+        sim.press(sim.machine.Pin(int(pin)), sim.clock.now / 1000 + float(at_ms), float(hold_ms), bounce)
+    if args.replay!=None:
+        from sim.replay import replay
+        from edgerecorder import load
+        if args.pins!=None:
+            pins=[sim.machine.Pin(int(pin)) for pin in args.pins.split(",")]
+        else:
+            pins=_monitorpins(namespace)
+        replay(load(args.replay), pins, args.speed)
+    sim.clock.advance_ms(args.run)
+
+def _monitorpins(namespace):
+    #pins of the buttons of the first monitor the program created
+    from pinmonitor import PinMonitor
+    for value in namespace.values():
+        if isinstance(value, PinMonitor):
+            return [pinbutton.pin if pinbutton!=None else None for pinbutton in value._pinbuttons]
+    raise SystemExit("--replay: no PinMonitor in the program, give --pins")
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,116 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Deterministic virtual clock for the simulation backend.
+#Time only moves when advance() (or utime.sleep_ms) is called, events
+#at the same time run in the order they were added. Between events
+#the functions queued with micropython.schedule are executed, like
+#the MicroPython scheduler does after an interrupt.
+#--------------------------------------------------------------------
+import heapq
+
+#MicroPython rp2: MICROPY_SCHEDULER_DEPTH
+SCHEDULER_DEPTH=8
+
+class VirtualClock():
+    """
+    Description
+    --------------------------------------------------------------------
+    Virtual time in microseconds with an event queue.
+    --------------------------------------------------------------------
+
+    Usage
+    --------------------------------------------------------------------
+    clock.at(clock.now + 1000, myfunction)   #myfunction() after 1 ms
+    clock.advance_ms(10)                     #run everything up to now+10 ms
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """back to time 0, remove all events and scheduled functions"""
+        self.now=0
+        self.events=0
+        self.droppedirqs=0
+        self._queue=[]
+        self._sequence=0
+        self._scheduled=[]
+        self._running_scheduled=False
+
+    def at(self, time_us: int, function):
+        """
+        execute function() at time_us (not before now)
+        returns a handle for cancel()
+        """
+        if time_us<self.now:
+            time_us=self.now
+        self._sequence+=1
+        event=[time_us, self._sequence, function]
+        heapq.heappush(self._queue, event)
+        return event
+
+    def after_ms(self, delay_ms, function):
+        """execute function() delay_ms after now, returns a handle for cancel()"""
+        return self.at(self.now + int(delay_ms * 1000), function)
+
+    def cancel(self, event):
+        """cancel an event returned by at()"""
+        if event!=None:
+            event[2]=None
+
+    def next_event(self):
+        """time of the next pending event in us, None when there is nothing to do"""
+        while self._queue and self._queue[0][2]==None:
+            heapq.heappop(self._queue)
+        if self._queue:
+            return self._queue[0][0]
+        return None
+
+    def advance(self, duration_us: int):
+        """run all events up to now+duration_us and move the clock there"""
+        self.run_until(self.now + int(duration_us))
+
+    def advance_ms(self, duration_ms):
+        """run all events up to now+duration_ms and move the clock there"""
+        self.advance(int(duration_ms * 1000))
+
+    def run_until(self, time_us: int):
+        """run all events up to time_us and move the clock there"""
+        while self._queue and self._queue[0][0]<=time_us:
+            event=heapq.heappop(self._queue)
+            function=event[2]
+            if function==None:
+                continue
+            if event[0]>self.now:
+                self.now=event[0]
+            self.events+=1
+            function()
+            self.run_scheduled()
+        if time_us>self.now:
+            self.now=time_us
+
+    def schedule(self, function, arg):
+        """micropython.schedule: queue function(arg), raises RuntimeError when the queue is full"""
+        if len(self._scheduled)>=SCHEDULER_DEPTH:
+            raise RuntimeError("schedule queue full")
+        self._scheduled.append((function, arg))
+
+    def run_scheduled(self):
+        """execute the functions queued with schedule()"""
+        if self._running_scheduled:
+            return #a scheduled function does not interrupt another one
+        self._running_scheduled=True
+        try:
+            while self._scheduled:
+                function, arg=self._scheduled.pop(0)
+                function(arg)
+        finally:
+            self._running_scheduled=False
+
+#the clock shared by machine, utime and micropython
+clock=VirtualClock()
@@ -0,0 +1,62 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Scripted pin edges for the simulation: clean edges, bounce bursts,
+#presses and clicks, all placed on the virtual clock.
+#--------------------------------------------------------------------
+import random
+from sim.clock import clock
+
+class Bounce():
+    """
+    Description
+    --------------------------------------------------------------------
+    Bounce burst of a mechanical switch. After the first edge the contact
+    toggles 'edges' times more within 'duration_us'. The gaps grow towards
+    the end of the burst, like a contact that settles. A seed makes the
+    burst reproducible.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, edges: int = 6, duration_us: int = 3000, seed: int = 0):
+        """
+        @edges: extra toggles after the first edge, rounded up to an even number
+        @duration_us: time between the first and the last edge
+        @seed: random seed
+        """
+        self.edges=edges + (edges & 1)
+        self.duration_us=duration_us
+        self._random=random.Random(seed)
+
+    def offsets(self):
+        """offsets in us of the extra toggles, sorted"""
+        if self.edges==0:
+            return []
+        offsets=sorted(self._random.random() ** 0.5 for i in range(self.edges - 1))
+        offsets=[int(offset * self.duration_us) for offset in offsets]
+        offsets.append(self.duration_us) #the last edge ends the burst
+        return offsets
+
+def transition(pin, at_us: int, level: int, bounce: Bounce = None):
+    """schedule a change of pin to level at at_us, with an optional bounce burst"""
+    level=1 if level else 0
+    clock.at(at_us, lambda: pin.drive(level))
+    if bounce!=None:
+        current=level
+        for offset in bounce.offsets():
+            current=1 - current
+            clock.at(at_us + offset, lambda value=current: pin.drive(value))
+
+def press(pin, at_ms, hold_ms, bounce: Bounce = None, active: int = 1):
+    """schedule press of pin at at_ms (virtual time), released hold_ms later"""
+    at_us=int(at_ms * 1000)
+    transition(pin, at_us, active, bounce)
+    transition(pin, at_us + int(hold_ms * 1000), 1 - active, bounce)
+
+def click(pin, at_ms, bounce: Bounce = None, active: int = 1):
+    """schedule a short (50 ms) press"""
+    press(pin, at_ms, 50, bounce, active)
@@ -0,0 +1,97 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Simulated key hardware for keyscanner.py:
+#-KeyMatrix: switches between row and column pins, without diodes
+#	(so ghost keys appear like on a real matrix) or with diodes
+#-ShiftRegisterChain: chain of 74HC165 on load, clock and data pins
+#--------------------------------------------------------------------
+from sim.machine import Pin
+
+class KeyMatrix():
+    """
+    Description
+    --------------------------------------------------------------------
+    A row that is an output and high drives every column it is connected
+    to through pressed keys. Without diodes the current also flows back
+    through other rows, making ghost keys.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, rows, columns, diodes: bool = False):
+        self.rows=rows
+        self.columns=columns
+        self.diodes=diodes
+        self.pressed=set()
+        for row in rows:
+            row.watch(self._update)
+
+    def press(self, row: int, column: int):
+        self.pressed.add((row, column))
+        self._update()
+
+    def release(self, row: int, column: int):
+        self.pressed.discard((row, column))
+        self._update()
+
+    def _update(self, pin=None):
+        high=set()
+        for r, row in enumerate(self.rows):
+            if row.mode()==Pin.OUT and row.value()==1:
+                high.add(("row", r))
+        #flood fill over the pressed keys
+        reached=set(high)
+        todo=list(high)
+        while todo:
+            kind, number=todo.pop()
+            for r, c in self.pressed:
+                if kind=="row" and r==number:
+                    node=("column", c)
+                elif kind=="column" and c==number and not self.diodes:
+                    node=("row", r)
+                else:
+                    continue
+                if node not in reached:
+                    reached.add(node)
+                    todo.append(node)
+        for c, column in enumerate(self.columns):
+            column.drive(1 if ("column", c) in reached else 0)
+
+class ShiftRegisterChain():
+    """
+    Description
+    --------------------------------------------------------------------
+    74HC165 chain: SH/LD low latches inputs, every rising edge on CLK
+    shifts the next bit to QH. Bit 0 is on QH right after the load.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, load: Pin, clock: Pin, data: Pin, bits: int):
+        self.load=load
+        self.clock=clock
+        self.data=data
+        self.bits=bits
+        self.inputs=0
+        self._register=0
+        self._clocklevel=clock.value()
+        load.watch(self._update)
+        clock.watch(self._update)
+
+    def press(self, bit: int):
+        self.inputs|=1<<bit
+
+    def release(self, bit: int):
+        self.inputs&=~(1<<bit)
+
+    def _update(self, pin):
+        if self.load.value()==0:
+            self._register=self.inputs
+        elif pin is self.clock:
+            if self.clock.value()==1 and self._clocklevel==0:
+                self._register>>=1
+        self._clocklevel=self.clock.value()
+        self.data.drive(self._register & 1)
@@ -0,0 +1,248 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Stand-in for the MicroPython machine module on the virtual clock:
+#Pin with edge interrupts and Timer ONE_SHOT/PERIODIC.
+#Like on the rp2 port there is one Pin object per gpio, so Pin(18)
+#in the test harness is the same object as Pin(18) in the program.
+#
+#mem32 only simulates the rp2040 GPIO_IN register (0xd0000004).
+#
+#Pin edges are made with pin.drive(level) (input) or pin.value(level)
+#(output), or scheduled with sim.edges.
+#--------------------------------------------------------------------
+from sim.clock import clock
+
+class Pin():
+    """
+    Description
+    --------------------------------------------------------------------
+    Simulated gpio. A hard irq handler is called directly on the edge,
+    a soft handler through the scheduler (like micropython.schedule).
+    --------------------------------------------------------------------
+    """
+    IN=0
+    OUT=1
+    OPEN_DRAIN=2
+    ALT=3
+    PULL_UP=1
+    PULL_DOWN=2
+    IRQ_LOW_LEVEL=1
+    IRQ_HIGH_LEVEL=2
+    IRQ_FALLING=4
+    IRQ_RISING=8
+
+    #gpio number -> Pin
+    _pins={}
+
+    def __new__(cls, id, *args, **kwargs):
+        pin=cls._pins.get(id)
+        if pin==None:
+            pin=super().__new__(cls)
+            pin._id=id
+            pin._level=0
+            pin._mode=Pin.IN
+            pin._pull=None
+            pin._handler=None
+            pin._trigger=0
+            pin._hard=False
+            pin._irq=_Irq()
+            pin._watchers=[]
+            pin.edges=0
+            cls._pins[id]=pin
+        return pin
+
+    def __init__(self, id, mode=-1, pull=-1, value=None, **kwargs):
+        self.init(mode, pull, value)
+
+    def init(self, mode=-1, pull=-1, value=None, **kwargs):
+        if mode!=-1:
+            self._mode=mode
+        if pull!=-1:
+            self._pull=pull
+            if pull==Pin.PULL_UP:
+                self._level=1
+            elif pull==Pin.PULL_DOWN:
+                self._level=0
+        if value!=None:
+            self._set(value)
+        self._notify()
+
+    @classmethod
+    def reset(cls):
+        """forget all pins - start of a new simulation"""
+        cls._pins.clear()
+
+    def __repr__(self):
+        return "Pin(GPIO{}, mode={}, pull={})".format(self._id, self._mode, self._pull)
+
+    def __call__(self, value=None):
+        return self.value(value)
+
+    def id(self):
+        return self._id
+
+    def value(self, value=None):
+        if value==None:
+            return self._level
+        self._set(value)
+
+    def on(self):
+        self._set(1)
+
+    def off(self):
+        self._set(0)
+
+    def toggle(self):
+        self._set(1 - self._level)
+
+    def drive(self, level):
+        """simulation: the outside world sets the level of the pin"""
+        self._set(level)
+
+    def mode(self):
+        return self._mode
+
+    def watch(self, function):
+        """simulation: function(pin) is called when the level or mode of the pin changes"""
+        self._watchers.append(function)
+
+    def _notify(self):
+        for function in self._watchers:
+            function(self)
+
+    def irq(self, *args, **kwargs):
+        """install the handler, like MicroPython irq() without arguments only returns the irq object"""
+        if args or kwargs:
+            settings=dict(zip(("handler", "trigger", "hard"), args))
+            settings.update(kwargs)
+            self._handler=settings.get("handler")
+            self._trigger=settings.get("trigger", Pin.IRQ_FALLING | Pin.IRQ_RISING)
+            self._hard=settings.get("hard", False)
+        return self._irq
+
+    def _set(self, level):
+        level=1 if level else 0
+        if level==self._level:
+            return
+        self._level=level
+        self.edges+=1
+        self._notify()
+        if self._handler==None:
+            return
+        if (level==1 and self._trigger & Pin.IRQ_RISING) or (level==0 and self._trigger & Pin.IRQ_FALLING):
+            self._irq._flags=Pin.IRQ_RISING if level else Pin.IRQ_FALLING
+            if self._hard:
+                self._handler(self)
+            else:
+                try:
+                    clock.schedule(self._handler, self)
+                except RuntimeError:
+                    clock.droppedirqs+=1
+            clock.run_scheduled()
+
+class _Irq():
+    #irq object of a pin: flags() is the trigger of the last interrupt
+    def __init__(self):
+        self._flags=0
+
+    def flags(self):
+        return self._flags
+
+class Timer():
+    """
+    Description
+    --------------------------------------------------------------------
+    Simulated (virtual) timer. PERIODIC timers fire at exact multiples
+    of the period after init(), they do not drift.
+    Timer(-1) is a soft timer like on the rp2: it expires on the
+    millisecond tick (ticks_ms() + period), not period ms after the
+    microsecond init() was called.
+    --------------------------------------------------------------------
+    """
+    ONE_SHOT=0
+    PERIODIC=1
+
+    def __init__(self, id=-1, **kwargs):
+        self._id=id
+        self._event=None
+        self._callback=None
+        self._mode=Timer.PERIODIC
+        self._period_us=0
+        self._next_us=0
+        self.fired=0
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None, tick_hz=1000, hard=True):
+        self.deinit()
+        if freq>0:
+            period_us=int(1000000 / freq)
+        else:
+            period_us=int(period * 1000000 / tick_hz)
+        self._mode=mode
+        self._period_us=period_us if period_us>0 else 1
+        self._callback=callback
+        if self._id==-1 and freq<=0 and tick_hz==1000:
+            self._next_us=(clock.now // 1000) * 1000 + self._period_us
+        else:
+            self._next_us=clock.now + self._period_us
+        self._event=clock.at(self._next_us, self._fire)
+
+    def deinit(self):
+        clock.cancel(self._event)
+        self._event=None
+
+    def _fire(self):
+        self._event=None
+        if self._mode==Timer.PERIODIC:
+            self._next_us+=self._period_us
+            self._event=clock.at(self._next_us, self._fire)
+        self.fired+=1
+        if self._callback!=None:
+            self._callback(self)
+
+class _Mem32():
+    #rp2040 SIO GPIO_IN register: the levels of all simulated pins
+    GPIO_IN=0xd0000004
+
+    def __getitem__(self, address):
+        if address!=_Mem32.GPIO_IN:
+            raise ValueError("address not simulated")
+        bank=0
+        for id, pin in Pin._pins.items():
+            if isinstance(id, int) and pin._level:
+                bank|=1<<id
+        return bank
+
+mem32=_Mem32()
+
+def lightsleep(time_ms=None):
+    """sleep until the next event (or time_ms), like a wakeup by the timer"""
+    wakeup=clock.next_event()
+    if time_ms!=None and (wakeup==None or wakeup>clock.now + time_ms * 1000):
+        wakeup=clock.now + time_ms * 1000
+    if wakeup!=None:
+        clock.run_until(wakeup)
+
+def idle():
+    """wait for the next event"""
+    wakeup=clock.next_event()
+    if wakeup!=None:
+        clock.run_until(wakeup)
+
+def disable_irq():
+    return 0
+
+def enable_irq(state=0):
+    pass
+
+def freq(hz=None):
+    return 125000000
+
+def unique_id():
+    return b"simulate"
@@ -0,0 +1,33 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Stand-in for the MicroPython micropython module.
+#schedule() queues on the virtual clock, the queued functions run
+#after the current interrupt or timer event.
+#--------------------------------------------------------------------
+from sim.clock import clock
+
+def const(value):
+    return value
+
+def schedule(function, arg):
+    clock.schedule(function, arg)
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+def heap_lock():
+    return 0
+
+def heap_unlock():
+    return 0
+
+def opt_level(level=None):
+    return 0
+
+def mem_info(verbose=False):
+    print("mem: simulated")
@@ -0,0 +1,115 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Replay of an edge trace (edgerecorder.py) on the simulation: the
+#recorded edges are driven on the pins of the buttons on the virtual
+#clock, at the recorded speed or faster, so a bug report from the field
+#becomes a deterministic regression test.
+#A speed above 1 only shortens the gaps between the edges, the timers
+#of the monitor keep their periods: compare callbacks at speed 1, use a
+#faster replay for load and throughput.
+#CallbackLog records the callbacks of the buttons of a monitor,
+#assert_sequence() compares them with the expected sequence.
+#--------------------------------------------------------------------
+#
+#Usage
+#--------------------------------------------------------------------
+#import sim
+#sim.install()
+#from sim.replay import CallbackLog, replayfile, assert_sequence
+#...register the buttons in the same order as on the unit...
+#log=CallbackLog(monitor)
+#replayfile("field.edges", monitor, speed=4)
+#assert_sequence(log.events, [("clicked", 0, 0), ("doubleclicked", 1, 0)])
+#
+#or from the command line:
+#python -m sim --replay field.edges --speed 4 program.py
+#--------------------------------------------------------------------
+from sim.clock import clock
+from sim.edges import transition
+
+#callbacks of a PinButton and the name they get in the log
+_CALLBACKS=( \
+    ("onclicked", "clicked") \
+    , ("ondoubleclicked", "doubleclicked") \
+    , ("ondoubleclickcountdown", "countdown") \
+    , ("onlongpress", "longpress") \
+    , ("onnclicked", "nclicked") \
+    , ("onheldreleased", "heldreleased") \
+    )
+
+def replay(records, pins, speed: float = 1.0, start_us: int = None):
+    """
+    schedule the edges of records on the virtual clock
+    @records: packed edge records, EdgeRecorder.records() or edgerecorder.load()
+    @pins: pin per button index of the recording, None skips the edges of that index
+    @speed: 2 plays twice as fast, every gap between edges is divided by speed
+    @start_us: virtual time of the first edge, default 1 ms after now
+    returns the virtual time in us of the last edge
+    """
+    from edgerecorder import edges
+    if start_us==None:
+        start_us=clock.now + 1000
+    last=start_us
+    for at, index, level in edges(records):
+        if index<len(pins) and pins[index]!=None:
+            last=start_us + int(at / speed)
+            transition(pins[index], last, level)
+    return last
+
+def replayfile(filename: str, monitor, speed: float = 1.0, settle_ms: int = 5000):
+    """
+    replay a trace file on the pins of the buttons of monitor (index = button index)
+    and run the clock until settle_ms after the last edge
+    returns the virtual time in us of the last edge
+    """
+    from edgerecorder import load
+    pins=[pinbutton.pin if pinbutton!=None else None for pinbutton in monitor._pinbuttons]
+    last=replay(load(filename), pins, speed)
+    clock.run_until(last + settle_ms * 1000)
+    return last
+
+class CallbackLog():
+    """
+    Description
+    --------------------------------------------------------------------
+    Wraps the callbacks of the registered buttons of a monitor, every
+    call is logged as (name, button index, countdownvalue) in events
+    before the original callback runs. Buttons without a callback are
+    left alone, so the monitor behaves as without the log.
+    --------------------------------------------------------------------
+    """
+
+    def __init__(self, monitor):
+        self.events=[]
+        for pinbutton in monitor._pinbuttons:
+            if pinbutton==None:
+                continue
+            for attribute, name in _CALLBACKS:
+                callback=getattr(pinbutton, attribute)
+                if callback!=None:
+                    setattr(pinbutton, attribute, self._wrap(name, callback))
+
+    def _wrap(self, name, callback):
+        def logged(pinbutton):
+            self.events.append((name, pinbutton.index, pinbutton.countdownvalue))
+            return callback(pinbutton)
+        return logged
+
+    def names(self):
+        """the logged events as (name, button index), without the countdown values"""
+        return [(name, index) for name, index, countdownvalue in self.events]
+
+def assert_sequence(actual, expected):
+    """raise AssertionError at the first difference between the actual and the expected callbacks"""
+    actual=list(actual)
+    expected=list(expected)
+    for position in range(min(len(actual), len(expected))):
+        if actual[position]!=expected[position]:
+            raise AssertionError("callback {}: {} expected {}\nactual  : {}\nexpected: {}".format(position, actual[position], expected[position], actual, expected))
+    if len(actual)!=len(expected):
+        raise AssertionError("{} callbacks, expected {}\nactual  : {}\nexpected: {}".format(len(actual), len(expected), actual, expected))
@@ -0,0 +1,47 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Stand-in for the MicroPython utime module on the virtual clock.
+#The ticks functions wrap like on the device (TICKS_PERIOD), the
+#sleep functions advance the virtual clock and run due events.
+#--------------------------------------------------------------------
+from sim.clock import clock
+
+#MicroPython: MICROPY_PY_UTIME_TICKS_PERIOD
+TICKS_PERIOD=1<<30
+_TICKS_MAX=TICKS_PERIOD - 1
+_TICKS_HALFPERIOD=TICKS_PERIOD>>1
+
+def ticks_ms():
+    return (clock.now // 1000) & _TICKS_MAX
+
+def ticks_us():
+    return clock.now & _TICKS_MAX
+
+def ticks_cpu():
+    return clock.now & _TICKS_MAX
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & _TICKS_MAX
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + _TICKS_HALFPERIOD) & _TICKS_MAX) - _TICKS_HALFPERIOD
+
+def sleep(seconds):
+    clock.advance(int(seconds * 1000000))
+
+def sleep_ms(ms):
+    clock.advance(int(ms) * 1000)
+
+def sleep_us(us):
+    clock.advance(int(us))
+
+def time():
+    return clock.now // 1000000
+
+def time_ns():
+    return clock.now * 1000
@@ -0,0 +1,32 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#pytest setup: the tests run the modules of the repository unmodified
+#on the simulation backend (sim/), every test starts at virtual time 0
+#without pins.
+#
+#python -m pytest tests
+#python -m pytest tests -m "not slow"     #without the long runs
+#--------------------------------------------------------------------
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import sim
+
+sim.install()
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long run, deselect with -m \"not slow\"")
+
+@pytest.fixture(autouse=True)
+def virtualclock():
+    sim.reset()
+    yield sim.clock
+    sim.reset()
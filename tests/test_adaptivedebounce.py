@@ -0,0 +1,40 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#The window of AdaptiveDebounce is the percentile of the last bursts:
+#the sorted samples give the same window as sorting the last bursts,
+#also after the ring of samples wrapped around.
+#--------------------------------------------------------------------
+import random
+import pytest
+from adaptivedebounce import AdaptiveDebounce
+
+def _expected(durations, debounce, samples):
+    last=sorted(durations[-samples:])
+    needed=(len(last) * debounce.percentile + 99) // 100
+    window=last[needed - 1] * debounce.margin
+    return min(max(window, debounce.minms * 1000), debounce.maxms * 1000)
+
+@pytest.mark.parametrize("percentile", [50, 90, 95, 100])
+def test_window_is_percentile_of_last_bursts(percentile):
+    generator=random.Random(percentile)
+    debounce=AdaptiveDebounce(1, 200, percentile, 2, 16, 2000)
+    durations=[]
+    ticks=0
+    for n in range(200):
+        #a burst: rising edge on a quiet line, bounce within gapus, then quiet again
+        duration=generator.choice((0, 300, 300, 1500, 1999 * generator.randint(1, 20)))
+        assert debounce.edge(1, ticks)==True
+        edge=0
+        while edge<duration:
+            edge+=min(1999, duration - edge)
+            debounce.edge(edge & 1, ticks + edge)
+        ticks+=duration + 5000
+        if n>0:
+            assert debounce.windowus==_expected(durations, debounce, 16)
+        durations.append(duration)
+    assert debounce.bursts==199
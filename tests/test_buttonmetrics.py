@@ -0,0 +1,79 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#ButtonMetrics: the log2 buckets of the histograms, the counters of a
+#bouncing click and the jitter of a deadline handled late.
+#--------------------------------------------------------------------
+import pytest
+import utime
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, click
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from buttonmetrics import ButtonMetrics, HISTOGRAM_BUCKETS, HISTOGRAM_LATENCY, HISTOGRAM_JITTER, METRIC_EDGES
+
+@pytest.mark.parametrize("value, bucket", [ \
+    (-5, 0), (0, 0), (1, 1), (2, 2), (3, 2), (4, 3), (7, 3), (8, 4) \
+    , (2**13 - 1, 13), (2**13, 14), (2**14 - 1, 14), (2**14, 15), (2**15, 15), (2**29, 15) \
+    ])
+def test_histogram_bucket(value, bucket):
+    metrics=ButtonMetrics()
+    metrics.record(HISTOGRAM_LATENCY, value)
+    buckets=metrics.snapshot()["latency_us"]["buckets"]
+    assert len(buckets)==HISTOGRAM_BUCKETS
+    assert buckets==[1 if n==bucket else 0 for n in range(HISTOGRAM_BUCKETS)]
+    assert metrics.snapshot()["latency_us"]["max"]==max(value, 0)
+
+def test_reset():
+    metrics=ButtonMetrics()
+    metrics.count(METRIC_EDGES)
+    metrics.record(HISTOGRAM_JITTER, 12)
+    assert metrics.snapshot(True)["edges"]==1
+    snapshot=metrics.snapshot()
+    assert snapshot["edges"]==0
+    assert snapshot["jitter_ms"]=={"buckets": [0] * HISTOGRAM_BUCKETS, "max": 0}
+
+def test_bouncing_click_counters():
+    calls=[]
+    monitor=PinMonitor()
+    monitor.enablemetrics()
+    pin=Pin(2, Pin.IN, Pin.PULL_DOWN)
+    callback=lambda pinbutton: calls.append(pinbutton.countdownvalue)
+    monitor.registerpinbutton(PinButton(pin, callback, callback, callback, 100, 2))
+    #rising edges: 4 in the bounce of the press, 3 in the bounce of the release
+    click(pin, 100, Bounce(6, 3000, 1))
+    clock.run_until(2000000)
+    snapshot=monitor.snapshotmetrics()[0]
+    assert snapshot["edges"]==7
+    assert snapshot["accepted"]==1
+    assert snapshot["rejected"]==6
+    #the click and the countdown 1, 0
+    assert snapshot["callbacks"]==len(calls)==3
+    #debounce, 3 countdown deadlines, the repeat poll and the release debounce, all on time
+    assert snapshot["timers"]==6
+    assert sum(snapshot["callback_us"]["buckets"])==3
+    assert snapshot["jitter_ms"]["buckets"][0]==6
+
+def test_late_deadline_jitter():
+    monitor=PinMonitor()
+    monitor.enablemetrics()
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    def slow(pinbutton):
+        utime.sleep_ms(7) #a callback of 7 ms in the timer
+    monitor.registerpinbutton(PinButton(pins[0], None, None, slow, 100, 1))
+    monitor.registerpinbutton(PinButton(pins[1], None, None, None, 100, 1))
+    #the countdown of button 0 runs from 400 to 407 ms, the debounce deadline of button 1 at 403 ms
+    #is handled on the next tick of the re-armed timer, at 408 ms
+    click(pins[0], 100)
+    click(pins[1], 203)
+    clock.run_until(2000000)
+    jitter=monitor.snapshotmetrics()[1]["jitter_ms"]
+    assert jitter["max"]==5
+    assert jitter["buckets"][3]==1
+    assert sum(jitter["buckets"])==monitor.snapshotmetrics()[1]["timers"]
+    assert monitor.snapshotmetrics()[0]["jitter_ms"]["max"]==0
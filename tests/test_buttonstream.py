@@ -0,0 +1,105 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#ButtonStream with CPython asyncio on the simulation: the coroutines
+#run between steps of the virtual clock, like the uasyncio loop runs
+#between the interrupts on the board.
+#--------------------------------------------------------------------
+import asyncio
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, click
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from buttonevent import BUTTON_EVENT_CLICKED, BUTTON_EVENT_DOUBLECLICKED, BUTTON_EVENT_COUNTDOWN
+from buttonstream import ThreadSafeFlag
+
+def _monitor():
+    monitor=PinMonitor()
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    pinbuttons=[]
+    for pin in pins:
+        pinbuttons.append(PinButton(pin, None, None, None, 150, 4))
+        monitor.registerpinbutton(pinbuttons[-1])
+    return monitor, pins, pinbuttons
+
+async def _drive(until_ms: int, step_ms: int = 5):
+    #advance the virtual clock, the event loop runs the coroutines after every step
+    while clock.now<until_ms * 1000:
+        clock.run_until(clock.now + step_ms * 1000)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+def test_events_iteration():
+    monitor, pins, pinbuttons=_monitor()
+    received=[]
+    async def consumer():
+        async for event in monitor.events():
+            if event.kind!=BUTTON_EVENT_COUNTDOWN:
+                received.append((event.kinds[event.kind], event.index, event.button is pinbuttons[event.index]))
+    async def main():
+        task=asyncio.create_task(consumer())
+        await asyncio.sleep(0)
+        click(pins[0], 100, Bounce(6, 3000, 1))
+        click(pins[1], 150)
+        click(pins[1], 2000)
+        click(pins[1], 2400) #in the double click window of the click
+        await _drive(4000)
+        task.cancel()
+    asyncio.run(main())
+    assert received==[("clicked", 0, True), ("clicked", 1, True), ("clicked", 1, True), ("doubleclicked", 1, True)]
+    assert monitor.events().overflows==0
+
+def test_await_clicked_and_doubleclicked():
+    monitor, pins, pinbuttons=_monitor()
+    received=[]
+    async def waiter():
+        event=await pinbuttons[0].clicked()
+        received.append((event.kind, event.index, clock.now // 1000))
+        event=await pinbuttons[0].doubleclicked()
+        received.append((event.kind, event.index, clock.now // 1000))
+    async def main():
+        task=asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        click(pins[1], 100) #another button does not wake the waiter
+        click(pins[0], 300)
+        click(pins[0], 2000) #a click, the waiter waits for a double click now
+        click(pins[0], 2400)
+        await _drive(4000, 1)
+        assert task.done()
+    asyncio.run(main())
+    assert received==[(BUTTON_EVENT_CLICKED, 0, 300), (BUTTON_EVENT_DOUBLECLICKED, 0, 2400)]
+
+def test_overflow_counted():
+    monitor, pins, pinbuttons=_monitor()
+    stream=monitor.events(4)
+    stream.__aiter__() #events are queued once the iteration started
+    for n in range(8):
+        click(pins[n & 1], 100 + n * 1000)
+    clock.run_until(9000000)
+    #every click gives a click and 4 countdown events, 4 fit in the queue
+    assert stream.count()==4
+    assert stream.highwater==4
+    assert stream.overflows==8 * 5 - 4
+    assert [stream.get().kind for n in range(4)]==[BUTTON_EVENT_CLICKED] + [BUTTON_EVENT_COUNTDOWN] * 3
+    assert stream.get()==None
+
+def test_flag_set_before_wait():
+    flag=ThreadSafeFlag()
+    flag.set() #no loop yet: the flag remembers it
+    async def main():
+        await asyncio.wait_for(flag.wait(), 1)
+        #once waited the flag wakes through the loop, a set before the wait is not lost either
+        flag.set()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(flag.wait(), 1)
+        try:
+            await asyncio.wait_for(flag.wait(), 0.01)
+        except asyncio.TimeoutError:
+            return True
+        return False
+    assert asyncio.run(main())
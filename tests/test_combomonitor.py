@@ -0,0 +1,160 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#ComboMonitor on the simulation: a chord that waits for a larger one,
+#a sequence that is the start of a longer one, the waiting click of a
+#failed sequence and the combo slot behind a button registered later.
+#--------------------------------------------------------------------
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, click, press
+from combomonitor import ComboMonitor
+from pinbutton import PinButton
+from buttonevent import BUTTON_EVENT_COUNTDOWN
+
+def _monitor(buttons=3):
+    log=[]
+    monitor=ComboMonitor(400)
+    def listener(event):
+        if event.kind!=BUTTON_EVENT_COUNTDOWN:
+            log.append((event.kinds[event.kind], event.index, event.combo, clock.now // 1000))
+    monitor.listener=listener
+    pins=[]
+    pinbuttons=[]
+    for number in range(buttons):
+        pins.append(Pin(2 + number, Pin.IN, Pin.PULL_DOWN))
+        pinbuttons.append(PinButton(pins[-1], None, None, None, 300, 1))
+        monitor.registerpinbutton(pinbuttons[-1])
+    return monitor, pins, pinbuttons, log
+
+def _chords():
+    monitor, pins, pinbuttons, log=_monitor()
+    small=monitor.addchord(pinbuttons[0:2], None)
+    large=monitor.addchord(pinbuttons, None)
+    return monitor, pins, small, large, log
+
+def test_chord_waits_for_larger_chord():
+    monitor, pins, small, large, log=_chords()
+    press(pins[0], 100, 1000, Bounce(4, 2000, 1))
+    press(pins[1], 150, 1000, Bounce(4, 2000, 2))
+    clock.run_until(3000000)
+    #A+B is complete at 150 but could become A+B+C: it is given at the end of the window
+    assert log==[("chord", 1, small, 500)]
+
+def test_chord_larger_chord_completes():
+    monitor, pins, small, large, log=_chords()
+    press(pins[0], 100, 1000)
+    press(pins[1], 150, 1000)
+    press(pins[2], 300, 1000)
+    clock.run_until(3000000)
+    assert log==[("chord", 2, large, 300)]
+
+def test_chord_release_ends_wait():
+    monitor, pins, small, large, log=_chords()
+    press(pins[0], 100, 1000)
+    press(pins[1], 150, 100)
+    clock.run_until(3000000)
+    #a button of the chord is released: A+B+C is not coming
+    assert log==[("chord", 1, small, 250)]
+
+def _sequences():
+    monitor, pins, pinbuttons, log=_monitor()
+    short=monitor.addsequence((pinbuttons[0], pinbuttons[0]), None)
+    long=monitor.addsequence((pinbuttons[0], pinbuttons[0], pinbuttons[1]), None)
+    return monitor, pins, short, long, log
+
+def test_sequence_waits_for_longer_sequence():
+    monitor, pins, short, long, log=_sequences()
+    click(pins[0], 100)
+    click(pins[0], 300)
+    clock.run_until(3000000)
+    #A,A is complete at 300 but could become A,A,B: it is given when the window ends
+    assert log==[("sequence", 0, short, 700)]
+
+def test_sequence_longer_sequence_completes():
+    monitor, pins, short, long, log=_sequences()
+    click(pins[0], 100)
+    click(pins[0], 300)
+    click(pins[1], 600)
+    clock.run_until(3000000)
+    assert log==[("sequence", 1, long, 600)]
+
+def test_failed_sequence_gives_waiting_click():
+    monitor, pins, pinbuttons, log=_monitor()
+    monitor.addsequence((pinbuttons[0], pinbuttons[1]), None)
+    click(pins[0], 100)
+    clock.run_until(3000000)
+    #the click of A ends at 450 but waits for the sequence, that fails at 500
+    assert log==[("clicked", 0, -1, 500)]
+
+def test_failed_sequence_by_other_button():
+    monitor, pins, pinbuttons, log=_monitor()
+    monitor.addsequence((pinbuttons[0], pinbuttons[1]), None)
+    click(pins[0], 100)
+    click(pins[2], 300)
+    clock.run_until(3000000)
+    #C is not in the sequence: it ends it before the click of A is parked
+    assert log==[("clicked", 0, -1, 450), ("clicked", 2, -1, 650)]
+
+def test_failed_sequence_by_other_button_gives_parked_click():
+    monitor, pins, pinbuttons, log=_monitor()
+    monitor.addsequence((pinbuttons[0], pinbuttons[1]), None)
+    monitor.combowindowms=600
+    click(pins[0], 100)
+    click(pins[2], 500)
+    clock.run_until(3000000)
+    #the click of A waits from 450, C ends the sequence at 500 and gives it
+    assert log==[("clicked", 0, -1, 500), ("clicked", 2, -1, 850)]
+
+def test_combo_slot_moves_with_registered_button():
+    monitor, pins, pinbuttons, log=_monitor(2)
+    combo=monitor.addsequence(pinbuttons, None)
+    click(pins[0], 100)
+    clock.run_until(200000)
+    slot=monitor._comboslot
+    deadline=monitor._wheel.deadline(slot)
+    assert monitor._wheel.pending(slot)
+    #registered while the sequence waits for its next press
+    pin=Pin(4, Pin.IN, Pin.PULL_DOWN)
+    monitor.registerpinbutton(PinButton(pin, None, None, None, 300, 1))
+    assert monitor._comboslot==slot + 1
+    assert monitor._wheel.pending(monitor._comboslot)
+    assert monitor._wheel.deadline(monitor._comboslot)==deadline
+    #the deadline fires from the new slot: the sequence fails and gives the waiting click
+    click(pin, 1000)
+    clock.run_until(3000000)
+    assert log==[("clicked", 0, -1, 500), ("clicked", 2, -1, 1350)]
+
+def test_combo_slot_moved_sequence_completes():
+    monitor, pins, pinbuttons, log=_monitor(2)
+    combo=monitor.addsequence(pinbuttons, None)
+    click(pins[0], 100)
+    clock.run_until(200000)
+    monitor.registerpinbutton(PinButton(Pin(4, Pin.IN, Pin.PULL_DOWN), None, None, None, 300, 1))
+    click(pins[1], 300)
+    clock.run_until(3000000)
+    assert log==[("sequence", 1, combo, 300)]
+
+def test_chord_keeps_settle_check():
+    monitor, pins, pinbuttons, log=_monitor()
+    combo=monitor.addchord(pinbuttons[0:2], None)
+    #a short chord: both releases fall in the settle window of their press
+    press(pins[0], 100, 8)
+    press(pins[1], 112, 10)
+    click(pins[0], 1000)
+    clock.run_until(3000000)
+    #the releases are taken when the windows end, the next press of A is a click
+    assert log==[("chord", 1, combo, 112), ("clicked", 0, -1, 1350)]
+
+def test_chord_cancels_gesture_deadlines():
+    monitor, pins, pinbuttons, log=_monitor()
+    combo=monitor.addchord(pinbuttons[0:2], None)
+    press(pins[0], 100, 400, Bounce(6, 3000, 1))
+    press(pins[1], 150, 400, Bounce(6, 3000, 2))
+    clock.run_until(5000000)
+    #the buttons of the chord give no long press, also when a bouncing release re-arms their slot
+    assert log==[("chord", 1, combo, 150)]
@@ -0,0 +1,110 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#DispatchQueue: priority order, repeat coalescing, the drop policies
+#and the event record of a slow callback run from the main loop.
+#--------------------------------------------------------------------
+import utime
+from machine import Pin
+from sim.edges import click
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from buttonevent import ButtonEvent, BUTTON_EVENT_CLICKED, BUTTON_EVENT_REPEAT, BUTTON_EVENT_DOUBLECLICKED, BUTTON_EVENT_COUNTDOWN
+from dispatchqueue import DROP_NEWEST, DROP_LOWEST
+
+def _monitor(size, policy=DROP_LOWEST, limits=None, buttons=3):
+    monitor=PinMonitor()
+    monitor.enabledispatch(size, policy, limits, scheduled=False)
+    log=[]
+    def callback(pinbutton):
+        event=pinbutton.event
+        log.append((event.kinds[event.kind], event.index, event.count))
+    for number in range(buttons):
+        monitor.registerpinbutton(PinButton(Pin(2 + number, Pin.IN, Pin.PULL_DOWN), callback, callback, callback, 100, 3))
+    return monitor, log, callback
+
+def _put(monitor, callback, kind, index, countdownvalue=1):
+    event=ButtonEvent()
+    event.kind=kind
+    event.index=index
+    event.countdownvalue=countdownvalue
+    return monitor.dispatchqueue.put(event, callback)
+
+def test_priority_order():
+    monitor, log, callback=_monitor(16)
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    _put(monitor, callback, BUTTON_EVENT_CLICKED, 1)
+    _put(monitor, callback, BUTTON_EVENT_COUNTDOWN, 2, 0) #end of the countdown: high
+    _put(monitor, callback, BUTTON_EVENT_COUNTDOWN, 0, 2)
+    _put(monitor, callback, BUTTON_EVENT_DOUBLECLICKED, 1)
+    assert monitor.dispatchqueue.count()==5
+    assert monitor.dispatchqueue.run()==5
+    assert log==[("countdown", 2, 1), ("doubleclicked", 1, 1), ("clicked", 1, 1), ("countdown", 0, 1), ("repeat", 0, 1)]
+    assert monitor.dispatchqueue.highwater==5
+
+def test_repeat_coalescing():
+    monitor, log, callback=_monitor(16)
+    for n in range(3):
+        _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 1)
+    assert monitor.dispatchqueue.count()==2
+    assert monitor.dispatchqueue.coalesced==2
+    monitor.dispatchqueue.run()
+    assert log==[("repeat", 0, 3), ("repeat", 1, 1)]
+    #the repeat has run: the next one is queued again
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    assert monitor.dispatchqueue.count()==1
+
+def test_drop_newest():
+    monitor, log, callback=_monitor(2, DROP_NEWEST)
+    assert _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    assert _put(monitor, callback, BUTTON_EVENT_CLICKED, 1)
+    assert not _put(monitor, callback, BUTTON_EVENT_DOUBLECLICKED, 2)
+    assert list(monitor.dispatchqueue.drops)==[1, 0, 0]
+    monitor.dispatchqueue.run()
+    assert log==[("clicked", 1, 1), ("repeat", 0, 1)]
+
+def test_drop_lowest():
+    monitor, log, callback=_monitor(2, DROP_LOWEST)
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    _put(monitor, callback, BUTTON_EVENT_CLICKED, 1)
+    #full: the repeat makes room for the double click, nothing makes room for a repeat
+    assert _put(monitor, callback, BUTTON_EVENT_DOUBLECLICKED, 2)
+    assert not _put(monitor, callback, BUTTON_EVENT_REPEAT, 1)
+    assert list(monitor.dispatchqueue.drops)==[0, 0, 2]
+    monitor.dispatchqueue.run()
+    assert log==[("doubleclicked", 2, 1), ("clicked", 1, 1)]
+
+def test_limit_per_priority():
+    monitor, log, callback=_monitor(8, DROP_LOWEST, (8, 8, 1))
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 0)
+    _put(monitor, callback, BUTTON_EVENT_REPEAT, 1)
+    #over the limit of its priority: the oldest repeat makes room
+    assert monitor.dispatchqueue.count()==1
+    assert list(monitor.dispatchqueue.drops)==[0, 0, 1]
+    monitor.dispatchqueue.run()
+    assert log==[("repeat", 1, 1)]
+
+def test_slow_callback_keeps_its_event():
+    #run() from the main loop: the handlers of button 1 run while the callback of button 0 sleeps
+    monitor=PinMonitor()
+    monitor.enabledispatch(8, scheduled=False)
+    seen=[]
+    def slow(pinbutton):
+        seen.append((pinbutton.event.kind, pinbutton.event.index))
+        utime.sleep_ms(400)
+        seen.append((pinbutton.event.kind, pinbutton.event.index))
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    for pin in pins:
+        monitor.registerpinbutton(PinButton(pin, slow, None, None, 100, 1))
+    click(pins[0], 100)
+    utime.sleep_ms(150)
+    click(pins[1], 300)
+    while monitor.dispatchqueue.count()>0:
+        monitor.dispatchqueue.run(1)
+    assert seen==[(BUTTON_EVENT_CLICKED, 0), (BUTTON_EVENT_CLICKED, 0), (BUTTON_EVENT_CLICKED, 1), (BUTTON_EVENT_CLICKED, 1)]
+    assert monitor._pinbuttons[0].event is monitor._event
@@ -0,0 +1,80 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Gestures of GestureMonitor on the simulation: a release or press that
+#falls in the settle window is taken when the window ends, so a short
+#tap or a bouncing release does not leave the button held.
+#--------------------------------------------------------------------
+import pytest
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, click, press
+from gesturemonitor import GestureMonitor, GESTURE_STATE_IDLE
+from pinbutton import PinButton
+
+def _button(log, repeatdelay=100):
+    pin=Pin(2, Pin.IN, Pin.PULL_DOWN)
+    monitor=GestureMonitor()
+    def logged(name):
+        return lambda pinbutton: log.append((name, pinbutton.event.clicks, pinbutton.event.durationms))
+    pinbutton=PinButton(pin, logged("clicked"), logged("doubleclicked"), None, 300, 1)
+    pinbutton.onnclicked=logged("nclicked")
+    pinbutton.onlongpress=logged("longpress")
+    pinbutton.onheldreleased=logged("heldreleased")
+    pinbutton.repeatdelay=repeatdelay
+    monitor.registerpinbutton(pinbutton)
+    return monitor, pinbutton, pin
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("duration_us", [5000, 15000, 30000])
+def test_bouncing_release(seed, duration_us):
+    log=[]
+    monitor, pinbutton, pin=_button(log)
+    press(pin, 100, 150, Bounce(8, duration_us, seed))
+    clock.run_until(3000000)
+    assert log==[("clicked", 1, 0)]
+    assert pinbutton.state==GESTURE_STATE_IDLE
+
+@pytest.mark.parametrize("hold_ms", [1, 5, 10, 19])
+def test_short_tap(hold_ms):
+    #released within the settle window of the press
+    log=[]
+    monitor, pinbutton, pin=_button(log)
+    press(pin, 100, hold_ms)
+    clock.run_until(3000000)
+    assert log==[("clicked", 1, 0)]
+    assert pinbutton.state==GESTURE_STATE_IDLE
+
+def test_short_press_in_window():
+    #pressed within the settle window of a release: the second click is not lost
+    log=[]
+    monitor, pinbutton, pin=_button(log)
+    press(pin, 100, 50)
+    press(pin, 160, 50)
+    clock.run_until(3000000)
+    assert log==[("doubleclicked", 2, 0)]
+
+def test_long_press_and_held_release():
+    log=[]
+    monitor, pinbutton, pin=_button(log)
+    press(pin, 100, 1550, Bounce(6, 3000, 1))
+    clock.run_until(4000000)
+    assert log[0]==("longpress", 1, 1000)
+    #repeated every repeatdelay after the long press, until the release
+    assert [name for name, clicks, durationms in log[1:-1]]==["clicked"] * 5
+    assert [durationms for name, clicks, durationms in log[1:-1]]==[1100, 1200, 1300, 1400, 1500]
+    assert log[-1]==("heldreleased", 1, 1550)
+    assert pinbutton.state==GESTURE_STATE_IDLE
+
+@pytest.mark.parametrize("clicks", [3, 4, 6])
+def test_nclick(clicks):
+    log=[]
+    monitor, pinbutton, pin=_button(log)
+    for n in range(clicks):
+        click(pin, 100 + n * 200, Bounce(4, 2000, n))
+    clock.run_until(5000000)
+    assert log==[("nclicked", clicks, 0)]
@@ -0,0 +1,88 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#The edge and timer paths do not allocate, from the first edge on:
+#-pinmonitorbench.heapcheck() finds no heap growth in the monitor
+# modules (CPython: tracemalloc, boxed ints do not count), a short run
+# and the full run of 100000 edges (marked slow, -m "not slow" skips it)
+#-no object of the monitor gets a new attribute and no container grows.
+# CPython often has room in an instance dictionary, MicroPython has to
+# allocate when an interrupt adds an attribute.
+#--------------------------------------------------------------------
+from array import array
+import pytest
+import utime
+from machine import Pin
+import pinmonitorbench
+from pinmonitor import PinMonitor
+from pinbutton import PinButton
+from edgerecorder import EdgeRecorder
+
+MODES=[(False, False), (True, False), (False, True), (True, True)]
+
+@pytest.mark.parametrize("deferred, dispatch", MODES)
+def test_heapcheck_no_growth(deferred, dispatch):
+    result=pinmonitorbench.heapcheck(2000, deferred=deferred, dispatch=dispatch)
+    assert result["callbacks"]>0
+    assert result["heap_growth_bytes"]==0
+
+@pytest.mark.slow
+@pytest.mark.parametrize("deferred, dispatch", MODES)
+def test_heapcheck_no_growth_full(deferred, dispatch):
+    result=pinmonitorbench.heapcheck(100000, deferred=deferred, dispatch=dispatch)
+    assert result["events"]==100000
+    assert result["heap_growth_bytes"]==0
+
+def _layout(obj):
+    #attribute names and container sizes of obj
+    if hasattr(obj, "__dict__"):
+        names=sorted(vars(obj))
+    else:
+        names=[name for name in obj.__slots__ if hasattr(obj, name)]
+    sizes={}
+    for name in names:
+        value=getattr(obj, name)
+        if isinstance(value, (list, dict, set, bytearray, array)):
+            sizes[name]=len(value)
+    return names, sizes
+
+def _objects(monitor, pinbuttons):
+    objects=[monitor, monitor._wheel, monitor._event] + pinbuttons
+    for name in ("edgebuffer", "dispatchqueue", "tracebuffer", "recorder"):
+        if getattr(monitor, name)!=None:
+            objects.append(getattr(monitor, name))
+    objects.extend(metrics for metrics in monitor._metrics or [] if metrics!=None)
+    return objects
+
+@pytest.mark.parametrize("deferred, dispatch", MODES)
+def test_first_edges_add_no_attributes(deferred, dispatch):
+    pins=[Pin(number, Pin.IN, Pin.PULL_DOWN) for number in (2, 3)]
+    monitor=PinMonitor()
+    monitor.tickless=True
+    if deferred:
+        monitor.enabledeferred(32)
+    if dispatch:
+        monitor.enabledispatch(8)
+    monitor.enablemetrics()
+    monitor.enabletrace(16)
+    monitor.enablerecording(EdgeRecorder(8)) #small: the overflow path is taken as well
+    callback=lambda pinbutton: None
+    pinbuttons=[PinButton(pin, callback, callback, callback, 100, 3) for pin in pins]
+    for pinbutton in pinbuttons:
+        monitor.registerpinbutton(pinbutton)
+    objects=_objects(monitor, pinbuttons)
+    before=[_layout(obj) for obj in objects]
+
+    #clicks, double clicks, countdowns and held repeats on both buttons
+    for n in range(400):
+        slot=n % 2
+        pins[slot].drive((n // 2 + 1) & 1)
+        utime.sleep_us(1000 + (n * 7919) % 400000)
+    utime.sleep_ms(3000)
+
+    assert [_layout(obj) for obj in objects]==before
+    assert monitor.recorder.overflows>0
@@ -0,0 +1,133 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Scanners with more than 30 keys: an 8x8 matrix and a chain of six
+#74HC165. Every key above bit 30 clicks, and no integer the scanner
+#keeps gets above 30 bits (MicroPython would allocate it on the heap).
+#A chain of 320 keys: button indexes above 255 work.
+#--------------------------------------------------------------------
+from array import array
+import pytest
+import utime
+from machine import Pin
+from sim.keys import KeyMatrix, ShiftRegisterChain
+from keyscanner import MatrixScanner, ShiftRegisterScanner, WORD_BITS
+from pinbutton import PinButton
+
+def _register(scanner, keypins, log):
+    for keypin in keypins:
+        scanner.registerpinbutton(PinButton(keypin, lambda pinbutton: log.append(repr(pinbutton.pin)), None, None, 0, 0))
+
+def _assert_small(scanner):
+    #every integer of the scanner, also in its arrays, fits in a word
+    for name, value in vars(scanner).items():
+        if isinstance(value, int) and not isinstance(value, bool):
+            assert 0<=value<1<<WORD_BITS, name
+        elif isinstance(value, array):
+            assert all(0<=word<1<<WORD_BITS for word in value), name
+
+def test_matrix_8x8():
+    rows=[Pin(number) for number in range(0, 8)]
+    columns=[Pin(number) for number in range(8, 16)]
+    matrix=KeyMatrix(rows, columns, diodes=True)
+    scanner=MatrixScanner(rows, columns, 5, diodes=True)
+    log=[]
+    _register(scanner, [scanner.keypin(row, column) for row in range(8) for column in range(8)], log)
+
+    for row, column in ((7, 7), (4, 0), (0, 3)):
+        matrix.press(row, column)
+        utime.sleep_ms(50)
+        _assert_small(scanner)
+        matrix.release(row, column)
+        utime.sleep_ms(5000)
+    #all keys together
+    for row in range(8):
+        for column in range(8):
+            matrix.press(row, column)
+    utime.sleep_ms(50)
+    _assert_small(scanner)
+
+    assert log[:3]==["Key(7,7)", "Key(4,0)", "Key(0,3)"]
+    assert len(log)==67
+    assert scanner.maxpressed==64
+
+def test_matrix_ghost_above_bit_30():
+    rows=[Pin(number) for number in range(0, 8)]
+    columns=[Pin(number) for number in range(8, 16)]
+    matrix=KeyMatrix(rows, columns)
+    scanner=MatrixScanner(rows, columns, 5)
+    log=[]
+    _register(scanner, [scanner.keypin(row, column) for row in range(8) for column in range(8)], log)
+
+    #3 corners of a rectangle in the rows 6 and 7: (6,7) appears as ghost
+    for row, column in ((6, 6), (7, 6), (7, 7)):
+        matrix.press(row, column)
+        utime.sleep_ms(100)
+    assert log==["Key(6,6)", "Key(7,6)"]
+    assert scanner.ghosts>0
+
+def test_shiftregister_bitbanged():
+    load, clock, data=Pin(20), Pin(21), Pin(22)
+    chain=ShiftRegisterChain(load, clock, data, 48)
+    scanner=ShiftRegisterScanner(load, 48, clock, data)
+    log=[]
+    _register(scanner, [scanner.keypin(bit) for bit in range(48)], log)
+
+    for bit in (47, 31, 30, 0):
+        chain.press(bit)
+        utime.sleep_ms(50)
+        _assert_small(scanner)
+        chain.release(bit)
+        utime.sleep_ms(1000)
+    assert log==["Key(47)", "Key(31)", "Key(30)", "Key(0)"]
+
+class _SPI():
+    #the 74HC165 chain on MISO: the first bit out is the most significant of the first byte
+    def __init__(self, bits):
+        self.inputs=0
+        self._bits=bits
+
+    def readinto(self, buffer):
+        for i in range(len(buffer)):
+            byte=0
+            for b in range(8):
+                if (self.inputs>>(i * 8 + b)) & 1:
+                    byte|=0x80>>b
+            buffer[i]=byte
+
+def test_shiftregister_spi():
+    spi=_SPI(44)
+    scanner=ShiftRegisterScanner(Pin(20), 44, spi=spi)
+    log=[]
+    _register(scanner, [scanner.keypin(bit) for bit in range(44)], log)
+
+    for bit in (43, 32, 5):
+        spi.inputs=1<<bit
+        utime.sleep_ms(50)
+        _assert_small(scanner)
+        spi.inputs=0
+        utime.sleep_ms(1000)
+    assert log==["Key(43)", "Key(32)", "Key(5)"]
+
+@pytest.mark.parametrize("dispatch", [False, True])
+def test_more_than_256_keys(dispatch):
+    #the timer wheel, the dispatch queue and the edge buffer hold button indexes above 255
+    load, clock, data=Pin(20), Pin(21), Pin(22)
+    chain=ShiftRegisterChain(load, clock, data, 320)
+    scanner=ShiftRegisterScanner(load, 320, clock, data)
+    if dispatch:
+        scanner.enabledispatch(8)
+    log=[]
+    _register(scanner, [scanner.keypin(bit) for bit in range(320)], log)
+
+    for bit in (300, 256, 319, 255):
+        chain.press(bit)
+        utime.sleep_ms(50)
+        chain.release(bit)
+        utime.sleep_ms(100)
+    utime.sleep_ms(1000)
+    assert sorted(log)==["Key(255)", "Key(256)", "Key(300)", "Key(319)"]
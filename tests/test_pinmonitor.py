@@ -0,0 +1,130 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Regression tests of the PinMonitor state machine on the simulation:
+#-two buttons with overlapping countdowns and held repeats give the
+# expected callbacks (one timer wheel for all buttons)
+#-the table engine and the if/elif ladder give the same callbacks
+#-deferred mode, tickless scheduling and edge recording do not change
+# the callbacks, tickless does not poll a held button nobody listens to
+#-a recorded trace replays to the same callbacks
+#--------------------------------------------------------------------
+import random
+import pytest
+import sim
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, click, press
+from sim.replay import CallbackLog, assert_sequence, replay
+from pinmonitor import PinMonitor, ENGINE_LADDER, ENGINE_TABLE
+from pinbutton import PinButton
+from edgerecorder import EdgeRecorder
+
+def _callback(pinbutton):
+    pass
+
+def _monitor(engine=ENGINE_TABLE, deferred=False, tickless=False, recording=False, onclicked=_callback):
+    sim.reset() #every run starts at virtual time 0 with new pins
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    monitor=PinMonitor()
+    monitor.engine=engine
+    monitor.tickless=tickless
+    if deferred:
+        monitor.enabledeferred(32)
+    if recording:
+        monitor.enablerecording(EdgeRecorder(4096))
+    monitor.registerpinbutton(PinButton(pins[0], onclicked, _callback, _callback, 100, 5))
+    monitor.registerpinbutton(PinButton(pins[1], onclicked, _callback, _callback, 150, 4))
+    return monitor, pins, CallbackLog(monitor)
+
+def _overlapping(pins):
+    #countdowns of both buttons overlap, then both are held and repeat together
+    click(pins[0], 100, Bounce(6, 3000, 1))
+    click(pins[1], 180, Bounce(4, 2000, 2))
+    press(pins[0], 900, 1200, Bounce(6, 3000, 3))
+    press(pins[1], 950, 900)
+    #a click and a double click within the countdown
+    click(pins[1], 2600)
+    click(pins[1], 2900)
+    clock.run_until(6000000)
+
+def test_overlapping_countdowns_and_repeats():
+    monitor, pins, log=_monitor()
+    _overlapping(pins)
+    assert_sequence(log.events, [ \
+        ("clicked", 0, 5), ("clicked", 1, 4) \
+        , ("countdown", 0, 4), ("countdown", 0, 3), ("countdown", 1, 3) \
+        , ("countdown", 0, 2), ("countdown", 1, 2), ("countdown", 0, 1) \
+        , ("countdown", 0, 0), ("countdown", 1, 1) \
+        , ("clicked", 0, -1), ("clicked", 0, -1), ("clicked", 0, -1), ("countdown", 1, 0) \
+        , ("clicked", 0, -1), ("clicked", 0, -1), ("clicked", 0, -1) \
+        ] + [("clicked", 1, -1), ("clicked", 0, -1)] * 7 + [ \
+        ("clicked", 0, -1), ("clicked", 0, -1), ("clicked", 0, -1), ("clicked", 0, -1) \
+        , ("clicked", 1, 4), ("doubleclicked", 1, -1) \
+        ])
+
+def _trace(pins, seed):
+    #random clicks, double clicks and held presses with bounce on both buttons
+    generator=random.Random(seed)
+    at=100
+    for n in range(30):
+        pin=pins[generator.randint(0, 1)]
+        hold=generator.choice((30, 60, 120, 400, 1500))
+        press(pin, at, hold, Bounce(generator.randint(0, 8), generator.randint(500, 4000), seed * 100 + n))
+        at+=generator.choice((80, 250, 450, 900, 2500))
+    clock.run_until((at + 5000) * 1000)
+
+def _events(seed, **kwargs):
+    monitor, pins, log=_monitor(**kwargs)
+    _trace(pins, seed)
+    return log.events
+
+@pytest.mark.parametrize("seed", range(8))
+def test_ladder_equals_table(seed):
+    table=_events(seed, engine=ENGINE_TABLE)
+    assert len(table)>0
+    assert_sequence(_events(seed, engine=ENGINE_LADDER), table)
+
+@pytest.mark.parametrize("seed", range(8))
+def test_deferred_equals_direct(seed):
+    assert_sequence(_events(seed, deferred=True), _events(seed))
+
+@pytest.mark.parametrize("seed", range(8))
+def test_tickless_same_callbacks(seed):
+    assert_sequence(_events(seed, tickless=True), _events(seed))
+
+def _held(tickless):
+    monitor, pins, log=_monitor(tickless=tickless, onclicked=None)
+    press(pins[0], 100, 3000)
+    click(pins[0], 5000)
+    clock.run_until(8000000)
+    return log.events, monitor.wakeupstats()
+
+def test_tickless_held_button_not_polled():
+    #without onclicked nobody listens to the repeats: the held button is not polled for its release
+    events, stats=_held(False)
+    tickless, ticklessstats=_held(True)
+    assert_sequence(tickless, events)
+    assert events[-1]==("countdown", 0, 0)
+    assert stats["wakeups"] - ticklessstats["wakeups"]>=2500 // 100
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("deferred", [False, True])
+def test_recording_same_callbacks(seed, deferred):
+    assert_sequence(_events(seed, deferred=deferred, recording=True), _events(seed, deferred=deferred))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_recorded_trace_replays(seed):
+    monitor, pins, log=_monitor(recording=True)
+    _trace(pins, seed)
+    records=monitor.recorder.records()
+    assert monitor.recorder.overflows==0
+
+    replayed, pins, replaylog=_monitor()
+    last=replay(records, pins)
+    clock.run_until(last + 5000000)
+    assert_sequence(replaylog.events, log.events)
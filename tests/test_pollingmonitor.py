@@ -0,0 +1,37 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#PollingMonitor on the simulation: an active low key behaves like an
+#active high key, also while it is held (repeat) and released.
+#--------------------------------------------------------------------
+import sim
+from machine import Pin
+from sim.clock import clock
+from sim.edges import Bounce, press
+from pollingmonitor import PollingMonitor
+from pinbutton import PinButton
+
+def _held(activelow):
+    sim.reset() #both runs start at virtual time 0
+    log=[]
+    pin=Pin(18, Pin.IN, Pin.PULL_UP if activelow else Pin.PULL_DOWN)
+    pin.drive(1 if activelow else 0)
+    monitor=PollingMonitor(5)
+    monitor.registerpinbutton(PinButton(pin, lambda pinbutton: log.append(("clicked", clock.now // 1000)), None, None, 100, 2), activelow=activelow)
+    active=0 if activelow else 1
+    press(pin, 100, 1200, Bounce(6, 3000, 1), active)
+    press(pin, 3000, 60, Bounce(6, 3000, 2), active)
+    clock.run_until(5000000)
+    return log
+
+def test_activelow_hold_repeats():
+    activehigh=_held(False)
+    #a click, repeats while held, nothing after the release, a click
+    assert len(activehigh)>5
+    assert activehigh[-2][1]<1400
+    assert activehigh[-1][1]>=3000
+    assert _held(True)==activehigh
@@ -0,0 +1,74 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#TimerWheel on the simulation: deadlines in order, and a callback that
+#raises only loses its own deadline, the wheel keeps running.
+#--------------------------------------------------------------------
+import pytest
+from machine import Pin, Timer
+from sim.clock import clock
+from sim.edges import click, press
+from timerwheel import TimerWheel
+from gesturemonitor import GestureMonitor
+from pinbutton import PinButton
+
+def test_deadlines_in_order():
+    fired=[]
+    wheel=TimerWheel(Timer(-1), 4)
+    wheel.callback=lambda slot: fired.append((slot, clock.now // 1000))
+    wheel.schedule(2, 30)
+    wheel.schedule(0, 10)
+    wheel.schedule(1, 20)
+    wheel.schedule(3, 20)
+    wheel.cancel(1)
+    clock.run_until(100000)
+    assert fired==[(0, 10), (3, 20), (2, 30)]
+
+def test_raising_callback_keeps_the_wheel_running():
+    fired=[]
+    def callback(slot):
+        fired.append(slot)
+        if slot==0 and fired.count(0)==1:
+            raise RuntimeError("callback failed")
+    wheel=TimerWheel(Timer(-1), 3)
+    wheel.callback=callback
+    wheel.schedule(0, 10)
+    wheel.schedule(1, 10)
+    wheel.schedule(2, 50)
+    with pytest.raises(RuntimeError):
+        clock.run_until(100000)
+    clock.run_until(100000)
+    #slot 1 was due with slot 0 but after it: it waits for the re-armed timer
+    assert fired==[0, 1, 2]
+    wheel.schedule(0, 10)
+    clock.run_until(200000)
+    assert fired==[0, 1, 2, 0]
+
+def test_raising_callback_does_not_stop_the_other_buttons():
+    log=[]
+    failures=[]
+    def longpress(pinbutton):
+        if not failures:
+            failures.append(pinbutton.index)
+            raise RuntimeError("onlongpress failed")
+        log.append(("longpress", pinbutton.index))
+    monitor=GestureMonitor()
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    for pin in pins:
+        pinbutton=PinButton(pin, lambda pinbutton: log.append(("clicked", pinbutton.index)), None, None, 300, 1)
+        pinbutton.onlongpress=longpress
+        pinbutton.repeatdelay=0
+        monitor.registerpinbutton(pinbutton)
+    press(pins[0], 100, 1500)
+    click(pins[1], 900)
+    click(pins[1], 3000)
+    press(pins[0], 4000, 1500)
+    with pytest.raises(RuntimeError):
+        clock.run_until(8000000)
+    clock.run_until(8000000)
+    assert failures==[0]
+    assert log==[("clicked", 1), ("clicked", 1), ("longpress", 0)]
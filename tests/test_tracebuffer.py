@@ -0,0 +1,102 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#TraceBuffer: the trace of a click decodes to the sites and states of
+#the state machine, a full ring keeps the newest records.
+#--------------------------------------------------------------------
+from machine import Pin
+from sim.clock import clock
+from sim.edges import click
+from pinmonitor import PinMonitor, SITE_DISPATCH, SITE_DEBOUNCE_TIMER_START, SITE_COUNTDOWN_TIMER_START, SITE_COUNTDOWN_TIMER_CALLBACK, SITE_COUNTDOWN_TIMER_KILL, SITE_REPEAT_TIMER_START
+from pinmonitor import BUTTON_STATE_SINGLECLICK_WAIT, BUTTON_STATE_SINGLECLICK_DEBOUNCING, BUTTON_STATE_SINGLECLICK_DEBOUNCED, BUTTON_STATE_DOUBLECLICK_WAIT, BUTTON_STATE_DOUBLECLICK_WAIT_ENDED, BUTTON_STATE_REPEAT_WAIT, BUTTON_STATE_REPEAT_DEBOUNCING, BUTTON_STATE_REPEAT_DEBOUNCED
+from pinbutton import PinButton
+from tracebuffer import TraceBuffer, TRACE_LEAVE
+
+def _callback(pinbutton):
+    pass
+
+def test_click_trace():
+    monitor=PinMonitor()
+    monitor.enabletrace(64)
+    pins=[Pin(2, Pin.IN, Pin.PULL_DOWN), Pin(3, Pin.IN, Pin.PULL_DOWN)]
+    for pin in pins:
+        monitor.registerpinbutton(PinButton(pin, _callback, _callback, _callback, 100, 1))
+    click(pins[1], 100)
+    clock.run_until(2000000)
+    records=monitor.tracebuffer.records()
+    assert set(index for ticks, site, state, index in records)=={1}
+    #press, end of the debounce, one countdown, end of the countdown, repeat poll, release debounced
+    assert [(ticks // 1000, site, state) for ticks, site, state, index in records]==[ \
+        (100, SITE_DISPATCH, BUTTON_STATE_SINGLECLICK_WAIT) \
+        , (100, SITE_DEBOUNCE_TIMER_START, BUTTON_STATE_SINGLECLICK_DEBOUNCING) \
+        , (100, SITE_DEBOUNCE_TIMER_START|TRACE_LEAVE, BUTTON_STATE_SINGLECLICK_DEBOUNCING) \
+        , (100, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_SINGLECLICK_DEBOUNCING) \
+        , (300, SITE_DISPATCH, BUTTON_STATE_SINGLECLICK_DEBOUNCING) \
+        , (300, SITE_DISPATCH, BUTTON_STATE_SINGLECLICK_DEBOUNCED) \
+        , (300, SITE_COUNTDOWN_TIMER_START, BUTTON_STATE_SINGLECLICK_DEBOUNCED) \
+        , (300, SITE_COUNTDOWN_TIMER_START|TRACE_LEAVE, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (300, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (300, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (400, SITE_DISPATCH, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (400, SITE_COUNTDOWN_TIMER_CALLBACK, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (400, SITE_COUNTDOWN_TIMER_CALLBACK|TRACE_LEAVE, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (400, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (500, SITE_DISPATCH, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (500, SITE_COUNTDOWN_TIMER_CALLBACK, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (500, SITE_COUNTDOWN_TIMER_KILL, BUTTON_STATE_DOUBLECLICK_WAIT) \
+        , (500, SITE_DISPATCH, BUTTON_STATE_DOUBLECLICK_WAIT_ENDED) \
+        , (500, SITE_REPEAT_TIMER_START, BUTTON_STATE_REPEAT_WAIT) \
+        , (500, SITE_REPEAT_TIMER_START|TRACE_LEAVE, BUTTON_STATE_REPEAT_WAIT) \
+        , (500, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_REPEAT_WAIT) \
+        , (500, SITE_COUNTDOWN_TIMER_KILL|TRACE_LEAVE, BUTTON_STATE_REPEAT_WAIT) \
+        , (500, SITE_COUNTDOWN_TIMER_CALLBACK|TRACE_LEAVE, BUTTON_STATE_REPEAT_WAIT) \
+        , (500, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_REPEAT_WAIT) \
+        , (600, SITE_DISPATCH, BUTTON_STATE_REPEAT_WAIT) \
+        , (600, SITE_DEBOUNCE_TIMER_START, BUTTON_STATE_REPEAT_DEBOUNCING) \
+        , (600, SITE_DEBOUNCE_TIMER_START|TRACE_LEAVE, BUTTON_STATE_REPEAT_DEBOUNCING) \
+        , (600, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_REPEAT_DEBOUNCING) \
+        , (800, SITE_DISPATCH, BUTTON_STATE_REPEAT_DEBOUNCING) \
+        , (800, SITE_DISPATCH, BUTTON_STATE_REPEAT_DEBOUNCED) \
+        , (800, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_SINGLECLICK_WAIT) \
+        , (800, SITE_DISPATCH|TRACE_LEAVE, BUTTON_STATE_SINGLECLICK_WAIT) \
+        ]
+    #every enter has its leave: the decoded text ends at call level 0
+    lines=monitor.tracebuffer.decode(monitor._sites, monitor._states)
+    assert len(lines)==len(records)
+    assert lines[0].split()[2:]==["\\", "dispatch", "BUTTON_STATE_SINGLECLICK_WAIT", "1"]
+    assert lines[6].split()[2:]==["||\\", "_countdown_timer_start", "BUTTON_STATE_SINGLECLICK_DEBOUNCED", "1"]
+    assert lines[-1].split()[2:]==["/", "dispatch", "BUTTON_STATE_SINGLECLICK_WAIT", "1"]
+
+def test_wraparound():
+    trace=TraceBuffer(4)
+    for n in range(10):
+        clock.advance_ms(1)
+        trace.record((n & 3)<<1 | (n & 1), n, 250 + n)
+    assert trace.count==4
+    #the newest 4 records, oldest first
+    assert trace.records()==[ \
+        (7000, 4, 6, 256) \
+        , (8000, 7, 7, 257) \
+        , (9000, 0, 8, 258) \
+        , (10000, 3, 9, 259) \
+        ]
+    assert [line.split()[2:4] for line in trace.decode(["a", "b", "c", "d"])]==[["\\", "c"], ["/", "d"], ["\\", "a"], ["/", "b"]]
+    #the enter of the leaves was overwritten: the call level does not go below 0
+    trace.record(2, 0, 0)
+    trace.record(2|TRACE_LEAVE, 0, 0)
+    trace.record(2|TRACE_LEAVE, 0, 0)
+    trace.record(0|TRACE_LEAVE, 0, 0)
+    trace.record(4, 0, 0)
+    assert [line.split()[2:4] for line in trace.decode(["a", "b", "c"])]==[["/", "b"], ["/", "b"], ["/", "a"], ["\\", "c"]]
+    trace.clear()
+    assert trace.records()==[]
+
+def test_record_fields():
+    trace=TraceBuffer(2)
+    trace.record(SITE_REPEAT_TIMER_START|TRACE_LEAVE, 0x1ff, 0xffff)
+    #the state is 8 bits, the index 16 bits, the site the top byte
+    assert trace.records()[0][1:]==(SITE_REPEAT_TIMER_START|TRACE_LEAVE, 0xff, 0xffff)
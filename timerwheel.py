@@ -0,0 +1,146 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Sorted timer wheel: services the deadlines of several slots (one
+#slot per button) with a single hardware timer.
+#The slots are kept sorted on deadline, the timer is always armed
+#as a one shot for the first deadline. When it fires every slot
+#that is due is handed to the callback.
+#--------------------------------------------------------------------
+import utime
+from array import array
+from machine import Timer
+
+class TimerWheel():
+    """
+    Description
+    --------------------------------------------------------------------
+    Sorted timer wheel. Every slot has at most one pending deadline.
+    One hardware timer is armed for the earliest deadline, when it fires
+    callback(slot) is executed for all slots that are due.
+    wakeups counts the times the timer fired.
+    --------------------------------------------------------------------
+
+    Usage
+    --------------------------------------------------------------------
+    wheel=TimerWheel(Timer(-1), 16)
+    wheel.callback=myfunction          #myfunction(slot)
+    wheel.schedule(3, 200)             #call myfunction(3) after 200 ms
+    wheel.cancel(3)
+    """
+    callback=None
+    wakeups: int = 0
+
+    def __init__(self, timer: Timer, capacity: int = 16):
+        """
+        @timer: Timer instance used for all the slots
+        @capacity: number of slots, grows with resize()
+        """
+        self._timer=timer
+        self._deadlines=array('i', [0] * capacity)
+        self._pending=bytearray(capacity)
+        self._order=array('H', [0] * capacity) #slots in deadline order, more than 256 slots (key scanners)
+        self._count=0
+        self._expiring=False
+        self.wakeups=0
+        self._expired_ref=self._expired
+
+    def resize(self, capacity: int):
+        """grow the number of slots - not to be called from an interrupt"""
+        extra=capacity - len(self._pending)
+        if extra>0:
+            self._deadlines.extend(array('i', [0] * extra))
+            self._pending.extend(bytearray(extra))
+            self._order.extend(array('H', [0] * extra))
+
+    def pending(self, slot: int):
+        """True when slot has a deadline"""
+        return self._pending[slot]==1
+
+    def deadline(self, slot: int):
+        """deadline of slot in ticks_ms, also valid inside the callback of the slot"""
+        return self._deadlines[slot]
+
+    def next_deadline(self):
+        """earliest deadline in ticks_ms or None when nothing is pending"""
+        if self._count==0:
+            return None
+        return self._deadlines[self._order[0]]
+
+    def schedule(self, slot: int, periodms: int, fromticks: int = None):
+        """
+        (re)schedule slot periodms after fromticks (default now)
+        use fromticks=deadline(slot) for a drift free periodic timer
+        """
+        if fromticks==None:
+            fromticks=utime.ticks_ms()
+        washead=self._count>0 and self._order[0]==slot and self._pending[slot]==1
+        self._remove(slot)
+        deadline=utime.ticks_add(fromticks, periodms)
+        self._deadlines[slot]=deadline
+        #insertion sort: walk from the back, the list is short
+        i=self._count
+        while i>0 and utime.ticks_diff(self._deadlines[self._order[i-1]], deadline)>0:
+            self._order[i]=self._order[i-1]
+            i-=1
+        self._order[i]=slot
+        self._pending[slot]=1
+        self._count+=1
+        if i==0 or washead:
+            self._arm() #new earliest deadline, or the earliest moved back: the timer follows
+
+    def cancel(self, slot: int):
+        """remove the deadline of slot"""
+        if self._pending[slot]==1:
+            washead=self._order[0]==slot
+            self._remove(slot)
+            if washead:
+                self._arm()
+
+    def clear(self):
+        """remove all deadlines and stop the timer"""
+        for i in range(len(self._pending)):
+            self._pending[i]=0
+        self._count=0
+        self._timer.deinit()
+
+    def _remove(self, slot: int):
+        if self._pending[slot]==0:
+            return
+        i=0
+        while self._order[i]!=slot:
+            i+=1
+        self._count-=1
+        while i<self._count:
+            self._order[i]=self._order[i+1]
+            i+=1
+        self._pending[slot]=0
+
+    def _arm(self):
+        if self._expiring:
+            return #_expired arms the timer when all due slots are handled
+        if self._count==0:
+            self._timer.deinit()
+            return
+        delay=utime.ticks_diff(self._deadlines[self._order[0]], utime.ticks_ms())
+        if delay<1:
+            delay=1
+        self._timer.init(mode=Timer.ONE_SHOT, period=delay, callback=self._expired_ref)
+
+    def _expired(self, timerobject):
+        self.wakeups+=1
+        self._expiring=True
+        try:
+            now=utime.ticks_ms()
+            while self._count>0 and utime.ticks_diff(self._deadlines[self._order[0]], now)<=0:
+                slot=self._order[0]
+                self._remove(slot)
+                self.callback(slot)
+        finally:
+            #a raising callback loses its own deadline, the other slots keep the timer
+            self._expiring=False
+            self._arm()
@@ -0,0 +1,108 @@
+#--------------------------------------------------------------------
+#author	: N.Pronk
+#date	: oct 2026
+#licence: published under MIT licence
+#
+#Description
+#--------------------------------------------------------------------
+#Binary trace recorder. Every record is two 32 bit words in a buffer
+#that is allocated once:
+#	word 0: ticks_us
+#	word 1: site<<24 | state<<16 | button index (16 bits)
+#The lowest bit of the site is TRACE_LEAVE (0=enter 1=leave).
+#Recording does not allocate memory and does not print, so it can be
+#used in interrupt handlers. decode() turns the records into text
+#afterwards, like the console output of simpledebugger.py
+#--------------------------------------------------------------------
+#seealso: simpledebugger.py
+#--------------------------------------------------------------------
+import utime
+from array import array
+
+TRACE_LEAVE=const(1)
+
+class TraceBuffer():
+    """
+    Description
+    --------------------------------------------------------------------
+    Ring of fixed width trace records. When the ring is full the oldest
+    records are overwritten.
+    --------------------------------------------------------------------
+
+    Usage
+    --------------------------------------------------------------------
+    trace=TraceBuffer(256)
+    trace.record(site, state, index)            #in the interrupt
+    trace.record(site | TRACE_LEAVE, state, index)
+    ...
+    trace.dump(["sitename0","sitename1"], ["state0","state1"])
+    """
+
+    def __init__(self, size: int = 256):
+        """
+        @size: number of records in the ring
+        """
+        self.size=size
+        self._records=array('I', [0] * (2 * size))
+        self._next=0
+        self.count=0
+
+    def record(self, site: int, state: int, index: int):
+        """add a record with the current ticks_us"""
+        i=self._next<<1
+        self._records[i]=utime.ticks_us()
+        self._records[i+1]=(site<<24) | ((state & 0xff)<<16) | (index & 0xffff)
+        self._next+=1
+        if self._next==self.size:
+            self._next=0
+        if self.count<self.size:
+            self.count+=1
+
+    def clear(self):
+        """remove all records"""
+        self._next=0
+        self.count=0
+
+    def records(self):
+        """list of (ticks_us, site, state, index) tuples, oldest first"""
+        result=[]
+        i=self._next - self.count
+        if i<0:
+            i+=self.size
+        for n in range(self.count):
+            word=self._records[(i<<1)+1]
+            result.append((self._records[i<<1], word>>24, (word>>16) & 0xff, word & 0xffff))
+            i+=1
+            if i==self.size:
+                i=0
+        return result
+
+    def decode(self, sitenames, statenames=None):
+        """
+        records as text lines, indented by call level
+        @sitenames: name per site (index site>>1)
+        @statenames: name per state, None prints the number
+        """
+        lines=[]
+        depth=0
+        for ticks, site, state, index in self.records():
+            if site & TRACE_LEAVE:
+                depth-=1
+                if depth<0:
+                    depth=0 #the enter was overwritten
+                marker="/"
+            else:
+                marker="\\"
+            sitename=sitenames[site>>1] if (site>>1)<len(sitenames) else str(site>>1)
+            statename=str(state)
+            if statenames!=None and state<len(statenames):
+                statename=statenames[state]
+            lines.append("{:<25} {:<25} {:<40} {}".format(str(ticks)+" : "+"|" * depth+marker, sitename, statename, index))
+            if not site & TRACE_LEAVE:
+                depth+=1
+        return lines
+
+    def dump(self, sitenames, statenames=None):
+        """print the decoded records to the console"""
+        for line in self.decode(sitenames, statenames):
+            print(line)